@@ -5,6 +5,8 @@ Binary for running the gen_moves function.
 
 from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
 from ch_ss.game_engine.utils.gen_moves import gen_moves
+from ch_ss.game_engine.utils.move import move_from, move_to_str, str_to_move
+from ch_ss.game_engine.utils.tables import SQUARE_NAMES
 
 
 def _main():
@@ -52,12 +54,13 @@ def _main():
     player_to_move = "white"
 
     # Specify last move of opponent (black)
-    last_move = "Nb6d5"
+    last_move = str_to_move("Nb6d5", "black", board_state)
 
     # Run gen_moves()
     legal_moves = gen_moves(board_state, player_to_move, white_castle_vec, last_move)
 
     print(f"Found {len(legal_moves)} legal moves.")
+    print(", ".join(move_to_str(move, board_state[SQUARE_NAMES[move_from(move)]].name) for move in legal_moves))
 
 
 if __name__ == "__main__":
@@ -1,26 +1,66 @@
+import logging
+import time
+from collections import Counter
 from os import makedirs
 
 import typer
 
+from ch_ss.game_engine.core.adjudication import Adjudication
+from ch_ss.game_engine.core.arena import MatchStats, run_arena
 from ch_ss.game_engine.core.game import StandardGame
+from ch_ss.game_engine.core.perft import Perft, run_perft_suite
+from ch_ss.game_engine.core.selfplay import SelfPlayResult, run_selfplay
+from ch_ss.game_engine.utils.fen import STANDARD_FEN
 
 app = typer.Typer()
 
 
+def configure_logging(log_level: str) -> None:
+    # engine messages (game ticks, checks, results) are logged, selfplay and arena leave them off
+    logging.basicConfig(level=log_level.upper(), format="%(message)s")
+
+
+def get_adjudication(resign_margin: int, draw_margin: int) -> Adjudication:
+    # a resign margin of 0 and a negative draw margin leave the material thresholds off
+    return Adjudication(resign_margin=resign_margin or None, draw_margin=draw_margin if draw_margin >= 0 else None)
+
+
 @app.command()
-def bots():
-    """Let two bots go head-to-head!"""
+def bots(record: str = "", log_level: str = "info"):
+    """Let two bots go head-to-head! Frames go to out_files/, or into one animated GIF with --record game.gif."""
+    configure_logging(log_level)
+    from ch_ss.game_engine.core.recorder import GameRecorder
+    from ch_ss.game_engine.core.render_queue import RenderQueue
+
     game = StandardGame()
+    if record:
+        # frames are streamed into the GIF as the game goes on, the final position is held a little longer
+        with GameRecorder(record) as recorder:
+            recorder.add(game.board.position)
+            try:
+                for _ in range(1, 201):
+                    if game.tick() is not None:
+                        break
+                    recorder.add(game.board.position, game.last_move)
+            finally:
+                recorder.add(game.board.position, game.last_move, hold=2)
+        return
+
     makedirs("out_files", exist_ok=True)
-    game.print_game_state("white", out_file="out_files/move_000.jpg")
-    for i in range(1, 201):
-        game.tick()
-        game.print_game_state("white", out_file=str("out_files/move_%03d.jpg" % (i)))
+
+    # frames are rendered and written in the background while the game goes on
+    with RenderQueue() as frames:
+        frames.put(game.board.position, "out_files/move_000.jpg")
+        for i in range(1, 201):
+            if game.tick() is not None:
+                break
+            frames.put(game.board.position, str("out_files/move_%03d.jpg" % (i)), game.last_move)
 
 
 @app.command()
-def interactive(human_player: str = "white"):
+def interactive(human_player: str = "white", log_level: str = "info"):
     """Play chess in an interactive mode against a bot."""
+    configure_logging(log_level)
     game = StandardGame()
     game.print_game_state(human_player, out_file="interactive_game_state.jpg")
 
@@ -36,5 +76,82 @@ def interactive(human_player: str = "white"):
             pass
 
 
+@app.command()
+def selfplay(
+    games: int = 100,
+    processes: int = 0,
+    seed: int = 0,
+    max_plies: int = 400,
+    resign_margin: int = 0,
+    draw_margin: int = -1,
+):
+    """Play bot games headless across all cores (or --processes), and summarize the results."""
+    adjudication = get_adjudication(resign_margin, draw_margin)
+    start = time.perf_counter()
+    results = run_selfplay(games, processes or None, base_seed=seed, max_plies=max_plies, adjudication=adjudication)
+    elapsed = time.perf_counter() - start
+
+    counts = Counter((result.result, result.reason) for result in results)
+    for (outcome, reason), count in sorted(counts.items()):
+        print("%-8s %-22s %6d" % (outcome, reason, count))
+    plies = sum(result.plies for result in results)
+    print("%d games, %d plies in %.1fs (%.0f plies/s)" % (len(results), plies, elapsed, plies / elapsed))
+
+
+@app.command()
+def arena(
+    strategies: str = "capturebot5000,naive",
+    games: int = 200,
+    mode: str = "round-robin",
+    processes: int = 0,
+    seed: int = 0,
+    max_plies: int = 400,
+    elo0: float = 0.0,
+    elo1: float = 0.0,
+    resign_margin: int = 0,
+    draw_margin: int = -1,
+):
+    """Play matches between strategies (comma separated), with an SPRT between --elo0 and --elo1 if they differ."""
+
+    def report(match: MatchStats, result: SelfPlayResult) -> None:
+        print("[Game-%d] %s-%s %s, %s" % (result.game_id, result.white, result.black, result.result, match))
+
+    sprt = (elo0, elo1) if elo0 != elo1 else None
+    adjudication = get_adjudication(resign_margin, draw_margin)
+    matches = run_arena(
+        strategies.split(","), games, mode, processes or None, seed, max_plies, sprt, report, adjudication
+    )
+    for match in matches:
+        print(match)
+
+
+@app.command()
+def perft(depth: int = 3, fen: str = "", divide: bool = False):
+    """Count move tree leaf nodes of the benchmark positions (or a FEN) to check and time move generation."""
+    if not fen and not divide:
+        for result in run_perft_suite(depth):
+            if result["expected"] is None:
+                status = "?"
+            else:
+                status = "OK" if result["nodes"] == result["expected"] else "FAIL"
+            print(
+                "%-24s depth %d %12d nodes %-4s %10.0f nps"
+                % (result["name"], result["depth"], result["nodes"], status, result["nps"])
+            )
+        return
+
+    position = Perft(fen or STANDARD_FEN)
+    start = time.perf_counter()
+    if divide:
+        counts = position.divide(depth)
+        for move, nodes in sorted(counts.items()):
+            print("%s: %d" % (move, nodes))
+        total = sum(counts.values())
+    else:
+        total = position.perft(depth)
+    elapsed = time.perf_counter() - start
+    print("Nodes: %d (%.0f nps)" % (total, total / elapsed if elapsed > 0 else 0.0))
+
+
 def _main():
     app()
@@ -0,0 +1,85 @@
+"""
+Rules a game can end by besides checkmate and stalemate: the draws of the
+laws of chess (repetition, the 50-move rule, insufficient material) and
+optional resign/draw thresholds on the material margin, which cut the long
+tails of decided or dead-drawn bot games short.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.piece import PieceColors, PieceNames, PieceValues
+
+# Squares of the same color as a1
+DARK_SQUARES = 0xAA55AA55AA55AA55
+
+
+@dataclass(frozen=True)
+class Adjudication:
+    """
+    Settings of the rules StandardGame.adjudicate() ends a game by. The rules
+    of chess are on by default, the material thresholds are off (None).
+    """
+
+    repetitions: int = 3  # draw once a position occurs this many times, 0 disables
+    fifty_move_plies: int = 100  # draw after this many plies without a capture or a pawn move, 0 disables
+    insufficient_material: bool = True
+
+    # the side behind resigns once it has been resign_margin pawns down for resign_plies plies in a row
+    resign_margin: Optional[int] = None
+    resign_plies: int = 8
+
+    # a draw is agreed once the margin stayed within draw_margin pawns for draw_plies plies, from draw_min_ply on
+    draw_margin: Optional[int] = None
+    draw_plies: int = 40
+    draw_min_ply: int = 80
+
+    def __post_init__(self) -> None:
+        assert self.resign_margin is None or self.resign_margin > 0, str(
+            "Error: resign_margin must be positive, got %d" % (self.resign_margin)
+        )
+        assert self.resign_plies > 0 and self.draw_plies > 0, "Error: resign_plies and draw_plies must be positive"
+
+
+def material(position: CompactBoard, color: PieceColors) -> int:
+    """
+    Sum of the values of the pieces of color, in pawns, the king excluded.
+    """
+    return sum(
+        PieceValues[name] * bin(bitboard).count("1")
+        for name, bitboard in position.get_piece_bitboards(color).items()
+        if name != PieceNames.KING
+    )
+
+
+def material_margin(position: CompactBoard) -> int:
+    """
+    Material of white minus the material of black, in pawns.
+    """
+    return material(position, PieceColors.WHITE) - material(position, PieceColors.BLACK)
+
+
+def is_insufficient_material(position: CompactBoard) -> bool:
+    """
+    Whether neither side can possibly checkmate: kings with at most one
+    minor piece between them, or only bishops that all stand on squares of
+    the same color.
+    """
+    white = position.get_piece_bitboards(PieceColors.WHITE)
+    black = position.get_piece_bitboards(PieceColors.BLACK)
+    names = set(white) | set(black)
+    if names & {PieceNames.PAWN, PieceNames.ROOK, PieceNames.QUEEN}:
+        return False
+
+    minors = 0
+    for pieces in (white, black):
+        minors += bin(pieces.get(PieceNames.KNIGHT, 0) | pieces.get(PieceNames.BISHOP, 0)).count("1")
+    if minors <= 1:
+        return True
+
+    # with bishops on one color only, a king on the other color can never be attacked
+    if PieceNames.KNIGHT in names:
+        return False
+    bishops = white.get(PieceNames.BISHOP, 0) | black.get(PieceNames.BISHOP, 0)
+    return bishops & DARK_SQUARES in (0, bishops)
@@ -0,0 +1,247 @@
+"""
+Arena for comparing player strategies: schedules round-robin or gauntlet
+matches with alternating colors over a pool of worker processes, keeps Elo
+estimates and win/draw/loss counts up to date as games finish, and can stop a
+match early once a sequential probability ratio test (SPRT) is decided.
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ch_ss.game_engine.core.adjudication import Adjudication
+from ch_ss.game_engine.core.player import STRATEGIES
+from ch_ss.game_engine.core.selfplay import SelfPlayResult, play_selfplay_game
+
+# Score of the white player for each game result, games stopped at max_plies count as draws
+WHITE_SCORES = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5, "*": 0.5}
+
+
+def elo_to_score(elo: float) -> float:
+    """
+    Expected score of a player rated elo points above its opponent.
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score: float) -> float:
+    """
+    Elo difference that gives the expected score, infinite for a score of 0
+    or 1.
+    """
+    if score <= 0 or score >= 1:
+        return math.copysign(math.inf, score - 0.5)
+    return -400 * math.log10(1 / score - 1)
+
+
+@dataclass
+class MatchStats:
+    """
+    Running results of a match between two strategies, counted from the
+    point of view of player (its wins are the opponent's losses).
+    """
+
+    player: str
+    opponent: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    sprt_result: Optional[str] = None  # 'H1' (player is stronger by elo1) or 'H0' once the SPRT is decided
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    def add(self, score: float) -> None:
+        """
+        Counts a game the player scored 1, 0.5 or 0 points in.
+        """
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def score_variance(self) -> float:
+        """
+        Variance of the score of a single game, from the results so far.
+        """
+        if not self.games:
+            return 0.0
+        score = self.score
+        total = self.wins * (1 - score) ** 2 + self.draws * (0.5 - score) ** 2 + self.losses * score**2
+        return total / self.games
+
+    def elo(self) -> float:
+        return score_to_elo(self.score)
+
+    def elo_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """
+        Confidence interval of the Elo difference, 95% by default, from the
+        normal approximation of the mean score.
+        """
+        if not self.games:
+            return (-math.inf, math.inf)
+        error = z * math.sqrt(self.score_variance() / self.games)
+        return (score_to_elo(self.score - error), score_to_elo(self.score + error))
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """
+        Log-likelihood ratio of the results under H1 (the player is elo1
+        stronger) against H0 (elo0 stronger), with the normal approximation
+        of the generalized SPRT.
+        """
+        variance = self.score_variance()
+        if variance == 0:
+            # one-sided results (all wins, all draws...) have no spread yet, estimate it as if one more
+            # game was won and one more lost so that the test still ends
+            score = self.score
+            variance = ((1 - score) ** 2 + score**2) / (self.games + 2)
+        score0, score1 = elo_to_score(elo0), elo_to_score(elo1)
+        return self.games * (score1 - score0) * (2 * self.score - score0 - score1) / (2 * variance)
+
+    def update_sprt(self, elo0: float, elo1: float, alpha: float = 0.05, beta: float = 0.05) -> Optional[str]:
+        """
+        Decides the SPRT once the log-likelihood ratio leaves its bounds, and
+        returns its result ('H0', 'H1', or None while undecided).
+        """
+        if self.sprt_result is None:
+            llr = self.llr(elo0, elo1)
+            if llr >= math.log((1 - beta) / alpha):
+                self.sprt_result = "H1"
+            elif llr <= math.log(beta / (1 - alpha)):
+                self.sprt_result = "H0"
+        return self.sprt_result
+
+    def __str__(self) -> str:
+        low, high = self.elo_interval()
+        return "%s vs %s: +%d =%d -%d, Elo %+.1f [%+.1f, %+.1f]%s" % (
+            self.player,
+            self.opponent,
+            self.wins,
+            self.draws,
+            self.losses,
+            self.elo(),
+            low,
+            high,
+            ", SPRT %s" % (self.sprt_result) if self.sprt_result else "",
+        )
+
+
+def get_pairings(strategies: List[str], mode: str = "round-robin") -> List[Tuple[str, str]]:
+    """
+    Pairs of strategies to play matches between: every pair in a round-robin,
+    or the first strategy against each of the others in a gauntlet.
+    """
+    assert mode in ["round-robin", "gauntlet"], str("Error: unknown arena mode = %s" % (mode))
+    if mode == "gauntlet":
+        return [(strategies[0], opponent) for opponent in strategies[1:]]
+    return [(a, b) for i, a in enumerate(strategies) for b in strategies[i + 1 :]]
+
+
+def run_arena(
+    strategies: List[str],
+    games_per_match: int,
+    mode: str = "round-robin",
+    processes: Optional[int] = None,
+    base_seed: int = 0,
+    max_plies: int = 400,
+    sprt: Optional[Tuple[float, float]] = None,
+    on_game: Optional[Callable[[MatchStats, SelfPlayResult], None]] = None,
+    adjudication: Optional[Adjudication] = None,
+) -> List[MatchStats]:
+    """
+    Plays matches between strategies, with colors alternating from game to
+    game, over a pool of worker processes. Games of all matches are
+    interleaved, and each is counted as soon as it finishes.
+
+    Args:
+        strategies (List[str]): Strategies to compare, see Player.evaluate_move().
+
+        games_per_match (int): Maximum number of games of each match.
+
+        mode (str): 'round-robin' or 'gauntlet', see get_pairings().
+
+        processes (Optional[int]): Number of worker processes, the number of
+        cores if None. With 1, games are played in this process.
+
+        base_seed (int): Seed of the run, each game is seeded from it and its
+        index, see play_selfplay_game().
+
+        max_plies (int): Number of plies after which a game is stopped, and
+        counted as a draw.
+
+        sprt (Optional[Tuple[float, float]]): Elo differences (elo0, elo1) of
+        the SPRT hypotheses. When given, a match stops scheduling games once
+        its SPRT is decided.
+
+        on_game (Optional[Callable[[MatchStats, SelfPlayResult], None]]):
+        Called with the updated match after each game, e.g. to report
+        progress.
+
+        adjudication (Optional[Adjudication]): Rules games are ended by, see
+        play_selfplay_game().
+
+    Returns:
+        List[MatchStats]: Results of each match.
+    """
+
+    for strategy in strategies:
+        assert strategy in STRATEGIES, str("Error: unknown strategy = %s" % (strategy))
+    assert len(set(strategies)) == len(strategies), "Error: each strategy can only enter the arena once"
+    matches = [MatchStats(player, opponent) for player, opponent in get_pairings(strategies, mode)]
+    schedule = _iter_schedule(matches, games_per_match)
+
+    def record(match: MatchStats, result: SelfPlayResult) -> None:
+        white_score = WHITE_SCORES[result.result]
+        match.add(white_score if result.white == match.player else 1 - white_score)
+        if sprt is not None:
+            match.update_sprt(*sprt)
+        if on_game is not None:
+            on_game(match, result)
+
+    if processes == 1:
+        for game_id, match, white, black in schedule:
+            if match.sprt_result is None:
+                record(match, play_selfplay_game(game_id, base_seed, max_plies, white, black, adjudication))
+        return matches
+
+    # keep a couple of games per worker in flight, so matches decided by the SPRT stop early
+    max_in_flight = 2 * (processes or multiprocessing.cpu_count())
+    with ProcessPoolExecutor(processes) as pool:
+        in_flight: Dict[Future, MatchStats] = {}
+        while True:
+            for game_id, match, white, black in schedule:
+                if match.sprt_result is None:
+                    args = (game_id, base_seed, max_plies, white, black, adjudication)
+                    in_flight[pool.submit(play_selfplay_game, *args)] = match
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(in_flight.pop(future), future.result())
+
+    return matches
+
+
+def _iter_schedule(matches: List[MatchStats], games_per_match: int) -> Iterator[Tuple[int, MatchStats, str, str]]:
+    """
+    Yields (game id, match, white, black) for each game, one game of each
+    match in turn, swapping colors every game.
+    """
+    game_id = 0
+    for i in range(games_per_match):
+        for match in matches:
+            white, black = (match.player, match.opponent) if i % 2 == 0 else (match.opponent, match.player)
+            yield game_id, match, white, black
+            game_id += 1
@@ -0,0 +1,140 @@
+"""
+Per-side attack maps of a board position that are kept up to date as pieces
+are put on or taken off squares, so attack tests are O(1) lookups.
+"""
+
+from typing import Dict, List, Optional
+
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.gen_moves import piece_attacks
+from ch_ss.game_engine.utils.tables import (
+    DIAGONAL_DIRECTIONS,
+    DIRECTION_IS_POSITIVE,
+    PAWN_ATTACK_MASKS,
+    RAY_MASKS,
+)
+
+# Sliding pieces attacking along the diagonal/orthogonal directions
+DIAGONAL_SLIDERS = [PieceNames.BISHOP, PieceNames.QUEEN]
+ORTHOGONAL_SLIDERS = [PieceNames.ROOK, PieceNames.QUEEN]
+
+
+class AttackMaps:
+    """
+    For each side, the number of its pieces attacking each square (including
+    squares defended by its own pieces), and the bitboard of squares attacked
+    at least once.
+
+    Every change of a square goes through set_piece(). Only the piece on that
+    square and the sliding pieces whose lines pass through it can change
+    their attacks, so just those are updated.
+    """
+
+    def __init__(self) -> None:
+        self.pieces: List[Optional[Piece]] = [None] * 64
+        self.occupied = 0
+        self.counts: Dict[PieceColors, List[int]] = {PieceColors.WHITE: [0] * 64, PieceColors.BLACK: [0] * 64}
+        self.attacked: Dict[PieceColors, int] = {PieceColors.WHITE: 0, PieceColors.BLACK: 0}
+
+    def set_piece(self, sq: int, piece: Optional[Piece]) -> None:
+        """
+        Puts the piece on the square (None or an empty piece clears it), and
+        updates the attacks of every piece affected by the change.
+        """
+        if piece is not None and piece.is_empty():
+            piece = None
+        if self.pieces[sq] == piece:
+            return
+
+        # sliders seeing this square are the same before and after the change
+        sliders = self.sliders_attacking(sq)
+        for s in sliders:
+            self._add_attacks(s, -1)
+        if self.pieces[sq] is not None:
+            self._add_attacks(sq, -1)
+
+        self.pieces[sq] = piece
+        if piece is None:
+            self.occupied &= ~(1 << sq)
+        else:
+            self.occupied |= 1 << sq
+
+        for s in sliders:
+            self._add_attacks(s, 1)
+        if piece is not None:
+            self._add_attacks(sq, 1)
+
+    def is_attacked_by(self, sq: int, color: PieceColors) -> bool:
+        """
+        True if any piece of color attacks the square.
+        """
+        return bool((self.attacked[color] >> sq) & 1)
+
+    def sliders_attacking(self, sq: int) -> List[int]:
+        """
+        Squares of the sliding pieces (of both sides) attacking the square.
+        """
+        sliders = []
+        for d in range(8):
+            blockers = RAY_MASKS[sq][d] & self.occupied
+            if not blockers:
+                continue
+            if DIRECTION_IS_POSITIVE[d]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            piece = self.pieces[blocker]
+            assert piece is not None
+            if piece.name in (DIAGONAL_SLIDERS if d in DIAGONAL_DIRECTIONS else ORTHOGONAL_SLIDERS):
+                sliders.append(blocker)
+
+        return sliders
+
+    def attacks_of(self, sq: int) -> int:
+        """
+        Bitboard of squares attacked by the piece on the square, given the
+        current occupancy.
+        """
+        piece = self.pieces[sq]
+        if piece is None:
+            return 0
+        if piece.name == PieceNames.PAWN:
+            return PAWN_ATTACK_MASKS[piece.color == PieceColors.WHITE][sq]
+        return piece_attacks(piece.name, sq, self.occupied)
+
+    @classmethod
+    def from_pieces(cls, pieces: List[Optional[Piece]]) -> "AttackMaps":
+        """
+        Builds the attack maps of a whole position at once, from the piece
+        (or None) on each square.
+        """
+        maps = cls()
+        maps.pieces = [None if piece is None or piece.is_empty() else piece for piece in pieces]
+        for sq, piece in enumerate(maps.pieces):
+            if piece is not None:
+                maps.occupied |= 1 << sq
+        for sq, piece in enumerate(maps.pieces):
+            if piece is not None:
+                maps._add_attacks(sq, 1)
+        return maps
+
+    def recompute(self) -> "AttackMaps":
+        """
+        Builds the attack maps of the same position from scratch. Used to
+        verify the incremental updates.
+        """
+        return AttackMaps.from_pieces(self.pieces)
+
+    def _add_attacks(self, sq: int, delta: int) -> None:
+        piece = self.pieces[sq]
+        assert piece is not None
+        counts = self.counts[piece.color]
+        attacks = self.attacks_of(sq)
+        while attacks:
+            lsb = attacks & -attacks
+            target = lsb.bit_length() - 1
+            attacks ^= lsb
+            counts[target] += delta
+            # the attacked bitboard only changes when a count moves between 0 and 1
+            if counts[target] == (1 if delta > 0 else 0):
+                self.attacked[piece.color] ^= lsb
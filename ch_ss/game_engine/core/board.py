@@ -1,244 +1,224 @@
-import pprint as pp
-import re
-import sys
-
-from PIL import Image, ImageDraw, ImageFont
+import logging
 
+from ch_ss.game_engine.core.attack_maps import AttackMaps
+from ch_ss.game_engine.core.compact_board import PIECES_BY_CODE, CompactBoard
 from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
 from ch_ss.game_engine.core.square import Square
-from ch_ss.game_engine.utils.utils import COLUMN_ALPHABETS
+from ch_ss.game_engine.utils.fen import fen_to_mailbox, mailbox_key, mailbox_to_fen
+from ch_ss.game_engine.utils.move import (
+    KING_CASTLE,
+    is_castle,
+    is_en_passant,
+    is_promotion,
+    move_flags,
+    move_from,
+    move_to,
+    move_to_str,
+    promotion_piece_name,
+)
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES, SQUARE_NAMES
+from ch_ss.game_engine.utils.zobrist import piece_key
+
+logger = logging.getLogger(__name__)
 
 
 class Board:
     def __init__(self, board_config: str = "standard") -> None:
-        sqs = {}
-        for j in range(8):
-            for i, alphabet in enumerate(COLUMN_ALPHABETS):
-                sq = Square(x_y=(7 - j, i), square_id=alphabet + str(j + 1))
-                sqs[alphabet + str(j + 1)] = sq
-        self.squares = sqs
+        # pieces are kept in a compact mailbox, Square objects are only created on demand
+        self.position = CompactBoard()
+        self.attack_maps = AttackMaps()
+
+        # Zobrist key of the pieces on the board, see utils/zobrist.py
+        self.zobrist_key = 0
+
+        # moves made with push(), each with the pieces it replaced, for pop()
+        self.history: list[tuple[int, list[tuple[str, Piece]]]] = []
 
         if board_config == "standard":
             self.init_standard()
         elif board_config == "empty":
             pass
         else:
-            self.put_piece_by_sid("e2", Piece(PieceColors.EMPTY, PieceNames.EMPTY))
-            self.put_piece_by_sid("e4", Piece(PieceColors.WHITE, PieceNames.PAWN))
-
-        # global settings for printing board image
-        self.board_len = 800
-        self.margin = 10
-        self.colors = ["#23de74", "#f7f7d5"]
-        self.font = ImageFont.truetype("ch_ss/game_engine/assets/fonts/arial.ttf", 16)
-
-        # calculated settings for printing board image -- don't change this
-        self.w, self.h = self.board_len + (self.margin * 2), self.board_len + (self.margin * 2)  # margin 10px each
-        self.square_len = self.board_len // 8
+            self.put_piece_by_sid("e2", Piece.of())
+            self.put_piece_by_sid("e4", Piece.of(PieceColors.WHITE, PieceNames.PAWN))
 
     def init_standard(self) -> None:
 
         # white/black pawns
         for alphabet in ["a", "b", "c", "d", "e", "f", "g", "h"]:
-            self.put_piece_by_sid(alphabet + "2", Piece(PieceColors.WHITE, PieceNames.PAWN))
-            self.put_piece_by_sid(alphabet + "7", Piece(PieceColors.BLACK, PieceNames.PAWN))
+            self.put_piece_by_sid(alphabet + "2", Piece.of(PieceColors.WHITE, PieceNames.PAWN))
+            self.put_piece_by_sid(alphabet + "7", Piece.of(PieceColors.BLACK, PieceNames.PAWN))
 
         # white pieces
-        self.put_piece_by_sid("a1", Piece(PieceColors.WHITE, PieceNames.ROOK))
-        self.put_piece_by_sid("b1", Piece(PieceColors.WHITE, PieceNames.KNIGHT))
-        self.put_piece_by_sid("c1", Piece(PieceColors.WHITE, PieceNames.BISHOP))
-        self.put_piece_by_sid("d1", Piece(PieceColors.WHITE, PieceNames.QUEEN))
-        self.put_piece_by_sid("e1", Piece(PieceColors.WHITE, PieceNames.KING))
-        self.put_piece_by_sid("f1", Piece(PieceColors.WHITE, PieceNames.BISHOP))
-        self.put_piece_by_sid("g1", Piece(PieceColors.WHITE, PieceNames.KNIGHT))
-        self.put_piece_by_sid("h1", Piece(PieceColors.WHITE, PieceNames.ROOK))
+        self.put_piece_by_sid("a1", Piece.of(PieceColors.WHITE, PieceNames.ROOK))
+        self.put_piece_by_sid("b1", Piece.of(PieceColors.WHITE, PieceNames.KNIGHT))
+        self.put_piece_by_sid("c1", Piece.of(PieceColors.WHITE, PieceNames.BISHOP))
+        self.put_piece_by_sid("d1", Piece.of(PieceColors.WHITE, PieceNames.QUEEN))
+        self.put_piece_by_sid("e1", Piece.of(PieceColors.WHITE, PieceNames.KING))
+        self.put_piece_by_sid("f1", Piece.of(PieceColors.WHITE, PieceNames.BISHOP))
+        self.put_piece_by_sid("g1", Piece.of(PieceColors.WHITE, PieceNames.KNIGHT))
+        self.put_piece_by_sid("h1", Piece.of(PieceColors.WHITE, PieceNames.ROOK))
 
         # black pieces
-        self.put_piece_by_sid("a8", Piece(PieceColors.BLACK, PieceNames.ROOK))
-        self.put_piece_by_sid("b8", Piece(PieceColors.BLACK, PieceNames.KNIGHT))
-        self.put_piece_by_sid("c8", Piece(PieceColors.BLACK, PieceNames.BISHOP))
-        self.put_piece_by_sid("d8", Piece(PieceColors.BLACK, PieceNames.QUEEN))
-        self.put_piece_by_sid("e8", Piece(PieceColors.BLACK, PieceNames.KING))
-        self.put_piece_by_sid("f8", Piece(PieceColors.BLACK, PieceNames.BISHOP))
-        self.put_piece_by_sid("g8", Piece(PieceColors.BLACK, PieceNames.KNIGHT))
-        self.put_piece_by_sid("h8", Piece(PieceColors.BLACK, PieceNames.ROOK))
+        self.put_piece_by_sid("a8", Piece.of(PieceColors.BLACK, PieceNames.ROOK))
+        self.put_piece_by_sid("b8", Piece.of(PieceColors.BLACK, PieceNames.KNIGHT))
+        self.put_piece_by_sid("c8", Piece.of(PieceColors.BLACK, PieceNames.BISHOP))
+        self.put_piece_by_sid("d8", Piece.of(PieceColors.BLACK, PieceNames.QUEEN))
+        self.put_piece_by_sid("e8", Piece.of(PieceColors.BLACK, PieceNames.KING))
+        self.put_piece_by_sid("f8", Piece.of(PieceColors.BLACK, PieceNames.BISHOP))
+        self.put_piece_by_sid("g8", Piece.of(PieceColors.BLACK, PieceNames.KNIGHT))
+        self.put_piece_by_sid("h8", Piece.of(PieceColors.BLACK, PieceNames.ROOK))
+
+    @property
+    def squares(self) -> dict[str, Square]:
+        """
+        Square views of the position, keyed by square id. Changing a piece on
+        these does not change the board, use put_piece_by_sid() instead.
+        """
+        return {sid: self.position.get_square(sq) for sq, sid in enumerate(SQUARE_NAMES)}
 
     def get_pieces_by_color(self, color: str) -> dict:
 
-        pieces = {}
         to_match = PieceColors.WHITE if color == "white" else PieceColors.BLACK
-        for sid, square in self.squares.items():
-            if square.piece.color == to_match:
-                pieces[sid] = square.piece
+        return self.position.get_pieces_by_color(to_match)
+
+    def get_piece_bitboards(self, color: str) -> dict[PieceNames, int]:
+        """
+        Squares of each piece type of color as bitboards, maintained as pieces
+        are put on the board, so move generation can start from them.
+        """
+        return self.position.get_piece_bitboards(PieceColors.WHITE if color == "white" else PieceColors.BLACK)
 
-        return pieces
+    def get_king_sid(self, color: str) -> str:
+        sq = self.position.king_square(PieceColors.WHITE if color == "white" else PieceColors.BLACK)
+        assert sq >= 0, str("Error: get_king_sid() called but there is no %s king" % (color))
+        return SQUARE_NAMES[sq]
 
     def get_piece_by_sid(self, sid: str) -> Piece:
 
-        assert sid in self.squares, str("Error: get_pieces_by_sid() called but sid does not exist: %s" % (sid))
-        return self.squares[sid].piece
+        assert sid in SQUARE_INDICES, str("Error: get_pieces_by_sid() called but sid does not exist: %s" % (sid))
+        return self.position.get_piece(SQUARE_INDICES[sid])
 
     def clear_square_by_sid(self, square_id: str) -> None:
-        self.put_piece_by_sid(square_id, Piece(PieceColors.EMPTY, PieceNames.EMPTY))
+        self.put_piece_by_sid(square_id, Piece.of())
 
     def put_piece_by_sid(self, square_id: str, piece: Piece) -> None:
-        self.squares[square_id].change_piece(piece)
-
-    def make_non_pawn_moves(self, move):
-        sq_from = move[1:3]
-        if move[3] == "x":
-            sq_to = move[4:6]
-        else:
-            sq_to = move[3:5]
+        sq = SQUARE_INDICES[square_id]
+        self.zobrist_key ^= piece_key(self.position.get_piece(sq), sq) ^ piece_key(piece, sq)
+        self.position.put_piece(sq, piece)
+        self.attack_maps.set_piece(sq, piece)
+
+    def copy_position(self) -> CompactBoard:
+        """
+        Copy of the pieces on the board, e.g. for a search or a worker
+        process. Only the 64-byte mailbox and the bitboards are copied.
+        """
+        return self.position.copy()
+
+    def set_position(self, mailbox: bytes) -> None:
+        """
+        Replaces all pieces on the board at once from a 64-byte mailbox (see
+        core/compact_board.py), building the attack maps and the Zobrist key
+        in one pass instead of one put_piece_by_sid() per piece. Clears the
+        move history.
+        """
+        self.position = CompactBoard(mailbox)
+        self.attack_maps = AttackMaps.from_pieces([PIECES_BY_CODE[code] for code in self.position.mailbox])
+        self.zobrist_key = mailbox_key(mailbox)
+        self.history = []
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Board":
+        """
+        Board with the pieces of a FEN, only its first field is used.
+        """
+        board = cls(board_config="empty")
+        board.set_position(fen_to_mailbox(fen.split()[0]))
+        return board
+
+    def to_fen(
+        self, to_move: str = "white", castling: str = "-", en_passant: str = "-", halfmove: int = 0, fullmove: int = 1
+    ) -> str:
+        """
+        FEN of the pieces on the board. The board does not keep game states,
+        so these are given as the remaining FEN fields.
+        """
+        placement = mailbox_to_fen(bytes(self.position.mailbox))
+        fields = [placement, to_move[0], castling, en_passant, str(halfmove), str(fullmove)]
+        return " ".join(fields)
+
+    def get_attacked_squares(self, color: str) -> int:
+        """
+        Bitboard of all squares attacked by the pieces of color.
+        """
+        return self.attack_maps.attacked[PieceColors.WHITE if color == "white" else PieceColors.BLACK]
+
+    def is_square_attacked(self, square_id: str, color: str) -> bool:
+        """
+        True if any piece of color attacks the square.
+        """
+        return bool((self.get_attacked_squares(color) >> SQUARE_INDICES[square_id]) & 1)
+
+    def push(self, move: int, color: str) -> None:
+        """
+        Makes the move, remembering the pieces on every square it changes so
+        that pop() can take it back.
+        """
+        changed = [(sid, self.get_piece_by_sid(sid)) for sid in self.get_changed_squares(move)]
+        self.make_move(move, color)
+        self.history.append((move, changed))
+
+    def pop(self) -> int:
+        """
+        Takes back the last move made with push(), and returns it.
+        """
+        assert len(self.history) > 0, "Error: pop() called but there is no move to take back"
+        move, changed = self.history.pop()
+        for sid, piece in changed:
+            self.put_piece_by_sid(sid, piece)
+        return move
+
+    def get_changed_squares(self, move: int) -> list[str]:
+        """
+        Squares whose piece changes when the move is made.
+        """
+        sq_from, sq_to = SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)]
+        if is_castle(move):
+            row = sq_from[1]
+            rook_sqs = ["h" + row, "f" + row] if move_flags(move) == KING_CASTLE else ["a" + row, "d" + row]
+            return [sq_from, sq_to] + rook_sqs
+        if is_en_passant(move):
+            return [sq_from, sq_to, sq_to[0] + sq_from[1]]
+        return [sq_from, sq_to]
+
+    def make_move(self, move: int, color: str) -> None:
+        sq_from, sq_to = SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)]
         piece = self.get_piece_by_sid(sq_from)
+        if logger.isEnabledFor(logging.DEBUG):  # rendering the move is only worth it if it is logged
+            logger.debug("Attempting to make move %s", move_to_str(move, piece.name))
+
+        if is_castle(move):  # castling move, the rook moves along with the king
+            row = sq_from[1]
+            rsq_from, rsq_to = ("h" + row, "f" + row) if move_flags(move) == KING_CASTLE else ("a" + row, "d" + row)
+            rook = self.get_piece_by_sid(rsq_from)
+            self.clear_square_by_sid(rsq_from)
+            self.put_piece_by_sid(rsq_to, rook)
+        elif is_en_passant(move):
+            pawn_to_capture = sq_to[0] + sq_from[1]
+            assert self.get_piece_by_sid(pawn_to_capture).name == PieceNames.PAWN, str(
+                "Error: en-passant capture detected, but pawn-to-capture not found at %s" % (pawn_to_capture)
+            )
+            self.clear_square_by_sid(pawn_to_capture)
+
+        if is_promotion(move):
+            piece = Piece.of(PieceColors.BLACK if color == "black" else PieceColors.WHITE, promotion_piece_name(move))
+
         self.clear_square_by_sid(sq_from)
-        self.clear_square_by_sid(sq_to)
         self.put_piece_by_sid(sq_to, piece)
 
-    def make_o_o_moves(self, color):
-        row = 8 if color == "black" else 1
-        rsq_from = str("h%d" % (row))
-        ksq_from = str("e%d" % (row))
-        rsq_to = str("f%d" % (row))
-        ksq_to = str("g%d" % (row))
-        rook = self.get_piece_by_sid(rsq_from)
-        king = self.get_piece_by_sid(ksq_from)
-        self.clear_square_by_sid(rsq_from)
-        self.clear_square_by_sid(ksq_from)
-        self.put_piece_by_sid(rsq_to, rook)
-        self.put_piece_by_sid(ksq_to, king)
-
-    def make_o_o_o_moves(self, color):
-        row = 8 if color == "black" else 1
-        rsq_from = str("a%d" % (row))
-        ksq_from = str("e%d" % (row))
-        rsq_to = str("d%d" % (row))
-        ksq_to = str("c%d" % (row))
-        rook = self.get_piece_by_sid(rsq_from)
-        king = self.get_piece_by_sid(ksq_from)
-        self.clear_square_by_sid(rsq_from)
-        self.clear_square_by_sid(ksq_from)
-        self.put_piece_by_sid(rsq_to, rook)
-        self.put_piece_by_sid(ksq_to, king)
-
-    def make_pawn_moves(self, move, color):
-        sq_from = move[0:2]
-        piece = self.get_piece_by_sid(sq_from)
-        if "=" in move:  # pawn promotion
-            promoted_to = move.split("=")[1]
-            color = PieceColors.BLACK if color == "black" else PieceColors.WHITE
-            if promoted_to == "Q":
-                piece = Piece(color, PieceNames.QUEEN)
-            elif promoted_to == "R":
-                piece = Piece(color, PieceNames.ROOK)
-            elif promoted_to == "B":
-                piece = Piece(color, PieceNames.BISHOP)
-            elif promoted_to == "N":
-                piece = Piece(color, PieceNames.KNIGHT)
-            else:
-                print("Error: unknown piece to promote pawn to: %s" % (promoted_to))
-                sys.exit()
-
-        if move[2] == "x":
-            sq_to = move[3:5]
-            captured_piece = self.get_piece_by_sid(sq_to)
-            if captured_piece.name == PieceNames.EMPTY:  # must be an en-passant capture
-                pawn_to_capture = str("%s%s" % (sq_to[0], sq_from[1]))
-                assert self.get_piece_by_sid(pawn_to_capture).name == PieceNames.PAWN, str(
-                    "Error: en-passant capture detected, but pawn-to-capture not found at %s" % (pawn_to_capture)
-                )
-                self.clear_square_by_sid(sq_from)
-                self.clear_square_by_sid(pawn_to_capture)
-                self.put_piece_by_sid(sq_to, piece)
-            else:
-                self.clear_square_by_sid(sq_from)
-                self.clear_square_by_sid(sq_to)
-                self.put_piece_by_sid(sq_to, piece)
-        else:
-            sq_to = move[2:4]
-            self.clear_square_by_sid(sq_from)
-            self.clear_square_by_sid(sq_to)
-            self.put_piece_by_sid(sq_to, piece)
-
-    def make_move(self, move: str, color: str) -> None:
-        pp.pprint("Attempting to make move %s" % (move))
-        if move[0] in ["R", "B", "N", "Q", "K"]:  # non-pawn moves
-            self.make_non_pawn_moves(move)
-        elif move == "O-O":  # castling move
-            self.make_o_o_moves(color)
-        elif move == "O-O-O":
-            self.make_o_o_o_moves(color)
-        else:  # must be a pawn move
-            self.make_pawn_moves(move, color)
-
     def to_image(self, out_file: str = "board_position.jpg", flipped: bool = False) -> None:
+        # rendering state lives in core/renderer.py, only loaded (with PIL) once a board is rendered
+        from ch_ss.game_engine.core.renderer import render_position
 
-        # global settings
-        _, margin, colors, font = (
-            self.board_len,
-            self.margin,
-            self.colors,
-            self.font,
-        )
-
-        # calculated settings
-        w, h, square_len = self.w, self.h, self.square_len
-
-        # creating new Image object
-        img = Image.new("RGB", (w, h), (255, 255, 255, 0))
-        d = ImageDraw.Draw(img)
-
-        # create board with pieces
-        for square_id, square in self.squares.items():
-
-            # calculate (x,y) coordinates, and colors
-            i, j = square.x_y
-            if flipped:
-                top_left_x = margin + (7 - j) * square_len
-                top_left_y = margin + (7 - i) * square_len
-            else:
-                top_left_x = margin + j * square_len
-                top_left_y = margin + i * square_len
-            color = colors[0] if ((i + j) % 2) else colors[1]
-            shape = [
-                (top_left_x, top_left_y),
-                (top_left_x + square_len, top_left_y + square_len),
-            ]
-
-            # draw the rectangle
-            d.rectangle(shape, fill=color, outline="black")
-
-            # paste piece image on the square
-            if not square.is_unoccupied():
-                # load the piece image and get the size of the image
-                piece_img = Image.open(square.piece.img_fpath)
-                px, py = piece_img.size
-
-                # we need to resize it programmatically, since each piece has
-                # different height/width
-                ratio = py / 70
-                px, py = int(px / ratio), 70
-                piece_img = piece_img.resize((px, py))
-
-                # calculate the location of the piece based on current square
-                # and piece image's height/width
-                loc_x = int(top_left_x + (square_len / 2) - int(px / 2))
-                loc_y = int(top_left_y + (square_len / 2) - int(py / 2))
-                img.paste(piece_img, (loc_x, loc_y), mask=piece_img)
-
-            # write square ids in the corner squares
-            char = "h" if flipped else "a"
-            num = "8" if flipped else "1"
-            if num in square_id:
-                text = re.sub(num, "", square_id)
-                loc_x = top_left_x + 5
-                loc_y = top_left_y + square_len - 20
-                d.text((loc_x, loc_y), text, "#3b3b3b", font=font)
-            if char in square_id:
-                text = re.sub(char, "", square_id)
-                loc_x = top_left_x + 5
-                loc_y = top_left_y + 5
-                d.text((loc_x, loc_y), text, "#3b3b3b", font=font)
-
-        # save the image
-        img.save(out_file)
+        # one copy of the cached empty board, plus a paste of a cached sprite per piece
+        render_position(self.position, flipped).save(out_file)
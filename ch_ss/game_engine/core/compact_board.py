@@ -0,0 +1,143 @@
+"""
+Compact, array-backed representation of the pieces on a chessboard: a
+64-byte mailbox of piece codes, plus a bitboard of each piece code kept in
+sync with it. Square and Piece objects are only created when asked for.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.core.square import Square
+from ch_ss.game_engine.utils.tables import SQUARE_NAMES
+
+# Piece codes stored in the mailbox: 0 is an empty square, 1-6 are the white
+# pawn, knight, bishop, rook, queen and king, and 9-14 the black ones
+BLACK_CODE_BIT = 8
+CODE_PIECE_NAMES = [
+    PieceNames.EMPTY,
+    PieceNames.PAWN,
+    PieceNames.KNIGHT,
+    PieceNames.BISHOP,
+    PieceNames.ROOK,
+    PieceNames.QUEEN,
+    PieceNames.KING,
+]
+
+# Interned piece of each code, shared by all views
+PIECES_BY_CODE: List[Piece] = [Piece.of()] * 16
+for _code, _name in enumerate(CODE_PIECE_NAMES[1:], start=1):
+    PIECES_BY_CODE[_code] = Piece.of(PieceColors.WHITE, _name)
+    PIECES_BY_CODE[_code | BLACK_CODE_BIT] = Piece.of(PieceColors.BLACK, _name)
+
+
+def piece_code(piece: Optional[Piece]) -> int:
+    """
+    Mailbox code of a piece, 0 for None or an empty piece.
+    """
+    if piece is None or piece.is_empty():
+        return 0
+    code = CODE_PIECE_NAMES.index(piece.name)
+    return code | BLACK_CODE_BIT if piece.color == PieceColors.BLACK else code
+
+
+class CompactBoard:
+    """
+    Pieces on the board as a bytearray mailbox indexed by square (see
+    utils/tables.py), and a bitboard per piece code. Copying a position, or
+    sending it to another process, only copies the 64-byte mailbox.
+    """
+
+    __slots__ = ["mailbox", "bitboards"]
+
+    def __init__(self, mailbox: Optional[bytes] = None) -> None:
+        self.mailbox = bytearray(64) if mailbox is None else bytearray(mailbox)
+        assert len(self.mailbox) == 64, str("Error: mailbox must have 64 squares, got %d" % (len(self.mailbox)))
+
+        self.bitboards = [0] * 16
+        for sq, code in enumerate(self.mailbox):
+            if code:
+                self.bitboards[code] |= 1 << sq
+
+    def __reduce__(self) -> Tuple[type, Tuple[bytes]]:
+        """
+        Pickles only the mailbox, the bitboards are rebuilt from it.
+        """
+        return CompactBoard, (bytes(self.mailbox),)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return self.mailbox == other.mailbox
+
+    def copy(self) -> "CompactBoard":
+        board = CompactBoard.__new__(CompactBoard)
+        board.mailbox = bytearray(self.mailbox)
+        board.bitboards = list(self.bitboards)
+        return board
+
+    def get_piece(self, sq: int) -> Piece:
+        return PIECES_BY_CODE[self.mailbox[sq]]
+
+    def put_piece(self, sq: int, piece: Optional[Piece]) -> None:
+        """
+        Puts the piece on the square, None or an empty piece clears it.
+        """
+        old = self.mailbox[sq]
+        if old:
+            self.bitboards[old] &= ~(1 << sq)
+
+        code = piece_code(piece)
+        self.mailbox[sq] = code
+        if code:
+            self.bitboards[code] |= 1 << sq
+
+    def get_square(self, sq: int) -> Square:
+        """
+        Square view of the mailbox entry, with the same coordinates as the
+        squares of Board.
+        """
+        return Square(self.get_piece(sq), (7 - (sq >> 3), sq & 7), SQUARE_NAMES[sq])
+
+    def occupied_by(self, color: PieceColors) -> int:
+        """
+        Bitboard of the squares holding a piece of color.
+        """
+        first = BLACK_CODE_BIT + 1 if color == PieceColors.BLACK else 1
+        occupied = 0
+        for bitboard in self.bitboards[first : first + 6]:
+            occupied |= bitboard
+        return occupied
+
+    def get_piece_bitboards(self, color: PieceColors) -> Dict[PieceNames, int]:
+        """
+        Bitboard of each piece type of color that is on the board, kept up to
+        date by put_piece(), in the layout used by utils/gen_moves.py.
+        """
+        first = BLACK_CODE_BIT + 1 if color == PieceColors.BLACK else 1
+        return {
+            CODE_PIECE_NAMES[code & 7]: bitboard
+            for code, bitboard in enumerate(self.bitboards[first : first + 6], start=first)
+            if bitboard
+        }
+
+    def king_square(self, color: PieceColors) -> int:
+        """
+        Square of the king of color, -1 if it is not on the board.
+        """
+        code = CODE_PIECE_NAMES.index(PieceNames.KING)
+        return self.bitboards[code | BLACK_CODE_BIT if color == PieceColors.BLACK else code].bit_length() - 1
+
+    def iter_pieces(self, color: PieceColors) -> Iterator[Tuple[int, Piece]]:
+        """
+        Yields the square and piece of each piece of color, lowest square
+        first.
+        """
+        occupied = self.occupied_by(color)
+        while occupied:
+            lsb = occupied & -occupied
+            sq = lsb.bit_length() - 1
+            occupied ^= lsb
+            yield sq, PIECES_BY_CODE[self.mailbox[sq]]
+
+    def get_pieces_by_color(self, color: PieceColors) -> Dict[str, Piece]:
+        return {SQUARE_NAMES[sq]: piece for sq, piece in self.iter_pieces(color)}
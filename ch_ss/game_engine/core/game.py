@@ -1,30 +1,143 @@
-import pprint as pp
-import sys
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
 
+from ch_ss.game_engine.core.adjudication import (
+    Adjudication,
+    is_insufficient_material,
+    material_margin,
+)
 from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.compact_board import CODE_PIECE_NAMES, CompactBoard
+from ch_ss.game_engine.core.game_state import GameState
+from ch_ss.game_engine.core.piece import PieceNames
 from ch_ss.game_engine.core.player import Player
+from ch_ss.game_engine.utils.fen import fen_to_game_state, game_state_to_fen
+from ch_ss.game_engine.utils.move import NULL_MOVE, is_capture, move_from, move_to_str
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+if TYPE_CHECKING:  # PIL is only loaded once the game is rendered
+    from ch_ss.game_engine.core.renderer import FrameRenderer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GameOutcome:
+    """
+    How a game ended: its result ('1-0', '0-1' or '1/2-1/2') and the reason,
+    e.g. 'checkmate', 'stalemate', or one of the reasons of
+    StandardGame.adjudicate().
+    """
+
+    result: str
+    reason: str
+
+    @property
+    def winner(self) -> Optional[str]:
+        return {"1-0": "white", "0-1": "black"}.get(self.result)
+
+
+@dataclass(frozen=True)
+class MoveEvent:
+    """
+    Record of a move played in a game, passed to the move listeners of
+    StandardGame: the ply it was played on (1 for white's first move), the
+    player ('white' or 'black') that played it, the move encoded as in
+    utils/move.py and in our custom algebraic notation, and whether it gives
+    check.
+    """
+
+    ply: int
+    side: str
+    move: int
+    move_str: str
+    check: bool
+
+
+# Message logged by StandardGame.tick() for each way a game can end
+OUTCOME_MESSAGES = {
+    "checkmate": "Checkmate! %s wins!",
+    "stalemate": "Draw, it's a stalemate!",
+    "threefold repetition": "Draw by threefold repetition.",
+    "50-move rule": "Draw, 50 moves without a capture or a pawn move.",
+    "insufficient material": "Draw, neither side has the material to checkmate.",
+    "resignation": "%s wins, the opponent resigned a lost position.",
+    "adjudicated draw": "Draw agreed, the material stayed level.",
+}
 
 
 class StandardGame:
-    def __init__(self) -> None:
+    def __init__(self, adjudication: Optional[Adjudication] = None) -> None:
 
         # initialize board, pieces, and players
         self.board = Board(board_config="standard")
         self.white_player = Player("white", self.print_game_state_debug)
         self.black_player = Player("black", self.print_game_state_debug)
 
-        # game level states
+        # game level states, castling bits start as h1 rook, king, a1 rook (O-O, N/A, O-O-O) not moved
         self.move_num = 0
-        self.white_states = {
-            "en_passant": ("d", True),
-            "castling": [True, True, True],  # h1 rook, king, a1 rook (O-O, N/A, O-O-O)
-        }
-        self.black_states = {
-            "en_passant": ("x", False),
-            "castling": [True, True, True],  # h8 rook, king, a8 rook (O-O, N/A, O-O-O)
-        }
-        self.to_move = "white"
-        self.consecutive_non_capture_moves = 0
+        self.state = GameState(board=bytes(self.board.position.mailbox))
+        self.state = self.state.replace(zobrist_key=self.board.zobrist_key ^ self.state.get_state_key())
+
+        # game states replaced by each move made with push(), for pop()
+        self.history: list[GameState] = []
+
+        # renderer of each perspective, repainting only the squares changed since the last image
+        self.frame_renderers: dict[str, "FrameRenderer"] = {}
+
+        # called with a MoveEvent for each move played, events are only built if there is a listener
+        self.move_listeners: list[Callable[[MoveEvent], None]] = []
+
+        # rules ending the game besides checkmate and stalemate, and the material margin after each move
+        self.adjudication = adjudication or Adjudication()
+        self.material_margins = [material_margin(self.board.position)]
+
+        # legal moves of the position with this zobrist key, started by mate_outcome() and reused by step()
+        self.pending_moves: Optional[tuple[int, Iterator[int]]] = None
+
+    @classmethod
+    def from_fen(cls, fen: str, adjudication: Optional[Adjudication] = None) -> "StandardGame":
+        """
+        Game starting from the position of a FEN, with its castling rights,
+        en-passant square and move counters.
+        """
+        game = cls(adjudication)
+        game.state, fullmove = fen_to_game_state(fen)
+        game.board.set_position(game.state.board)
+        game.material_margins = [material_margin(game.board.position)]
+        game.move_num = (fullmove - 1) * 2 + (1 if game.state.to_move == "black" else 0)
+        return game
+
+    def to_fen(self) -> str:
+        return game_state_to_fen(self.state, self.move_num // 2 + 1)
+
+    @property
+    def to_move(self) -> str:
+        return self.state.to_move
+
+    @property
+    def zobrist_key(self) -> int:
+        return self.state.zobrist_key
+
+    @property
+    def last_move(self) -> int:
+        return self.board.history[-1][0] if self.board.history else NULL_MOVE
+
+    @property
+    def last_move_str(self) -> str:
+        """
+        Last move in our custom algebraic notation, read from the piece that
+        stood on its from-square (the first square the move changed).
+        """
+        assert len(self.board.history) > 0, "Error: last_move_str read but no move was played"
+        move, changed = self.board.history[-1]
+        return move_to_str(move, changed[0][1].name)
+
+    @property
+    def consecutive_non_capture_moves(self) -> int:
+        return self.state.halfmove_clock
 
     def play_bot_move(self, player: str) -> None:
         if player == "white":
@@ -34,63 +147,207 @@ class StandardGame:
     def play_move(self, player: str, move: str) -> None:
         pass
 
-    def tick(self) -> None:
-        pp.pprint("[Game-Tick-%d] %s to move:" % (self.move_num, self.to_move))
-
-        last_move_by = self.to_move
-        if self.to_move == "white":
+    def tick(self) -> Optional[GameOutcome]:
+        """
+        Plays one move of a bot game, logging the game's progress. Returns
+        how the game ended if it is over, None otherwise.
+        """
+        logger.info("[Game-Tick-%d] %s to move:", self.move_num, self.to_move)
 
-            player_pieces = self.board.get_pieces_by_color("white")
-            opp_pieces = self.board.get_pieces_by_color("black")
-            en_passant, castling, move = self.white_player.tick(
-                self.white_states, player_pieces, opp_pieces, strategy="capturebot5000"
-            )
-            self.black_states["en_passant"] = en_passant
-            self.white_states["castling"] = castling
-            self.to_move = "black"
+        outcome = self.step()
+        if outcome is not None:
+            if outcome.winner is not None:
+                logger.info(OUTCOME_MESSAGES[outcome.reason], outcome.winner)
+            else:
+                logger.info(OUTCOME_MESSAGES[outcome.reason])
+        return outcome
 
-        elif self.to_move == "black":
+    def add_move_listener(self, listener: Callable[[MoveEvent], None]) -> None:
+        """
+        Calls listener with a MoveEvent for every move played from now on.
+        """
+        self.move_listeners.append(listener)
 
-            player_pieces = self.board.get_pieces_by_color("black")
-            opp_pieces = self.board.get_pieces_by_color("white")
-            en_passant, castling, move = self.black_player.tick(
-                self.black_states, player_pieces, opp_pieces, strategy="capturebot5000"
-            )
-            self.white_states["en_passant"] = en_passant
-            self.black_states["castling"] = castling
-            self.to_move = "white"
+    def step(self, strategy: str = "capturebot5000") -> Optional[GameOutcome]:
+        """
+        Lets the player to move pick a move with the strategy, and plays it.
+        Returns how the game ended if it is over, either because the player
+        had no legal move left or because of the move played, None
+        otherwise.
+        """
+        player = self.white_player if self.state.to_move == "white" else self.black_player
+        player.under_check = self.is_check()
+        if player.under_check:
+            logger.info("-> %s is under check!", player.name)
 
+        # only the move is picked here, push() derives the game state after it. The moves are already
+        # under way if adjudicate() checked this position for mate
+        if self.pending_moves is not None and self.pending_moves[0] == self.zobrist_key:
+            moves = self.pending_moves[1]
         else:
+            moves = self.iter_legal_moves()
+        self.pending_moves = None
+        move = player.evaluate_move(strategy, moves)
+        if move is None:  # no legal moves left
+            if player.under_check:
+                return GameOutcome("1-0" if self.state.opponent == "white" else "0-1", "checkmate")
+            return GameOutcome("1/2-1/2", "stalemate")
 
-            pp.pprint("Error: game.tick() invalid to_move state = %s" % (self.to_move))
-            sys.exit()
+        self.push(move)
+        return self.adjudicate()
 
-        if move == "checkmate":
-            pp.pprint("Checkmate! %s wins!" % (self.to_move))
-            sys.exit()
-        if move == "stalemate":
-            pp.pprint("Draw, it's a stalemate!")
-            sys.exit()
+    def iter_legal_moves(self) -> Iterator[int]:
+        """
+        Legal moves of the side to move, generated lazily from the board's
+        bitboards and attack maps: promotions first, then captures by
+        MVV-LVA, then quiet moves.
+        """
+        to_move, opp = self.state.to_move, self.state.opponent
+        player = self.white_player if to_move == "white" else self.black_player
+        return player.iter_legal_moves(
+            self.state.get_player_states(to_move),
+            opp_attacks=self.board.get_attacked_squares(opp),
+            bitboards=(self.board.get_piece_bitboards(to_move), self.board.get_piece_bitboards(opp)),
+        )
 
-        if "x" in move:
-            self.consecutive_non_capture_moves += 1
-        else:
-            self.consecutive_non_capture_moves = 0
+    def is_check(self) -> bool:
+        """
+        Whether the side to move is in check, a lookup in the attack maps.
+        """
+        king_sq = SQUARE_INDICES[self.board.get_king_sid(self.state.to_move)]
+        return bool((self.board.get_attacked_squares(self.state.opponent) >> king_sq) & 1)
+
+    def adjudicate(self) -> Optional[GameOutcome]:
+        """
+        Ends the game on the position reached by 'checkmate' or 'stalemate'
+        if the side to move has no legal move left, which takes precedence,
+        or else if a rule of self.adjudication applies: a draw by 'threefold
+        repetition', the '50-move rule' or 'insufficient material', a
+        'resignation' of the side that has been down too much material for
+        too long, or an 'adjudicated draw' once the material stays level.
+        Returns None if the game goes on.
+        """
+        # a mate delivered on the 100th ply or on a repeated position still wins
+        outcome = self.mate_outcome()
+        if outcome is not None:
+            return outcome
+
+        rules = self.adjudication
+        clock = self.state.halfmove_clock
+
+        # positions can only repeat since the last capture or pawn move, the key includes the side to move
+        if rules.repetitions and clock >= 4:
+            key = self.zobrist_key
+            repeats = sum(1 for state in self.history[-clock:] if state.zobrist_key == key)
+            if repeats + 1 >= rules.repetitions:
+                return GameOutcome("1/2-1/2", "threefold repetition")
+
+        if rules.fifty_move_plies and clock >= rules.fifty_move_plies:
+            return GameOutcome("1/2-1/2", "50-move rule")
+
+        if rules.insufficient_material and is_insufficient_material(self.board.position):
+            return GameOutcome("1/2-1/2", "insufficient material")
+
+        margins = self.material_margins
+        if rules.resign_margin is not None and len(margins) > rules.resign_plies:
+            recent = margins[-rules.resign_plies :]
+            if min(recent) >= rules.resign_margin:
+                return GameOutcome("1-0", "resignation")
+            if max(recent) <= -rules.resign_margin:
+                return GameOutcome("0-1", "resignation")
 
-        if self.consecutive_non_capture_moves == 50:
-            pp.pprint("Draw, it's a stalemate! 50 moves without capture rule triggered.")
-            sys.exit()
+        if rules.draw_margin is not None and self.move_num >= rules.draw_min_ply and len(margins) > rules.draw_plies:
+            if max(abs(margin) for margin in margins[-rules.draw_plies :]) <= rules.draw_margin:
+                return GameOutcome("1/2-1/2", "adjudicated draw")
 
-        self.board.make_move(move, last_move_by)
+        return None
+
+    def mate_outcome(self) -> Optional[GameOutcome]:
+        """
+        Checkmate or stalemate if the side to move has no legal move, None
+        otherwise. Only the first legal move is generated, and the moves are
+        kept for the next step() to pick from.
+        """
+        moves = self.iter_legal_moves()
+        first = next(moves, None)
+        if first is not None:
+            self.pending_moves = (self.zobrist_key, itertools.chain((first,), moves))
+            return None
+
+        if self.is_check():
+            return GameOutcome("1-0" if self.state.opponent == "white" else "0-1", "checkmate")
+        return GameOutcome("1/2-1/2", "stalemate")
+
+    def push(self, move: int) -> None:
+        """
+        Plays the move for the player to move, keeping the game state it
+        replaces so that pop() can take the move back.
+        """
+        last_move_by, opp = self.state.to_move, self.state.opponent
+        player = self.white_player if last_move_by == "white" else self.black_player
+        opp_pawns = self.board.get_piece_bitboards(opp).get(PieceNames.PAWN, 0)
+        en_passant, castling = player.get_states_after_move(move, self.state.castling, opp_pawns)
+        pawn_move = CODE_PIECE_NAMES[self.board.position.mailbox[move_from(move)] & 7] == PieceNames.PAWN
+        self.board.push(move, last_move_by)
+
+        # the en-passant square is right behind the pawn that was pushed
+        col, offered = en_passant
+        en_passant_sq = SQUARE_INDICES[col + ("3" if last_move_by == "white" else "6")] if offered else -1
+        state = GameState(
+            board=bytes(self.board.position.mailbox),
+            to_move=opp,
+            castling=castling,
+            en_passant_sq=en_passant_sq,
+            halfmove_clock=0 if pawn_move or is_capture(move) else self.state.halfmove_clock + 1,
+        )
+
+        self.history.append(self.state)
+        self.pending_moves = None
+        self.state = state.replace(zobrist_key=self.board.zobrist_key ^ state.get_state_key())
         self.move_num += 1
+        self.material_margins.append(material_margin(self.board.position))
+
+        if self.move_listeners:
+            # the move gives check if the opponent, now to move, is in check
+            event = MoveEvent(self.move_num, last_move_by, move, self.last_move_str, self.is_check())
+            for listener in self.move_listeners:
+                listener(event)
+
+    def pop(self) -> int:
+        """
+        Takes back the last move, restoring the board and the game state
+        (castling rights, en-passant and the move counters) before it.
+        """
+        assert len(self.history) > 0, "Error: pop() called but there is no move to take back"
+        self.state = self.history.pop()
+        self.pending_moves = None
+        self.move_num -= 1
+        self.material_margins.pop()
+        return self.board.pop()
+
+    def compute_zobrist_key(self) -> int:
+        """
+        Zobrist key of the position computed from scratch, to verify
+        self.zobrist_key.
+        """
+        return self.state.compute_zobrist_key()
 
     def print_game_state(self, perspective: str = "white", out_file: str = "board_position.jpg") -> None:
-        self.board.to_image(flipped=perspective == "black", out_file=out_file)
+        """
+        Writes the board as seen by the player to an image, with the squares
+        of the last move highlighted.
+        """
+        from ch_ss.game_engine.core.renderer import FrameRenderer
+
+        if perspective not in self.frame_renderers:
+            self.frame_renderers[perspective] = FrameRenderer(flipped=perspective == "black")
+        self.frame_renderers[perspective].render(self.board.position, self.last_move).save(out_file)
 
     def print_game_state_debug(self, pieces0: dict, pieces1: dict, perspective: str, out_file: str) -> None:
-        board = Board(board_config="empty")
-        for sid, piece in pieces0.items():
-            board.put_piece_by_sid(sid, piece)
-        for sid, piece in pieces1.items():
-            board.put_piece_by_sid(sid, piece)
-        board.to_image(flipped=perspective == "black", out_file=out_file)
+        from ch_ss.game_engine.core.renderer import render_position
+
+        # only the pieces are needed to render, not a whole Board
+        position = CompactBoard()
+        for sid, piece in {**pieces0, **pieces1}.items():
+            position.put_piece(SQUARE_INDICES[sid], piece)
+        render_position(position, flipped=perspective == "black").save(out_file)
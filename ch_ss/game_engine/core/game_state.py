@@ -0,0 +1,139 @@
+"""
+Immutable snapshot of everything that defines a chess position during a game,
+cheap to copy, hash and pickle.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Tuple
+
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.piece import Piece, PieceColors
+from ch_ss.game_engine.utils.move import move_from, move_to
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES, SQUARE_NAMES
+from ch_ss.game_engine.utils.zobrist import state_key, zobrist_hash
+
+# Castling bits of each player, laid out as its castling vector (O-O rook not
+# moved, King not moved, O-O-O rook not moved), white in the low bits
+CASTLING_SHIFTS = {"white": 0, "black": 3}
+ALL_CASTLING = 0b111111
+
+# Castling bits cleared when a piece moves from or onto each square: the right
+# of the rook starting there, or all rights of the king starting there
+CASTLING_MASKS = {
+    SQUARE_INDICES["h1"]: 0b001,
+    SQUARE_INDICES["e1"]: 0b111,
+    SQUARE_INDICES["a1"]: 0b100,
+    SQUARE_INDICES["h8"]: 0b001 << 3,
+    SQUARE_INDICES["e8"]: 0b111 << 3,
+    SQUARE_INDICES["a8"]: 0b100 << 3,
+}
+
+
+def pack_castling(castle_vecs: Dict[str, List[bool]]) -> int:
+    """
+    Packs the castling vectors of the players, keyed by 'white'/'black',
+    into castling bits. A player left out has no castling rights.
+    """
+    bits = 0
+    for color, shift in CASTLING_SHIFTS.items():
+        for i, allowed in enumerate(castle_vecs.get(color, [])):
+            if allowed:
+                bits |= 1 << (shift + i)
+    return bits
+
+
+def unpack_castling(castling: int, color: str) -> List[bool]:
+    """
+    Castling vector of the player, out of the castling bits of both players.
+    """
+    shift = CASTLING_SHIFTS[color]
+    return [bool((castling >> (shift + i)) & 1) for i in range(3)]
+
+
+def update_castling(castling: int, move: int) -> int:
+    """
+    Castling bits of both players once the move is played: moving a king or
+    a rook off its starting square, or capturing a rook on it, clears the
+    rights that piece took part in.
+    """
+    return castling & ~(CASTLING_MASKS.get(move_from(move), 0) | CASTLING_MASKS.get(move_to(move), 0))
+
+
+@dataclass(frozen=True)
+class GameState:
+    """
+    Position of a game: the 64-byte mailbox of a CompactBoard, the player to
+    move, the castling bits of both players, the square a pawn can be
+    captured en-passant onto (-1 if none), the halfmove clock and the Zobrist
+    key of the position (see utils/zobrist.py).
+
+    Game states are frozen and hashed by their Zobrist key, so they can be
+    shared between searches, worker processes and caches without copying.
+    """
+
+    board: bytes
+    to_move: str = "white"
+    castling: int = ALL_CASTLING
+    en_passant_sq: int = -1
+    halfmove_clock: int = 0
+    zobrist_key: int = 0
+
+    def __post_init__(self) -> None:
+        assert self.to_move in ["white", "black"], str("Error: invalid player to move = %s" % (self.to_move))
+        assert len(self.board) == 64, str("Error: board must have 64 squares, got %d" % (len(self.board)))
+
+    def __hash__(self) -> int:
+        return self.zobrist_key
+
+    @property
+    def opponent(self) -> str:
+        return "black" if self.to_move == "white" else "white"
+
+    def replace(self, **changes) -> "GameState":
+        """
+        Copy of the game state with the input fields changed.
+        """
+        return replace(self, **changes)
+
+    def get_compact_board(self) -> CompactBoard:
+        return CompactBoard(self.board)
+
+    def get_pieces_by_color(self, color: str) -> Dict[str, Piece]:
+        to_match = PieceColors.WHITE if color == "white" else PieceColors.BLACK
+        return self.get_compact_board().get_pieces_by_color(to_match)
+
+    def get_castle_vec(self, color: str) -> List[bool]:
+        return unpack_castling(self.castling, color)
+
+    def get_castle_vecs(self) -> Dict[str, List[bool]]:
+        return {color: self.get_castle_vec(color) for color in CASTLING_SHIFTS}
+
+    def get_en_passant(self, color: str) -> Tuple[str, bool]:
+        """
+        En-passant state offered to the player, as (column, offered) in the
+        layout used by Player.
+        """
+        if self.en_passant_sq < 0 or color != self.to_move:
+            return ("x", False)
+        return (SQUARE_NAMES[self.en_passant_sq][0], True)
+
+    def get_player_states(self, color: str) -> dict:
+        """
+        Castling and en-passant states of the player, as expected by
+        Player.tick(). The dictionary is a fresh copy.
+        """
+        return {"en_passant": self.get_en_passant(color), "castling": self.get_castle_vec(color)}
+
+    def get_state_key(self) -> int:
+        """
+        Zobrist key of the side to move, castling rights and en-passant file.
+        """
+        return state_key(self.to_move, self.get_castle_vecs(), self.get_en_passant(self.to_move))
+
+    def compute_zobrist_key(self) -> int:
+        """
+        Zobrist key of the position computed from scratch, to verify
+        self.zobrist_key.
+        """
+        state = {**self.get_pieces_by_color("white"), **self.get_pieces_by_color("black")}
+        return zobrist_hash(state, self.to_move, self.get_castle_vecs(), self.get_en_passant(self.to_move))
@@ -0,0 +1,194 @@
+"""
+Perft (performance test) counts the leaf nodes of the legal move tree up to a
+fixed depth. Comparing the counts of well-known positions against published
+values is the standard correctness test of a move generator, and the time
+taken gives its throughput in nodes per second.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from ch_ss.game_engine.core.game_state import unpack_castling
+from ch_ss.game_engine.core.player import Player, pawn_bitboard
+from ch_ss.game_engine.utils.fen import STANDARD_FEN, fen_to_game_state
+from ch_ss.game_engine.utils.move import is_double_pawn_push, move_from, move_to_str
+from ch_ss.game_engine.utils.tables import SQUARE_NAMES
+
+
+@dataclass(frozen=True)
+class PerftPosition:
+    """
+    Benchmark position with its known perft node counts, keyed by depth.
+    """
+
+    name: str
+    fen: str
+    nodes: dict[int, int] = field(default_factory=dict)
+
+
+# Standard positions from the chess programming community, chosen to cover
+# castling, en-passant (including discovered checks) and promotions
+PERFT_SUITE = [
+    PerftPosition("startpos", STANDARD_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    PerftPosition(
+        "kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        {1: 48, 2: 2039, 3: 97862, 4: 4085603},
+    ),
+    PerftPosition(
+        "endgame-en-passant",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624},
+    ),
+    PerftPosition(
+        "promotions",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        {1: 6, 2: 264, 3: 9467, 4: 422333},
+    ),
+    PerftPosition(
+        "promotion-checks",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        {1: 44, 2: 1486, 3: 62379, 4: 2103487},
+    ),
+    PerftPosition(
+        "illegal-en-passant",
+        "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1",
+        {1: 18, 2: 92, 3: 1670, 4: 10138, 5: 185429, 6: 1134888},
+    ),
+    PerftPosition(
+        "en-passant-check",
+        "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+        {1: 15, 2: 126, 3: 1928, 4: 13931, 5: 206379, 6: 1440467},
+    ),
+    PerftPosition(
+        "promote-out-of-check",
+        "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+        {1: 11, 2: 133, 3: 1442, 4: 19174, 5: 266199, 6: 3821001},
+    ),
+    PerftPosition(
+        "under-promotion-check",
+        "8/P1k5/K7/8/8/8/8/8 w - - 0 1",
+        {1: 6, 2: 27, 3: 273, 4: 1329, 5: 18135, 6: 92683},
+    ),
+]
+
+
+def _print_board_state_func(pieces0: dict, pieces1: dict, perspective: str, out_file: str) -> None:
+    """
+    Perft never renders the board.
+    """
+    pass
+
+
+class Perft:
+    """
+    Walks the legal move tree of a position using the same Player move
+    generation and state updates as StandardGame, playing and taking back
+    moves in-place.
+    """
+
+    def __init__(self, fen: str = STANDARD_FEN) -> None:
+
+        state, _ = fen_to_game_state(fen)
+        self.to_move = state.to_move
+        self.players = {color: Player(color, _print_board_state_func) for color in ["white", "black"]}
+        self.pieces: dict[str, dict] = {color: state.get_pieces_by_color(color) for color in ["white", "black"]}
+
+        # castling bits of both players (see core/game_state.py), and the en-passant state offered to each
+        self.castling = state.castling
+        self.en_passant = {color: state.get_en_passant(color) for color in ["white", "black"]}
+
+    def get_player_states(self, color: str) -> dict:
+        """
+        Castling and en-passant states of the player, as expected by Player.
+        """
+        return {"en_passant": self.en_passant[color], "castling": unpack_castling(self.castling, color)}
+
+    def perft(self, depth: int) -> int:
+        """
+        Number of leaf nodes of the legal move tree, depth plies deep.
+        """
+        if depth == 0:
+            return 1
+
+        moves = self._legal_moves()
+        if depth == 1:
+            return len(moves)
+
+        return sum(self._perft_child(move, depth - 1) for move in moves)
+
+    def divide(self, depth: int) -> dict[str, int]:
+        """
+        Perft node count below each legal move of the root position, keyed
+        by the move in our custom algebraic notation. Comparing these against
+        a reference engine narrows a wrong count down to a single move.
+        """
+        assert depth > 0, "Error: divide() needs a depth of at least 1"
+
+        pieces = self.pieces[self.to_move]
+        return {
+            move_to_str(move, pieces[SQUARE_NAMES[move_from(move)]].name): self._perft_child(move, depth - 1)
+            for move in self._legal_moves()
+        }
+
+    def _legal_moves(self) -> list[int]:
+        opp = "black" if self.to_move == "white" else "white"
+        return self.players[self.to_move].get_all_legal_moves(
+            self.get_player_states(self.to_move), self.pieces[self.to_move], self.pieces[opp]
+        )
+
+    def _perft_child(self, move: int, depth: int) -> int:
+        color = self.to_move
+        opp = "black" if color == "white" else "white"
+        player = self.players[color]
+        my_pieces, opp_pieces = self.pieces[color], self.pieces[opp]
+
+        # remember the game states the move changes, to restore them afterwards
+        saved_en_passant, saved_castling = self.en_passant[opp], self.castling
+
+        # only a double pawn push can offer en-passant, the opponent's pawns are not needed otherwise
+        opp_pawns = pawn_bitboard(opp_pieces) if is_double_pawn_push(move) else 0
+        self.en_passant[opp], self.castling = player.get_states_after_move(move, self.castling, opp_pawns)
+        undo = player.make_move(move, my_pieces, opp_pieces)
+        self.to_move = opp
+
+        nodes = self.perft(depth)
+
+        self.to_move = color
+        player.unmake_move(undo, my_pieces, opp_pieces)
+        self.en_passant[opp], self.castling = saved_en_passant, saved_castling
+
+        return nodes
+
+
+def run_perft_suite(depth: int, positions: list[PerftPosition] = PERFT_SUITE) -> list[dict]:
+    """
+    Runs perft on each benchmark position, at the input depth or the deepest
+    known depth below it.
+
+    Returns:
+        list[dict]: Per position, its name, depth, nodes counted, expected
+        nodes, time taken (seconds) and nodes per second.
+    """
+
+    results = []
+    for position in positions:
+        known_depths = [d for d in position.nodes if d <= depth]
+        d = max(known_depths) if known_depths else depth
+
+        start = time.perf_counter()
+        nodes = Perft(position.fen).perft(d)
+        elapsed = time.perf_counter() - start
+
+        results.append(
+            {
+                "name": position.name,
+                "depth": d,
+                "nodes": nodes,
+                "expected": position.nodes.get(d),
+                "seconds": elapsed,
+                "nps": nodes / elapsed if elapsed > 0 else 0.0,
+            }
+        )
+
+    return results
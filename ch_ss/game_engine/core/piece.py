@@ -115,6 +115,25 @@ class Piece:
         # set piece value from the piece values dictionary above
         super().__setattr__("_value", PieceValues[self._name])
 
+    @classmethod
+    def of(cls, color: PieceColors = PieceColors.EMPTY, name: PieceNames = PieceNames.EMPTY) -> "Piece":
+        """
+        Canonical instance of the piece, interned in INTERNED_PIECES. Pieces
+        are frozen, so one instance can sit on any number of squares, and
+        taking it allocates nothing.
+        """
+        piece = INTERNED_PIECES.get((color, name))
+        if piece is None:
+            raise IllegalPieceException("Illegal piece requested: color=%r, name=%r" % (color, name))
+        return piece
+
+    def is_empty(self) -> bool:
+        """
+        Returns true for the empty piece. The interned empty piece is tested by
+        identity, other instances fall back to comparing the name.
+        """
+        return self is EMPTY_PIECE or self._name is PieceNames.EMPTY
+
     @property
     def name(self) -> PieceNames:
         """
@@ -156,3 +175,13 @@ class Piece:
         return str(
             "Piece(color=%r, name=%r), value=%r, img_fpath=%r" % (self.color, self.name, self.value, self.img_fpath)
         )
+
+
+# Canonical instances of the 13 possible pieces, the empty piece and each
+# color/name pair, keyed by (color, name). Use Piece.of() to look them up.
+INTERNED_PIECES = {(PieceColors.EMPTY, PieceNames.EMPTY): Piece()}
+for _color in [PieceColors.WHITE, PieceColors.BLACK]:
+    for _name in PieceNames:
+        if _name != PieceNames.EMPTY:
+            INTERNED_PIECES[(_color, _name)] = Piece(_color, _name)
+EMPTY_PIECE = INTERNED_PIECES[(PieceColors.EMPTY, PieceNames.EMPTY)]
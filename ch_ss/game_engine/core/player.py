@@ -1,12 +1,84 @@
-import copy
-import pprint as pp
+import logging
 import random
 import sys
-from typing import Callable
-
-from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+from ch_ss.game_engine.core.game_state import (
+    pack_castling,
+    unpack_castling,
+    update_castling,
+)
+from ch_ss.game_engine.core.piece import Piece, PieceNames
+from ch_ss.game_engine.utils.gen_moves import (
+    PROMOTION_ORDER,
+    gen_moves,
+    is_under_check,
+    iter_moves,
+)
+from ch_ss.game_engine.utils.move import (
+    CAPTURE,
+    DOUBLE_PAWN_PUSH,
+    EN_PASSANT,
+    KING_CASTLE,
+    NULL_MOVE,
+    QUEEN_CASTLE,
+    encode_move,
+    is_capture,
+    is_castle,
+    is_double_pawn_push,
+    is_en_passant,
+    is_promotion,
+    move_flags,
+    move_from,
+    move_to,
+    promotion_flags,
+    promotion_piece_name,
+)
+from ch_ss.game_engine.utils.tables import (
+    DIAGONAL_DIRECTIONS,
+    KING_TARGETS,
+    KNIGHT_TARGETS,
+    ORTHOGONAL_DIRECTIONS,
+    PAWN_ATTACK_TARGETS,
+    RAYS,
+    SQUARE_INDICES,
+    SQUARE_NAMES,
+)
 from ch_ss.game_engine.utils.utils import COLUMN_ALPHABETS
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MoveUndo:
+    """
+    Record of a move played in-place by Player.make_move(), holding
+    everything needed to take it back: the piece that moved (before any
+    promotion), the captured piece and where it stood (which differs from
+    sq_to on en-passant captures), and the rook's squares when castling.
+    """
+
+    sq_from: str
+    sq_to: str
+    piece: Piece
+    captured_sq: str = ""
+    captured: Optional[Piece] = None
+    rook_from: str = ""
+    rook_to: str = ""
+
+
+# Strategies a player can pick its moves with, see Player.evaluate_move()
+STRATEGIES = ["naive", "capturebot5000"]
+
+
+def pawn_bitboard(pieces: dict) -> int:
+    """
+    Bitboard of the pawns among pieces, keyed by square ids as in
+    Board.get_pieces_by_color().
+    """
+    return sum(1 << SQUARE_INDICES[sid] for sid, piece in pieces.items() if piece.name == PieceNames.PAWN)
+
 
 class Player:
     def __init__(self, name: str, print_board_state_func: Callable[[dict, dict, str, str], None]) -> None:
@@ -16,258 +88,224 @@ class Player:
         self.print_board_state_func = print_board_state_func
         self.under_check = False
 
-    def naive(self, moves: list[str]) -> str:
+    def naive(self, moves: list[int]) -> Optional[int]:
+        if len(moves) == 0:
+            return None
         idx = random.randint(0, len(moves) - 1)
         return moves[idx]
 
-    def capturebot5000(self, moves: list[str]) -> str:
-        capture_moves = [move for move in moves if "x" in move]
+    def capturebot5000(self, moves: Iterable[int]) -> Optional[int]:
+        # moves come staged (promotions, captures, quiet moves), so stop at the first quiet move after a capture
+        capture_moves, other_moves = [], []
+        for move in moves:
+            if is_capture(move):
+                capture_moves.append(move)
+            elif len(capture_moves) > 0 and not is_promotion(move):
+                break
+            else:
+                other_moves.append(move)
+
         if len(capture_moves) > 0:
             idx = random.randint(0, len(capture_moves) - 1)
             return capture_moves[idx]
-        else:
-            idx = random.randint(0, len(moves) - 1)
-            return moves[idx]
-
-    def evaluate_move(self, strategy: str, moves: list[str]) -> str:
-        move = ""
-        if len(moves) == 0:  # handle checkmate/stalemate
-            if self.under_check:
-                move = "checkmate"
-            else:
-                move = "stalemate"
-        else:
-            # makes a random move
-            if strategy == "naive":
-                move = self.naive(moves)
+        return self.naive(other_moves)
+
+    def evaluate_move(self, strategy: str, moves: Iterable[int]) -> Optional[int]:
+        # none is returned on checkmate/stalemate, told apart by self.under_check
+        assert strategy in STRATEGIES, str("Error: unknown strategy = %s" % (strategy))
+        move = None
+
+        # makes a random move
+        if strategy == "naive":
+            move = self.naive(list(moves))
 
-            # prioritises capture moves over everything else
-            if strategy == "capturebot5000":
-                move = self.capturebot5000(moves)
+        # prioritises capture moves over everything else
+        if strategy == "capturebot5000":
+            move = self.capturebot5000(moves)
 
         return move
 
     def tick(
-        self, states: dict, my_pieces: dict, opp_pieces: dict, strategy: str = "naive"
-    ) -> tuple[tuple[str, bool], list, str]:
-
-        # see if player is under check
-        self.under_check = self.check_if_under_check(my_pieces, opp_pieces)
+        self,
+        states: dict,
+        my_pieces: Optional[dict] = None,
+        opp_pieces: Optional[dict] = None,
+        strategy: str = "naive",
+        opp_attacks: Optional[int] = None,
+        bitboards: Optional[tuple[dict[PieceNames, int], dict[PieceNames, int]]] = None,
+    ) -> tuple[tuple[str, bool], list, Optional[int]]:
+
+        # see if player is under check, a lookup if the board keeps the opponent's attack map
+        if opp_attacks is None:
+            assert my_pieces is not None and opp_pieces is not None, "Error: tick() needs the pieces or attack maps"
+            self.under_check = is_under_check({**my_pieces, **opp_pieces}, self.name)
+        else:
+            king_sq = self.get_king_sq(my_pieces, bitboards)
+            self.under_check = bool((opp_attacks >> king_sq) & 1)
         if self.under_check:
-            print("-> %s is under check!" % (self.name))
-
-        # get all legal moves that player can make in this tick
-        moves = self.get_all_legal_moves(states, my_pieces, opp_pieces)
+            logger.info("-> %s is under check!", self.name)
 
-        # make sure only moves that don't end with king in check are legal
-        moves = self.filter_moves(moves, my_pieces, opp_pieces)
+        # legal moves that player can make in this tick, generated lazily as the strategy asks for them
+        moves = self.iter_legal_moves(states, my_pieces, opp_pieces, opp_attacks, bitboards)
 
-        # pick a move
+        # pick a move, none is left on checkmate/stalemate
         move = self.evaluate_move(strategy, moves)
-        assert move != ""
+        if move is None:
+            return ("x", False), states["castling"], move
 
         # update global states based on picked move
-        en_passant_offered = self.check_en_passant_offered(move, opp_pieces)
-        opp_king_sq = [(key, opp_pieces[key]) for key in opp_pieces if opp_pieces[key].name == PieceNames.KING]
-        assert len(opp_king_sq) == 1, f"Error: Unexpected number of opponent kings {len(opp_king_sq)}"
-
-        castling_states = states["castling"]
-        if move[0] == "R":  # is a rook move
-            sq_from = move[1:3]
-            if sq_from == "h8" and castling_states[0]:
-                castling_states[0] = False
-            if sq_from == "a8" and castling_states[2]:
-                castling_states[2] = False
-        if move[0] == "K":
-            castling_states[1] = False
-        if move[0] == "O":  # castling
-            castling_states = [False, False, False]
+        castling = pack_castling({self.name: states["castling"]})
+        opp_pawns = bitboards[1].get(PieceNames.PAWN, 0) if bitboards is not None else pawn_bitboard(opp_pieces or {})
+        en_passant_offered, castling = self.get_states_after_move(move, castling, opp_pawns)
 
         # return en-passant offered, player's castling vector, and picked move
-        return en_passant_offered, castling_states, move
+        return en_passant_offered, unpack_castling(castling, self.name), move
+
+    def get_king_sq(
+        self, my_pieces: Optional[dict], bitboards: Optional[tuple[dict[PieceNames, int], dict[PieceNames, int]]] = None
+    ) -> int:
+        """
+        Square of the player's king, straight from the board's piece
+        bitboards when given.
+        """
+        if bitboards is not None:
+            assert PieceNames.KING in bitboards[0], str("Error: %s has no king" % (self.name))
+            return bitboards[0][PieceNames.KING].bit_length() - 1
+
+        assert my_pieces is not None, "Error: get_king_sq() needs the pieces or their bitboards"
+        king_sq = [key for key in my_pieces if my_pieces[key].name == PieceNames.KING]
+        assert len(king_sq) == 1, str("Error: Unexpected number of my kings: %d" % (len(king_sq)))
+        return SQUARE_INDICES[king_sq[0]]
+
+    def get_states_after_move(self, move: int, castling: int, opp_pawns: int) -> tuple[tuple[str, bool], int]:
+        """
+        En-passant state offered to the opponent once the move is made, given
+        the bitboard of its pawns, and the castling bits of both players (see
+        core/game_state.py), which the move can take from the opponent too by
+        capturing one of its rooks.
+        """
+        return self.get_en_passant_offered(move, opp_pawns), update_castling(castling, move)
+
+    def get_en_passant_offered(self, move: int, opp_pawns: int) -> tuple[str, bool]:
+        """
+        En-passant state offered by the move: a double pawn push offers it if
+        an opponent's pawn stands right beside the square it lands on.
+        """
+        if not is_double_pawn_push(move):
+            return ("x", False)
+
+        sq_to = move_to(move)
+        col = sq_to & 7
+        beside = (1 << (sq_to - 1) if col > 0 else 0) | (1 << (sq_to + 1) if col < 7 else 0)
+        if opp_pawns & beside:
+            return (COLUMN_ALPHABETS[col], True)
+        return ("x", False)
 
     def check_if_under_check(self, my_pieces: dict, opp_pieces: dict) -> bool:
 
         squares_attacked_by_opp = self.get_squares_attacked_by_opp(my_pieces, opp_pieces)
-        my_king_sq = [key for key in my_pieces if my_pieces[key].name == PieceNames.KING]
-        assert len(my_king_sq) == 1, str("Error: Unexpected number of my kings: %d" % (len(my_king_sq)))
-        if my_king_sq[0] in squares_attacked_by_opp:
+        if SQUARE_NAMES[self.get_king_sq(my_pieces)] in squares_attacked_by_opp:
             return True
         return False
 
     def filter_moves(self, moves: list, my_pieces: dict, opp_pieces: dict) -> list:
         legal_moves = []
         for move in moves:
-            my_pieces_copy, opp_pieces_copy = self.soft_execute_move(move, my_pieces, opp_pieces)
-            if not self.check_if_under_check(my_pieces_copy, opp_pieces_copy):
+            undo = self.make_move(move, my_pieces, opp_pieces)
+            if not self.check_if_under_check(my_pieces, opp_pieces):
                 legal_moves.append(move)
+            self.unmake_move(undo, my_pieces, opp_pieces)
 
         return legal_moves
 
-    def soft_execute_non_pawn_moves(self, move: str, my_pieces: dict, opp_pieces: dict) -> tuple[dict, dict]:
-        sq_from = move[1:3]
-        if move[3] == "x":
-            sq_to = move[4:6]
-            del opp_pieces[sq_to]
-        else:
-            sq_to = move[3:5]
-        piece = my_pieces[sq_from]
-        del my_pieces[sq_from]
-        my_pieces[sq_to] = piece
-
-        return my_pieces, opp_pieces
-
-    def soft_execute_o_o_moves(self, my_pieces: dict) -> dict:
-        king_sq = [x for x in my_pieces if my_pieces[x].name == PieceNames.KING]
-        assert len(king_sq) == 1, str("Error: Unexpected number of kings = %d" % (len(king_sq)))
-        assert king_sq[0][0] == "e", str("Error: Trying O-O, king not on e[x] square! = %s" % (king_sq))
-        king_row = int(king_sq[0][1])
-        rook_sq = str("h%d" % (king_row))
-        assert rook_sq in my_pieces and my_pieces[rook_sq].name == PieceNames.ROOK, str(
-            "Error: Trying O-O, rook missing at %s!" % (rook_sq)
-        )
-        rook = my_pieces[rook_sq]
-        king = my_pieces[king_sq[0]]
-        del my_pieces[rook_sq]
-        del my_pieces[king_sq[0]]
-        my_pieces[str("f%d" % (king_row))] = rook
-        my_pieces[str("g%d" % (king_row))] = king
-
-        return my_pieces
-
-    def soft_execute_o_o_o_moves(self, my_pieces: dict) -> dict:
-        king_sq = [x for x in my_pieces if my_pieces[x].name == PieceNames.KING]
-        assert len(king_sq) == 1, str("Error: Unexpected number of kings = %d" % (len(king_sq)))
-        assert king_sq[0][0] == "e", str("Error: Trying O-O-O, king not on e[x] square! = %s" % (king_sq))
-        king_row = int(king_sq[0][1])
-        rook_sq = str("a%d" % (king_row))
-        assert rook_sq in my_pieces and my_pieces[rook_sq].name == PieceNames.ROOK, str(
-            "Error: Trying O-O-O, rook missing at %s!" % (rook_sq)
-        )
-        rook = my_pieces[rook_sq]
-        king = my_pieces[king_sq[0]]
-        del my_pieces[rook_sq]
-        del my_pieces[king_sq[0]]
-        my_pieces[str("d%d" % (king_row))] = rook
-        my_pieces[str("c%d" % (king_row))] = king
-
-        return my_pieces
-
-    def soft_execute_pawn_moves(self, move: str, my_pieces: dict, opp_pieces: dict) -> tuple[dict, dict]:
-        color = PieceColors.BLACK if self.name == "black" else PieceColors.WHITE
-        promotion_pieces = {
-            "Q": Piece(color, PieceNames.QUEEN),
-            "R": Piece(color, PieceNames.ROOK),
-            "B": Piece(color, PieceNames.BISHOP),
-            "N": Piece(color, PieceNames.KNIGHT),
-        }
-
-        sq_from = move[0:2]
-        if move[2] == "x":
-            sq_to = move[3:5]
-            if sq_to not in opp_pieces:  # must be an en-passant capture
-                pawn_to_capture = str("%s%s" % (sq_to[0], sq_from[1]))
-                assert pawn_to_capture in opp_pieces, str(
-                    "Error: en-passant capture detected, but pawn-to-capture not found at %s" % (pawn_to_capture)
-                )
-                del opp_pieces[pawn_to_capture]
+    def make_move(self, move: int, my_pieces: dict, opp_pieces: dict) -> MoveUndo:
+        """
+        Plays the move in-place on the players' pieces, and returns the record
+        needed by unmake_move() to take it back.
+        """
+        sq_from, sq_to = SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)]
+        undo = MoveUndo(sq_from, sq_to, my_pieces[sq_from])
+        moved_piece = undo.piece
+
+        if is_castle(move):  # castling move, the rook moves along with the king
+            row = sq_from[1]
+            if move_flags(move) == KING_CASTLE:
+                undo.rook_from, undo.rook_to = "h" + row, "f" + row
             else:
-                del opp_pieces[sq_to]
-        else:
-            sq_to = move[2:4]
-        piece = my_pieces[sq_from]  # which must be a pawn
-        if "=" in move:  # pawn promotion
-            promoted_to = move.split("=")[1]
-            piece = promotion_pieces[promoted_to]
+                undo.rook_from, undo.rook_to = "a" + row, "d" + row
+            assert undo.rook_from in my_pieces and my_pieces[undo.rook_from].name == PieceNames.ROOK, str(
+                "Error: Trying to castle, rook missing at %s!" % (undo.rook_from)
+            )
+            my_pieces[undo.rook_to] = my_pieces.pop(undo.rook_from)
+        elif is_en_passant(move):  # the captured pawn is next to the capturing pawn
+            undo.captured_sq = sq_to[0] + sq_from[1]
+        elif is_capture(move):
+            undo.captured_sq = sq_to
+
+        if is_promotion(move):
+            moved_piece = Piece.of(undo.piece.color, promotion_piece_name(move))
+
+        if undo.captured_sq:
+            assert undo.captured_sq in opp_pieces, str(
+                "Error: capture detected, but piece-to-capture not found at %s" % (undo.captured_sq)
+            )
+            undo.captured = opp_pieces.pop(undo.captured_sq)
         del my_pieces[sq_from]
-        my_pieces[sq_to] = piece
-
-        return my_pieces, opp_pieces
-
-    def soft_execute_move(self, move: str, my_pieces: dict, opp_pieces: dict) -> tuple[dict, dict]:
-        my_pieces_copy = copy.deepcopy(my_pieces)
-        opp_pieces_copy = copy.deepcopy(opp_pieces)
-        if move[0] in ["R", "B", "N", "Q", "K"]:  # non-pawn
-            my_pieces_copy, opp_pieces_copy = self.soft_execute_non_pawn_moves(move, my_pieces_copy, opp_pieces_copy)
-        elif move == "O-O":  # castling move
-            my_pieces_copy = self.soft_execute_o_o_moves(my_pieces_copy)
-        elif move == "O-O-O":
-            my_pieces_copy = self.soft_execute_o_o_o_moves(my_pieces_copy)
-        else:  # must be a pawn move
-            my_pieces_copy, opp_pieces_copy = self.soft_execute_pawn_moves(move, my_pieces_copy, opp_pieces_copy)
-
-        return my_pieces_copy, opp_pieces_copy
-
-    def check_edge_cases_for_en_passant_offered(self, col: str, row_to: int, opp_pieces: dict):
-        key = {"a": f"b{row_to}", "h": f"g{row_to}"}
-        if key[col] in opp_pieces:
-            if opp_pieces[key[col]].name == PieceNames.PAWN:
-                return (col, True)
+        my_pieces[sq_to] = moved_piece
 
-        return ("x", False)
+        return undo
 
-    def check_non_edge_cases_for_en_passant_offered(self, col: str, row_to: int, opp_pieces: dict):
-        idx = COLUMN_ALPHABETS.index(col)
-        for c in [-1, 1]:
-            key = f"{COLUMN_ALPHABETS[idx + c]}{row_to}"
-            if key in opp_pieces:
-                if opp_pieces[key].name == PieceNames.PAWN:
-                    return (col, True)
+    def unmake_move(self, undo: MoveUndo, my_pieces: dict, opp_pieces: dict) -> None:
+        """
+        Takes back a move played with make_move(), restoring the players'
+        pieces in-place.
+        """
+        del my_pieces[undo.sq_to]
+        my_pieces[undo.sq_from] = undo.piece
+        if undo.rook_from:
+            my_pieces[undo.rook_from] = my_pieces.pop(undo.rook_to)
+        if undo.captured is not None:
+            opp_pieces[undo.captured_sq] = undo.captured
 
-        return ("x", False)
-
-    def check_en_passant_offered(self, move: str, opp_pieces: dict) -> tuple[str, bool]:
-
-        # Trivial cases
-        if (
-            (move in ["checkmate", "stalemate"]) or (move[0] in ["R", "B", "N", "Q", "K", "O"]) or ("x" in move)
-        ):  # trivial case
-            return ("x", False)
-
-        to_return = ("x", False)
-        row_from = int(move[1])
-        row_to = int(move[3])
-        if abs(row_to - row_from) == 2:  # two steps forward moved
-            assert move[2] == move[0], f"Error: Illegal pawn move: {move}"
-            col = move[0]
-            if col in ["a", "h"]:  # edge-cases
-                to_return = self.check_edge_cases_for_en_passant_offered(col, row_to, opp_pieces)
-            else:
-                to_return = self.check_non_edge_cases_for_en_passant_offered(col, row_to, opp_pieces)
-
-        return to_return
+    def check_en_passant_offered(self, move: int, opp_pieces: dict) -> tuple[str, bool]:
+        return self.get_en_passant_offered(move, pawn_bitboard(opp_pieces))
 
     def get_all_non_king_moves(self, states: dict, my_pieces: dict, opp_pieces: dict) -> tuple[list, list]:
 
         moves = []
         squares_attacked = []
 
+        # pieces of each type, grouped in a single pass
+        pieces_by_name: dict[PieceNames, list[tuple[str, Piece]]] = {name: [] for name in PieceNames}
+        for key, piece in my_pieces.items():
+            pieces_by_name[piece.name].append((key, piece))
+
         # get all legal pawn moves
-        pawns = [(key, my_pieces[key]) for key in my_pieces if my_pieces[key].name == PieceNames.PAWN]
+        pawns = pieces_by_name[PieceNames.PAWN]
         pawn_moves, sq_attacked = self.evaluate_pawn_moves(pawns, opp_pieces, my_pieces, states["en_passant"])
         moves.extend(pawn_moves)
         squares_attacked.extend(sq_attacked)
 
         # get all legal horsie moves
-        knights = [(key, my_pieces[key]) for key in my_pieces if my_pieces[key].name == PieceNames.KNIGHT]
+        knights = pieces_by_name[PieceNames.KNIGHT]
         knight_moves, sq_attacked = self.evaluate_knight_moves(knights, opp_pieces, my_pieces)
         moves.extend(knight_moves)
         squares_attacked.extend(sq_attacked)
 
         # get all legal bishop moves
-        bishops = [(key, my_pieces[key]) for key in my_pieces if my_pieces[key].name == PieceNames.BISHOP]
+        bishops = pieces_by_name[PieceNames.BISHOP]
         bishop_moves, sq_attacked = self.evaluate_bishop_moves(bishops, opp_pieces, my_pieces)
         moves.extend(bishop_moves)
         squares_attacked.extend(sq_attacked)
 
         # get all legal rook moves
-        rooks = [(key, my_pieces[key]) for key in my_pieces if my_pieces[key].name == PieceNames.ROOK]
+        rooks = pieces_by_name[PieceNames.ROOK]
         rook_moves, sq_attacked = self.evaluate_rook_moves(rooks, opp_pieces, my_pieces)
         moves.extend(rook_moves)
         squares_attacked.extend(sq_attacked)
 
         # get all legal queen moves
-        queens = [(key, my_pieces[key]) for key in my_pieces if my_pieces[key].name == PieceNames.QUEEN]
+        queens = pieces_by_name[PieceNames.QUEEN]
         queen_moves, sq_attacked = self.evaluate_queen_moves(queens, opp_pieces, my_pieces)
         moves.extend(queen_moves)
         squares_attacked.extend(sq_attacked)
@@ -302,7 +340,59 @@ class Player:
 
         return squares_attacked_by_opp
 
-    def get_all_legal_moves(self, states: dict, my_pieces: dict, opp_pieces: dict) -> list[str]:
+    def get_all_legal_moves(
+        self,
+        states: dict,
+        my_pieces: Optional[dict] = None,
+        opp_pieces: Optional[dict] = None,
+        opp_attacks: Optional[int] = None,
+        bitboards: Optional[tuple[dict[PieceNames, int], dict[PieceNames, int]]] = None,
+    ) -> list[int]:
+
+        castle_vec, last_move = self.get_gen_moves_states(states)
+        state = self.get_gen_moves_board(my_pieces, opp_pieces, bitboards)
+        return gen_moves(state, self.name, castle_vec, last_move, opp_attacks, bitboards)
+
+    def iter_legal_moves(
+        self,
+        states: dict,
+        my_pieces: Optional[dict] = None,
+        opp_pieces: Optional[dict] = None,
+        opp_attacks: Optional[int] = None,
+        bitboards: Optional[tuple[dict[PieceNames, int], dict[PieceNames, int]]] = None,
+    ) -> Iterator[int]:
+
+        # promotions first, then captures by MVV-LVA, then quiet moves
+        castle_vec, last_move = self.get_gen_moves_states(states)
+        state = self.get_gen_moves_board(my_pieces, opp_pieces, bitboards)
+        return iter_moves(state, self.name, castle_vec, last_move, opp_attacks, bitboards)
+
+    def get_gen_moves_board(
+        self,
+        my_pieces: Optional[dict],
+        opp_pieces: Optional[dict],
+        bitboards: Optional[tuple[dict[PieceNames, int], dict[PieceNames, int]]],
+    ) -> dict:
+
+        # the board's piece bitboards, when given, save rebuilding them from the piece dictionaries
+        if bitboards is not None:
+            return {}
+        assert my_pieces is not None and opp_pieces is not None, "Error: moves need the pieces or their bitboards"
+        return {**my_pieces, **opp_pieces}
+
+    def get_gen_moves_states(self, states: dict) -> tuple[tuple[bool, bool, bool], int]:
+
+        # the bitboard generator expects the opponent's last move to work out en-passant captures
+        col, offered = states["en_passant"]
+        last_move = NULL_MOVE
+        if offered:
+            sq = SQUARE_INDICES[col + ("7" if self.name == "white" else "2")]
+            last_move = encode_move(sq, sq - 16 if self.name == "white" else sq + 16, DOUBLE_PAWN_PUSH)
+
+        castling = states["castling"]
+        return (castling[0], castling[1], castling[2]), last_move
+
+    def get_all_pseudo_legal_moves(self, states: dict, my_pieces: dict, opp_pieces: dict) -> list[int]:
 
         moves, _ = self.get_all_non_king_moves(states, my_pieces, opp_pieces)
 
@@ -338,174 +428,84 @@ class Player:
         squares_attacked = []
 
         k, piece = king
-        col, row = [x for x in k]
-        row = int(row)
-
-        possible_moves = [
-            (0, 1),
-            (0, -1),
-            (1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 0),
-            (-1, 1),
-            (-1, -1),
-        ]
-        for move in possible_moves:
-
-            # get index of column alphabet
-            col_idx = COLUMN_ALPHABETS.index(col)
-            if -1 < (col_idx + move[0]) < 8 and 0 < (row + move[1]) < 9:
-                new_loc = str("%s%d" % (COLUMN_ALPHABETS[col_idx + move[0]], row + move[1]))
-
-                if ignore_checks:
-                    if new_loc in opp_pieces:
-                        moves.append(str("K%s%dx%s" % (col, row, new_loc)))
-                    else:
-                        moves.append(new_loc)
-                    squares_attacked.append(new_loc)
-                else:
-                    if new_loc not in my_pieces:  # king is free to move there
-                        if new_loc not in protected_squares:
-                            if new_loc in opp_pieces:
-                                moves.append(str("K%s%dx%s" % (col, row, new_loc)))
-                            else:
-                                moves.append(str("K%s%d%s" % (col, row, new_loc)))
-                            squares_attacked.append(new_loc)
+        row = int(k[1])
+        sq = SQUARE_INDICES[k]
+
+        for target in KING_TARGETS[sq]:
+            new_loc = SQUARE_NAMES[target]
+
+            if ignore_checks:
+                moves.append(encode_move(sq, target, CAPTURE if new_loc in opp_pieces else 0))
+                squares_attacked.append(new_loc)
+            else:
+                if new_loc not in my_pieces:  # king is free to move there
+                    if new_loc not in protected_squares:
+                        moves.append(encode_move(sq, target, CAPTURE if new_loc in opp_pieces else 0))
+                        squares_attacked.append(new_loc)
 
         # check castling
-        castling_states = states["castling"]
+        castling_states = list(states["castling"])
         if not self.under_check:
             if castling_states[0] and castling_states[1]:  # test O-O
                 # if these states are true, then king must be on row 1 or row 8
                 # king can castle if rooks are under threat
                 can_castle = True
-                for sq in [str("f%d" % (row)), str("g%d" % (row))]:
-                    if (sq in my_pieces) or (sq in opp_pieces) or (sq in protected_squares):
+                for square in [str("f%d" % (row)), str("g%d" % (row))]:
+                    if (square in my_pieces) or (square in opp_pieces) or (square in protected_squares):
                         can_castle = False
                 if can_castle:
-                    moves.append("O-O")  # this move doesn't 'attack' squares
+                    moves.append(encode_move(sq, sq + 2, KING_CASTLE))  # this move doesn't 'attack' squares
 
             if castling_states[2] and castling_states[1]:  # test O-O-O
                 # if these states are true, then king must be on row 1 or row 8
                 # king can castle if rooks are under threat
                 can_castle = True
-                for sq in [str("b%d" % (row)), str("c%d" % (row)), str("d%d" % (row))]:
-                    if (sq in my_pieces) or (sq in opp_pieces) or (sq in protected_squares):
+                for square in [str("b%d" % (row)), str("c%d" % (row)), str("d%d" % (row))]:
+                    if (square in my_pieces) or (square in opp_pieces) or (square in protected_squares):
                         can_castle = False
                 if can_castle:
-                    moves.append("O-O-O")  # this move doesn't 'attack' squares
+                    moves.append(encode_move(sq, sq - 2, QUEEN_CASTLE))  # this move doesn't 'attack' squares
 
         return moves, squares_attacked
 
     def evaluate_queen_moves(
         self, queens: list[tuple[str, Piece]], opp_pieces: dict, my_pieces: dict
     ) -> tuple[list, list]:
-        moves = []
-        squares_attacked = []
-
-        for queen in queens:
-            q, _ = queen
-            col, row_str = list(q)
-            row = int(row_str)
-
-            # get index of column alphabet
-            col_idx = COLUMN_ALPHABETS.index(col)
-
-            # test moves
-            possible_directions = [
-                (1, 0),
-                (-1, 0),
-                (0, 1),
-                (0, -1),
-                (1, 1),
-                (1, -1),
-                (-1, 1),
-                (-1, -1),
-            ]
-            for p in possible_directions:
-                mult = 1
-                while -1 < (col_idx + mult * p[0]) < 8 and 0 < (row + mult * p[1]) < 9:
-                    new_loc = str("%s%d" % (COLUMN_ALPHABETS[col_idx + mult * p[0]], row + mult * p[1]))
-                    squares_attacked.append(new_loc)
-
-                    # test capture
-                    if new_loc in opp_pieces:
-                        moves.append(str("Q%s%dx%s" % (col, row, new_loc)))
-                        break
-                    elif new_loc in my_pieces:
-                        break
-                    else:
-                        moves.append(str("Q%s%d%s" % (col, row, new_loc)))
-                        mult += 1
-
-        return moves, squares_attacked
+        return self.evaluate_slider_moves(queens, ORTHOGONAL_DIRECTIONS + DIAGONAL_DIRECTIONS, opp_pieces, my_pieces)
 
     def evaluate_rook_moves(
         self, rooks: list[tuple[str, Piece]], opp_pieces: dict, my_pieces: dict
     ) -> tuple[list, list]:
-        moves = []
-        squares_attacked = []
-
-        for rook in rooks:
-            r, _ = rook
-            col, row_str = list(r)
-            row = int(row_str)
-
-            # get index of column alphabet
-            col_idx = COLUMN_ALPHABETS.index(col)
-
-            # test moves
-            possible_directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-            for p in possible_directions:
-                mult = 1
-                while -1 < (col_idx + mult * p[0]) < 8 and 0 < (row + mult * p[1]) < 9:
-                    new_loc = str("%s%d" % (COLUMN_ALPHABETS[col_idx + mult * p[0]], row + mult * p[1]))
-                    squares_attacked.append(new_loc)
-
-                    # test capture
-                    if new_loc in opp_pieces:
-                        moves.append(str("R%s%dx%s" % (col, row, new_loc)))
-                        break
-                    elif new_loc in my_pieces:
-                        break
-                    else:
-                        moves.append(str("R%s%d%s" % (col, row, new_loc)))
-                        mult += 1
-
-        return moves, squares_attacked
+        return self.evaluate_slider_moves(rooks, ORTHOGONAL_DIRECTIONS, opp_pieces, my_pieces)
 
     def evaluate_bishop_moves(
         self, bishops: list[tuple[str, Piece]], opp_pieces: dict, my_pieces: dict
+    ) -> tuple[list, list]:
+        return self.evaluate_slider_moves(bishops, DIAGONAL_DIRECTIONS, opp_pieces, my_pieces)
+
+    def evaluate_slider_moves(
+        self, pieces: list[tuple[str, Piece]], directions: list[int], opp_pieces: dict, my_pieces: dict
     ) -> tuple[list, list]:
         moves = []
         squares_attacked = []
 
-        for bishop in bishops:
-            b, _ = bishop
-            col, row_str = list(b)
-            row = int(row_str)
+        for p, _ in pieces:
+            sq = SQUARE_INDICES[p]
 
-            # get index of column alphabet
-            col_idx = COLUMN_ALPHABETS.index(col)
-
-            # test moves
-            possible_directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            for p in possible_directions:
-                mult = 1
-                while -1 < (col_idx + mult * p[0]) < 8 and 0 < (row + mult * p[1]) < 9:
-                    new_loc = str("%s%d" % (COLUMN_ALPHABETS[col_idx + mult * p[0]], row + mult * p[1]))
+            # walk each ray outwards until it hits a piece
+            for d in directions:
+                for target in RAYS[sq][d]:
+                    new_loc = SQUARE_NAMES[target]
                     squares_attacked.append(new_loc)  # piece is defending its own piece
 
                     # test capture
                     if new_loc in opp_pieces:
-                        moves.append(str("B%s%dx%s" % (col, row, new_loc)))
+                        moves.append(encode_move(sq, target, CAPTURE))
                         break
                     elif new_loc in my_pieces:
                         break
                     else:
-                        moves.append(str("B%s%d%s" % (col, row, new_loc)))
-                        mult += 1
+                        moves.append(encode_move(sq, target))
 
         return moves, squares_attacked
 
@@ -515,35 +515,17 @@ class Player:
         moves = []
         squares_attacked = []
 
-        for knight in knights:
-            k, _ = knight
-            col, row_str = list(k)
-            row = int(row_str)
-
-            # get index of column alphabet
-            col_idx = COLUMN_ALPHABETS.index(col)
-
-            # test moves
-            possible_moves = [
-                (1, 2),
-                (-1, 2),
-                (-2, 1),
-                (-2, -1),
-                (-1, -2),
-                (1, -2),
-                (2, -1),
-                (2, 1),
-            ]
-            for move in possible_moves:
-                if -1 < (col_idx + move[0]) < 8 and 0 < (row + move[1]) < 9:
-                    new_loc = str("%s%d" % (COLUMN_ALPHABETS[col_idx + move[0]], row + move[1]))
-                    squares_attacked.append(new_loc)  # piece is defending its own piece
+        for k, _ in knights:
+            sq = SQUARE_INDICES[k]
+            for target in KNIGHT_TARGETS[sq]:
+                new_loc = SQUARE_NAMES[target]
+                squares_attacked.append(new_loc)  # piece is defending its own piece
 
-                    # test capture
-                    if new_loc in opp_pieces:
-                        moves.append(str("N%s%dx%s" % (col, row, new_loc)))
-                    elif new_loc not in my_pieces:
-                        moves.append(str("N%s%d%s" % (col, row, new_loc)))
+                # test capture
+                if new_loc in opp_pieces:
+                    moves.append(encode_move(sq, target, CAPTURE))
+                elif new_loc not in my_pieces:
+                    moves.append(encode_move(sq, target))
 
         return moves, squares_attacked
 
@@ -551,137 +533,59 @@ class Player:
         self, pawns: list[tuple[str, Piece]], opp_pieces: dict, my_pieces: dict, en_passant: tuple
     ) -> tuple[list, list]:
 
-        moves = []
+        moves: list[int] = []
         squares_attacked = []
 
-        for pawn in pawns:
-            p, _ = pawn
-            col, row_str = list(p)
-            row = int(row_str)
-
-            assert row not in [1, 8], str("Error: Why is there a pawn on %s?" % (p))
+        if self.name == "white":
+            white = True
+        elif self.name == "black":
+            white = False
+        else:
+            logger.error('Error: Please set player name to "white" or "black", currently: %s', self.name)
+            sys.exit()
 
-            if self.name == "white":
-                direction = 1
-            elif self.name == "black":
-                direction = -1
-            else:
-                pp.pprint('Error: Please set player name to "white" or "black", currently: %s' % (self.name))
-                sys.exit()
+        # flip if looking from opponent's point-of-view
+        if self.opponent_point_of_view:
+            white = not white
+        forward = 8 if white else -8
 
-            # flip if looking from opponent's point-of-view
-            if self.opponent_point_of_view:
-                direction *= -1
+        for p, _ in pawns:
+            sq = SQUARE_INDICES[p]
+            row = (sq >> 3) + 1
 
-            # look one row up
-            row += direction
+            assert row not in [1, 8], str("Error: Why is there a pawn on %s?" % (p))
 
-            # get index of column alphabet
-            idx = COLUMN_ALPHABETS.index(col)
+            # pawns moving onto the last row are promoted
+            promoting = row + (1 if white else -1) in [1, 8]
 
             # check if pawn can capture
-            if idx == 0:  # edge-case: column 'a'
-                squares_attacked.append(str("b%d" % (row)))
-                if str("b%d" % (row)) in opp_pieces:  # enemy piece on capture square
-                    if row in [1, 8]:  # pawn promotion
-                        for promoted_piece in ["Q", "B", "N", "R"]:
-                            moves.append(str("a%dxb%d=%s" % ((row - direction), row, promoted_piece)))
-                    else:
-                        moves.append(str("a%dxb%d" % ((row - direction), row)))
-            elif idx == 7:  # edge-case: column 'h'
-                squares_attacked.append(str("g%d" % (row)))
-                if str("g%d" % (row)) in opp_pieces:  # enemy piece on capture square
-                    if row in [1, 8]:  # pawn promotion
-                        for promoted_piece in ["Q", "B", "N", "R"]:
-                            moves.append(str("h%dxg%d=%s" % ((row - direction), row, promoted_piece)))
-                    else:
-                        moves.append(str("h%dxg%d" % ((row - direction), row)))
-            else:
-                if str("%s%d" % (COLUMN_ALPHABETS[idx - 1], row)) in opp_pieces:
-                    if row in [1, 8]:  # pawn promotion
-                        for promoted_piece in ["Q", "B", "N", "R"]:
-                            moves.append(
-                                str(
-                                    "%s%dx%s%d=%s"
-                                    % (
-                                        col,
-                                        (row - direction),
-                                        COLUMN_ALPHABETS[idx - 1],
-                                        row,
-                                        promoted_piece,
-                                    )
-                                )
-                            )
-                    else:
-                        moves.append(
-                            str(
-                                "%s%dx%s%d"
-                                % (
-                                    col,
-                                    (row - direction),
-                                    COLUMN_ALPHABETS[idx - 1],
-                                    row,
-                                )
-                            )
-                        )
-                if str("%s%d" % (COLUMN_ALPHABETS[idx + 1], row)) in opp_pieces:
-                    if row in [1, 8]:  # pawn promotion
-                        for promoted_piece in ["Q", "B", "N", "R"]:
-                            moves.append(
-                                str(
-                                    "%s%dx%s%d=%s"
-                                    % (
-                                        col,
-                                        (row - direction),
-                                        COLUMN_ALPHABETS[idx + 1],
-                                        row,
-                                        promoted_piece,
-                                    )
-                                )
-                            )
+            for target in PAWN_ATTACK_TARGETS[white][sq]:
+                new_loc = SQUARE_NAMES[target]
+                squares_attacked.append(new_loc)
+                if new_loc in opp_pieces:  # enemy piece on capture square
+                    if promoting:
+                        moves.extend(encode_move(sq, target, promotion_flags(name, True)) for name in PROMOTION_ORDER)
                     else:
-                        moves.append(
-                            str(
-                                "%s%dx%s%d"
-                                % (
-                                    col,
-                                    (row - direction),
-                                    COLUMN_ALPHABETS[idx + 1],
-                                    row,
-                                )
-                            )
-                        )
-
-                squares_attacked.append(str("%s%d" % (COLUMN_ALPHABETS[idx - 1], row)))
-                squares_attacked.append(str("%s%d" % (COLUMN_ALPHABETS[idx + 1], row)))
-
-            # special en passant capture
-            if en_passant[1]:
-                idx_col = COLUMN_ALPHABETS.index(en_passant[0])
-                if idx_col in [(idx + 1), (idx - 1)]:
-                    if self.name == "white" and row == 6:
-                        moves.append(str("%s%dx%s%d" % (col, (row - direction), en_passant[0], row)))
-                    if self.name == "black" and row == 3:
-                        moves.append(str("%s%dx%s%d" % (col, (row - direction), en_passant[0], row)))
-
-                    # this is kind of irrelevant to calculate for king moves, but added in anyways
-                    squares_attacked.append(str("%s%d" % (en_passant[0], row)))
+                        moves.append(encode_move(sq, target, CAPTURE))
+
+                # special en passant capture
+                elif en_passant[1] and new_loc == en_passant[0] + ("6" if white else "3"):
+                    moves.append(encode_move(sq, target, EN_PASSANT))
 
             # check if pawn can move forward
-            new_pos = str("%s%d" % (col, row))
+            new_pos = SQUARE_NAMES[sq + forward]
             if (new_pos not in opp_pieces) and (new_pos not in my_pieces):  # no piece blocking
 
                 # check promotion
-                if row in [1, 8]:  # pawn promotion
-                    for promoted_piece in ["Q", "B", "N", "R"]:
-                        moves.append(str("%s%d%s%d=%s" % (col, (row - direction), col, row, promoted_piece)))
+                if promoting:
+                    moves.extend(encode_move(sq, sq + forward, promotion_flags(name)) for name in PROMOTION_ORDER)
                 else:
-                    moves.append(str("%s%d%s%d" % (col, (row - direction), col, row)))
+                    moves.append(encode_move(sq, sq + forward))
 
                 # if pawn is in the opening rank, it can move forward by two as well
-                if row in [3, 6]:
-                    new_pos = str("%s%d" % (col, row + direction))
+                if row == (2 if white else 7):
+                    new_pos = SQUARE_NAMES[sq + 2 * forward]
                     if (new_pos not in opp_pieces) and (new_pos not in my_pieces):  # no piece blocking
-                        moves.append(str("%s%d%s%d" % (col, (row - direction), col, row + direction)))
+                        moves.append(encode_move(sq, sq + 2 * forward, DOUBLE_PAWN_PUSH))
 
         return moves, squares_attacked
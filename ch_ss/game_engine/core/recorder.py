@@ -0,0 +1,154 @@
+"""
+Records the positions of a game straight into one animated GIF as it is
+played, in process, instead of writing an image file per move and joining
+them with an external video encoder (see scripts/frames2video.sh).
+"""
+
+import struct
+from types import TracebackType
+from typing import BinaryIO, Optional, Tuple, Type
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.renderer import IMAGE_LEN, FrameRenderer
+from ch_ss.game_engine.utils.fen import STANDARD_FEN, fen_to_mailbox
+from ch_ss.game_engine.utils.move import NULL_MOVE, QUIET, encode_move
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+# frames are mapped to the palette without dithering, Image.Dither only exists from Pillow 9.1 on
+NO_DITHER = Image.NONE  # type: ignore[attr-defined]
+
+# palette shared by all GIF frames, built on first use
+_gif_palette: Optional[Image.Image] = None
+
+
+def get_gif_palette() -> Image.Image:
+    """
+    256-color palette of the board images, taken from frames with every
+    piece and highlighted squares of both colors, so frames are mapped to it
+    instead of each being quantized on its own.
+    """
+    global _gif_palette
+    if _gif_palette is None:
+        position = CompactBoard(fen_to_mailbox(STANDARD_FEN.split()[0]))
+        sheet = Image.new("RGB", (IMAGE_LEN, IMAGE_LEN * 2))
+        for i, (sq_from, sq_to) in enumerate([("d1", "e1"), ("d5", "e5")]):
+            move = encode_move(SQUARE_INDICES[sq_from], SQUARE_INDICES[sq_to], QUIET)
+            sheet.paste(FrameRenderer().render(position, move), (0, i * IMAGE_LEN))
+        _gif_palette = sheet.quantize(256)
+    return _gif_palette
+
+
+class GameRecorder:
+    """
+    Streams the positions of a game into an animated GIF. Each position added
+    is rendered with a FrameRenderer, and only the part of the frame that
+    changed since the previous one is encoded and written, so memory use does
+    not grow with the length of the game.
+
+    Each frame is shown for frame_duration milliseconds times its hold.
+    Adding the same position again holds the pending frame longer instead of
+    duplicating it, which is why a frame is only written once the next
+    position (or close()) comes in. Close the recorder, or use it in a
+    with-block, to finish the file.
+    """
+
+    def __init__(
+        self,
+        out_file: str,
+        flipped: bool = False,
+        highlight_last_move: bool = True,
+        frame_duration: int = 2000,
+        loop: int = 0,
+    ) -> None:
+        self.out_file = out_file
+        self.frame_duration = frame_duration
+        self.loop = loop
+        self.renderer = FrameRenderer(flipped, highlight_last_move)
+
+        self.fp: Optional[BinaryIO] = None
+        self.previous: Optional[Image.Image] = None
+        self.snapshot: Optional[Tuple[bytes, int]] = None
+        self.pending: Optional[Tuple[Image.Image, Tuple[int, int], int]] = None
+        self.num_frames = 0
+
+    def __enter__(self) -> "GameRecorder":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def add(self, position: CompactBoard, last_move: int = NULL_MOVE, hold: int = 1) -> None:
+        """
+        Adds the position as the next frame of the animation.
+
+        Args:
+            position (CompactBoard): Pieces to show.
+
+            last_move (int): Move that led to the position, highlighted on
+            the frame.
+
+            hold (int): Number of frame durations to show the frame for, e.g.
+            to linger on the final position.
+        """
+
+        assert hold > 0, str("Error: hold must be positive, got %d" % (hold))
+        snapshot = (bytes(position.mailbox), last_move)
+        if self.pending is not None and snapshot == self.snapshot:
+            frame, offset, duration = self.pending
+            self.pending = (frame, offset, duration + hold * self.frame_duration)
+            return
+
+        # only the region that differs from the previous frame is encoded
+        frame = self.renderer.render(position, last_move)
+        if self.previous is None:
+            bbox = (0, 0) + frame.size
+            self.previous = frame.copy()
+        else:
+            bbox = ImageChops.difference(self.previous, frame).getbbox() or (0, 0, 1, 1)
+            self.previous.paste(frame.crop(bbox), bbox[:2])
+
+        self._flush()
+        cropped = frame.crop(bbox).quantize(palette=get_gif_palette(), dither=NO_DITHER)
+        self.pending = (cropped, (bbox[0], bbox[1]), hold * self.frame_duration)
+        self.snapshot = snapshot
+
+    def close(self) -> None:
+        """
+        Writes the last frame and ends the file.
+        """
+        assert self.pending is not None or self.fp is not None, "Error: close() called but no frame was recorded"
+        self._flush()
+        if self.fp is not None:
+            self.fp.write(b";")  # trailer
+            self.fp.close()
+            self.fp = None
+
+    def _flush(self) -> None:
+        if self.pending is None:
+            return
+
+        if self.fp is None:
+            self.fp = open(self.out_file, "wb")
+            self._write_header()
+
+        # disposal 1 keeps the previous frame under the changed region
+        frame, offset, duration = self.pending
+        for data in GifImagePlugin.getdata(frame, offset, duration=duration, disposal=1):
+            self.fp.write(data)
+        self.pending = None
+        self.num_frames += 1
+
+    def _write_header(self) -> None:
+        assert self.fp is not None and self.previous is not None
+        palette = bytes(get_gif_palette().getpalette() or [])[: 256 * 3].ljust(256 * 3, b"\0")
+
+        # logical screen with a global 256-color table, then the looping extension
+        self.fp.write(b"GIF89a" + struct.pack("<HHBBB", *self.previous.size, 0xF7, 0, 0) + palette)
+        self.fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\0")
@@ -0,0 +1,91 @@
+"""
+Renders and writes game frames on a background thread, so a simulation does
+not wait on Pillow and the disk for every position it wants an image of.
+"""
+
+import queue
+import threading
+from types import TracebackType
+from typing import Optional, Tuple, Type
+
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.renderer import FrameRenderer
+from ch_ss.game_engine.utils.move import NULL_MOVE
+
+
+class RenderQueue:
+    """
+    Queue of board snapshots (the 64-byte mailbox and the last move) that a
+    worker thread renders with a FrameRenderer and saves, in the order they
+    were put. put() blocks once max_pending snapshots are waiting, so a fast
+    simulation cannot run ahead of the worker without bound. close(), or
+    leaving a with-block, waits for every frame to be written.
+    """
+
+    def __init__(self, flipped: bool = False, highlight_last_move: bool = True, max_pending: int = 32) -> None:
+        self.renderer = FrameRenderer(flipped, highlight_last_move)
+        self.pending: "queue.Queue[Optional[Tuple[bytes, int, str]]]" = queue.Queue(maxsize=max_pending)
+        self.error: Optional[BaseException] = None
+        self.closed = False
+
+        self.worker = threading.Thread(target=self._work, name="render-queue", daemon=True)
+        self.worker.start()
+
+    def __enter__(self) -> "RenderQueue":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def put(self, position: CompactBoard, out_file: str, last_move: int = NULL_MOVE) -> None:
+        """
+        Queues a snapshot of the position to be rendered to out_file.
+
+        Args:
+            position (CompactBoard): Pieces to render, copied right away so
+            the caller can keep playing on it.
+
+            out_file (str): Image file to write, its format follows the
+            extension.
+
+            last_move (int): Move that led to the position, highlighted on
+            the image.
+        """
+
+        assert not self.closed, "Error: put() called on a closed RenderQueue"
+        self._raise_error()
+        self.pending.put((bytes(position.mailbox), last_move, out_file))
+
+    def close(self) -> None:
+        """
+        Waits for all queued frames to be written, and stops the worker.
+        Re-raises the first error the worker hit.
+        """
+        if not self.closed:
+            self.closed = True
+            self.pending.put(None)
+            self.worker.join()
+        self._raise_error()
+
+    def _work(self) -> None:
+        while True:
+            snapshot = self.pending.get()
+            if snapshot is None:
+                return
+            if self.error is not None:  # keep draining, so put() never blocks forever
+                continue
+
+            mailbox, last_move, out_file = snapshot
+            try:
+                self.renderer.render(CompactBoard(mailbox), last_move).save(out_file)
+            except Exception as e:  # surfaced to the simulation thread by put() and close()
+                self.error = e
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,218 @@
+"""
+Renders board positions to images. The decoded and resized piece sprites, the
+font, and the empty board of each orientation are built once per process and
+shared by all boards, so a frame is one copy of the empty board plus a paste
+per piece. FrameRenderer goes further for consecutive frames of a game, and
+only repaints the squares that changed.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.piece import Piece
+from ch_ss.game_engine.utils.move import NULL_MOVE, move_from, move_to
+from ch_ss.game_engine.utils.tables import SQUARE_NAMES
+
+# settings for printing board images
+BOARD_LEN = 800
+MARGIN = 10
+COLORS = ["#23de74", "#f7f7d5"]
+HIGHLIGHT_COLORS = ["#b9ca43", "#f5f682"]  # squares of the last move played
+LABEL_COLOR = "#3b3b3b"
+FONT_PATH = "ch_ss/game_engine/assets/fonts/arial.ttf"
+FONT_SIZE = 16
+SPRITE_HEIGHT = 70
+
+# calculated settings for printing board images -- don't change this
+IMAGE_LEN = BOARD_LEN + (MARGIN * 2)  # margin 10px each side
+SQUARE_LEN = BOARD_LEN // 8
+
+# process-wide caches, filled on first use
+_font = None
+_sprites: Dict[str, Tuple[Image.Image, Tuple[int, int]]] = {}
+_backgrounds: Dict[bool, Image.Image] = {}
+
+
+def get_font() -> ImageFont.FreeTypeFont:
+    global _font
+    if _font is None:
+        _font = ImageFont.truetype(FONT_PATH, FONT_SIZE)
+    return _font
+
+
+def square_origin(sq: int, flipped: bool = False) -> Tuple[int, int]:
+    """
+    Pixel coordinates of the top left corner of square sq (see
+    utils/tables.py) on the image.
+    """
+    i, j = 7 - (sq >> 3), sq & 7
+    if flipped:
+        return MARGIN + (7 - j) * SQUARE_LEN, MARGIN + (7 - i) * SQUARE_LEN
+    return MARGIN + j * SQUARE_LEN, MARGIN + i * SQUARE_LEN
+
+
+def square_color(sq: int, highlighted: bool = False) -> str:
+    colors = HIGHLIGHT_COLORS if highlighted else COLORS
+    return colors[0] if ((7 - (sq >> 3) + (sq & 7)) % 2) else colors[1]
+
+
+def get_sprite(piece: Piece) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Image of the piece resized to SPRITE_HEIGHT, and the offset to paste it
+    at from the top left corner of a square so it is centered.
+    """
+    if piece.img_fpath not in _sprites:
+        # we need to resize it programmatically, since each piece has different height/width
+        piece_img: Image.Image = Image.open(piece.img_fpath)
+        px, py = piece_img.size
+        ratio = py / SPRITE_HEIGHT
+        px, py = int(px / ratio), SPRITE_HEIGHT
+        piece_img = piece_img.resize((px, py))
+
+        offset = (int((SQUARE_LEN / 2) - int(px / 2)), int((SQUARE_LEN / 2) - int(py / 2)))
+        _sprites[piece.img_fpath] = (piece_img, offset)
+
+    return _sprites[piece.img_fpath]
+
+
+def get_background(flipped: bool = False) -> Image.Image:
+    """
+    Image of the empty board with its square labels, as seen by white (or by
+    black if flipped). The cached image is shared, copy it before drawing on
+    it.
+    """
+    if flipped not in _backgrounds:
+        img = Image.new("RGB", (IMAGE_LEN, IMAGE_LEN), (255, 255, 255, 0))
+        d = ImageDraw.Draw(img)
+        font = get_font()
+
+        for sq, square_id in enumerate(SQUARE_NAMES):
+            top_left_x, top_left_y = square_origin(sq, flipped)
+            d.rectangle(
+                [(top_left_x, top_left_y), (top_left_x + SQUARE_LEN, top_left_y + SQUARE_LEN)],
+                fill=square_color(sq),
+                outline="black",
+            )
+
+            # write square ids in the corner squares
+            col, row = square_id[0], square_id[1]
+            if row == ("8" if flipped else "1"):
+                d.text((top_left_x + 5, top_left_y + SQUARE_LEN - 20), col, LABEL_COLOR, font=font)
+            if col == ("h" if flipped else "a"):
+                d.text((top_left_x + 5, top_left_y + 5), row, LABEL_COLOR, font=font)
+
+        _backgrounds[flipped] = img
+
+    return _backgrounds[flipped]
+
+
+def paste_piece(img: Image.Image, sq: int, piece: Piece, flipped: bool = False) -> None:
+    """
+    Pastes the sprite of the piece centered on square sq of the image.
+    """
+    sprite, (offset_x, offset_y) = get_sprite(piece)
+    top_left_x, top_left_y = square_origin(sq, flipped)
+    img.paste(sprite, (top_left_x + offset_x, top_left_y + offset_y), mask=sprite)
+
+
+def render_position(position: CompactBoard, flipped: bool = False) -> Image.Image:
+    """
+    Renders the pieces of the position on a copy of the empty board.
+
+    Args:
+        position (CompactBoard): Pieces to render.
+
+        flipped (bool): Render the board as seen by black.
+
+    Returns:
+        Image.Image: Rendered board, a new image the caller owns.
+    """
+
+    img = get_background(flipped).copy()
+    for sq, code in enumerate(position.mailbox):
+        if code:
+            paste_piece(img, sq, position.get_piece(sq), flipped)
+    return img
+
+
+class FrameRenderer:
+    """
+    Renders the successive positions of a game, keeping the previous frame
+    and repainting only the squares that differ from it: the squares a move
+    touched (from, to, the pawn captured en-passant, the castling rook) and
+    the squares of the last move, which are highlighted.
+
+    The returned frame is reused by the next render() call, copy it to keep
+    it.
+    """
+
+    def __init__(self, flipped: bool = False, highlight_last_move: bool = True) -> None:
+        self.flipped = flipped
+        self.highlight_last_move = highlight_last_move
+        self.frame: Optional[Image.Image] = None
+        self.mailbox = bytes(64)
+        self.highlighted: List[int] = []
+
+    def reset(self) -> None:
+        """
+        Forgets the previous frame, so the next one is rendered in full.
+        """
+        self.frame = None
+
+    def render(self, position: CompactBoard, last_move: int = NULL_MOVE) -> Image.Image:
+        """
+        Renders the position, highlighting the squares of the last move.
+
+        Args:
+            position (CompactBoard): Pieces to render.
+
+            last_move (int): Move that led to the position, encoded as in
+            utils/move.py (NULL_MOVE if there is none).
+
+        Returns:
+            Image.Image: Rendered board.
+        """
+
+        highlighted = []
+        if self.highlight_last_move and last_move != NULL_MOVE:
+            highlighted = [move_from(last_move), move_to(last_move)]
+
+        if self.frame is None:
+            self.frame = render_position(position, self.flipped)
+            changed = set(highlighted)
+        else:
+            # squares the move touched, found by comparing the 64-byte mailboxes
+            changed = {sq for sq in range(64) if position.mailbox[sq] != self.mailbox[sq]}
+            changed.update(self.highlighted + highlighted)
+
+        for sq in changed:
+            self.repaint_square(sq, position, sq in highlighted)
+
+        self.mailbox = bytes(position.mailbox)
+        self.highlighted = highlighted
+        return self.frame
+
+    def repaint_square(self, sq: int, position: CompactBoard, highlighted: bool = False) -> None:
+        assert self.frame is not None, "Error: repaint_square() called before a frame was rendered"
+        top_left_x, top_left_y = square_origin(sq, self.flipped)
+        box = (top_left_x, top_left_y, top_left_x + SQUARE_LEN + 1, top_left_y + SQUARE_LEN + 1)
+
+        # the empty square with its label, or a highlighted one
+        self.frame.paste(get_background(self.flipped).crop(box), box[:2])
+        if highlighted:
+            d = ImageDraw.Draw(self.frame)
+            d.rectangle([box[:2], (box[2] - 1, box[3] - 1)], fill=square_color(sq, highlighted), outline="black")
+            self.draw_label(d, sq)
+
+        if position.mailbox[sq]:
+            paste_piece(self.frame, sq, position.get_piece(sq), self.flipped)
+
+    def draw_label(self, d: ImageDraw.ImageDraw, sq: int) -> None:
+        top_left_x, top_left_y = square_origin(sq, self.flipped)
+        col, row = SQUARE_NAMES[sq][0], SQUARE_NAMES[sq][1]
+        if row == ("8" if self.flipped else "1"):
+            d.text((top_left_x + 5, top_left_y + SQUARE_LEN - 20), col, LABEL_COLOR, font=get_font())
+        if col == ("h" if self.flipped else "a"):
+            d.text((top_left_x + 5, top_left_y + 5), row, LABEL_COLOR, font=get_font())
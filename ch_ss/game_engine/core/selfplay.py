@@ -0,0 +1,146 @@
+"""
+Headless self-play: plays many bot games across a pool of worker processes,
+without printing or rendering, and collects a structured result per game.
+"""
+
+import hashlib
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Optional
+
+from ch_ss.game_engine.core.adjudication import Adjudication
+from ch_ss.game_engine.core.game import StandardGame
+
+
+@dataclass
+class SelfPlayResult:
+    """
+    Result of a self-play game: the seed it was played with, its result
+    ('1-0', '0-1', '1/2-1/2', or '*' if it was stopped at max_plies) and the
+    reason, the moves played in our custom algebraic notation, how long it
+    took, and the strategies of white and black.
+    """
+
+    game_id: int
+    seed: int
+    result: str
+    reason: str
+    moves: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    white: str = "capturebot5000"
+    black: str = "capturebot5000"
+
+    @property
+    def plies(self) -> int:
+        return len(self.moves)
+
+    @property
+    def plies_per_second(self) -> float:
+        return self.plies / self.seconds if self.seconds > 0 else 0.0
+
+
+def game_seed(base_seed: int, game_id: int) -> int:
+    """
+    Seed of a game, a 64-bit hash of the seed of the run and the index of the
+    game. Unlike base_seed + game_id, runs with nearby seeds share no games.
+    """
+    digest = hashlib.blake2b(b"%d:%d" % (base_seed, game_id), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def play_selfplay_game(
+    game_id: int,
+    base_seed: int = 0,
+    max_plies: int = 400,
+    strategy: str = "capturebot5000",
+    black_strategy: Optional[str] = None,
+    adjudication: Optional[Adjudication] = None,
+) -> SelfPlayResult:
+    """
+    Plays one bot game to its end, or to max_plies. The random generator is
+    seeded with game_seed(base_seed, game_id), so a game replays the same
+    whichever worker plays it.
+
+    Args:
+        game_id (int): Index of the game in the run.
+
+        base_seed (int): Seed of the run.
+
+        max_plies (int): Number of plies after which the game is stopped.
+
+        strategy (str): Strategy both players pick their moves with, see
+        Player.evaluate_move().
+
+        black_strategy (Optional[str]): Strategy of black, if it differs from
+        white's.
+
+        adjudication (Optional[Adjudication]): Rules the game is ended by
+        besides checkmate and stalemate, the rules of chess if None.
+
+    Returns:
+        SelfPlayResult: Result of the game.
+    """
+
+    strategies = {"white": strategy, "black": black_strategy or strategy}
+    seed = game_seed(base_seed, game_id)
+    random.seed(seed)
+    start = time.perf_counter()
+
+    game = StandardGame(adjudication)
+    moves: List[str] = []
+    game.add_move_listener(lambda event: moves.append(event.move_str))
+    outcome = None
+    while outcome is None and len(moves) < max_plies:
+        outcome = game.step(strategies[game.to_move])
+
+    result, reason = (outcome.result, outcome.reason) if outcome is not None else ("*", "max plies")
+    seconds = time.perf_counter() - start
+    return SelfPlayResult(game_id, seed, result, reason, moves, seconds, strategies["white"], strategies["black"])
+
+
+def run_selfplay(
+    num_games: int,
+    processes: Optional[int] = None,
+    base_seed: int = 0,
+    max_plies: int = 400,
+    strategy: str = "capturebot5000",
+    adjudication: Optional[Adjudication] = None,
+) -> List[SelfPlayResult]:
+    """
+    Plays num_games self-play games across a pool of worker processes, one
+    per core by default.
+
+    Args:
+        num_games (int): Number of games to play.
+
+        processes (Optional[int]): Number of worker processes, the number of
+        cores if None. With 1, games are played in this process.
+
+        base_seed (int): Seed of the run, see play_selfplay_game().
+
+        max_plies (int): Number of plies after which a game is stopped.
+
+        strategy (str): Strategy both players pick their moves with.
+
+        adjudication (Optional[Adjudication]): Rules games are ended by, see
+        play_selfplay_game().
+
+    Returns:
+        List[SelfPlayResult]: Result of each game, ordered by game_id.
+    """
+
+    play = partial(
+        play_selfplay_game, base_seed=base_seed, max_plies=max_plies, strategy=strategy, adjudication=adjudication
+    )
+    if processes == 1:
+        return [play(game_id) for game_id in range(num_games)]
+
+    # games take very different times, so hand them out a few at a time
+    with multiprocessing.Pool(processes) as pool:
+        chunksize = max(1, num_games // ((processes or multiprocessing.cpu_count()) * 8))
+        results = list(pool.imap_unordered(play, range(num_games), chunksize))
+
+    return sorted(results, key=lambda result: result.game_id)
@@ -21,7 +21,7 @@ class Square:
     Squares are not frozen, since the chess piece on the square can be changed.
     """
 
-    piece: Piece = field(default=Piece())
+    piece: Piece = field(default=Piece.of())
     x_y: tuple[int, int] = field(default=(0, 0))
     square_id: str = "a1"
     annotate: bool = False
@@ -79,4 +79,4 @@ class Square:
         Returns true if a non-empty chess piece is on this square, false
         otherwise.
         """
-        return self.piece == Piece()  # Piece() creates an "empty-piece"
+        return self.piece.is_empty()
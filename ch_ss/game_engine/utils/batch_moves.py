@@ -0,0 +1,324 @@
+"""
+Legal move generation for many positions at once, vectorised with NumPy, for
+stepping hundreds of self-play games in lockstep.
+
+Every board is a row of piece bitboards (as produced by state_to_bitboards()
+in utils/gen_moves.py), and every step below is a shift or bitwise operation
+over all boards (and, for move targets, over all 64 from-squares) at once.
+Sliding attacks use Kogge-Stone occluded fills instead of the per-square ray
+tables of gen_moves().
+
+NumPy is an optional dependency, installed with the "batch" extra.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ch_ss.game_engine.core.piece import Piece, PieceNames
+from ch_ss.game_engine.utils.gen_moves import state_to_bitboards
+from ch_ss.game_engine.utils.tables import (
+    DIAGONAL_DIRECTIONS,
+    DIRECTIONS,
+    KING_MASKS,
+    KNIGHT_MASKS,
+    ORTHOGONAL_DIRECTIONS,
+)
+
+# Order of the piece bitboards along the last axis of a batch
+BATCH_PIECE_NAMES = [
+    PieceNames.PAWN,
+    PieceNames.KNIGHT,
+    PieceNames.BISHOP,
+    PieceNames.ROOK,
+    PieceNames.QUEEN,
+    PieceNames.KING,
+]
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_NOT_A_FILE = np.uint64(0xFEFEFEFEFEFEFEFE)
+_NOT_H_FILE = np.uint64(0x7F7F7F7F7F7F7F7F)
+_NOT_AB_FILES = np.uint64(0xFCFCFCFCFCFCFCFC)
+_NOT_GH_FILES = np.uint64(0x3F3F3F3F3F3F3F3F)
+_RANK_3 = np.uint64(0x0000000000FF0000)
+_RANK_6 = np.uint64(0x0000FF0000000000)
+
+# Bitboard of each single square, and the leaper attacks from it
+_SQUARE_BITS = np.array([1 << sq for sq in range(64)], dtype=np.uint64)
+_KNIGHT_MASKS = np.array(KNIGHT_MASKS, dtype=np.uint64)
+_KING_MASKS = np.array(KING_MASKS, dtype=np.uint64)
+
+# Shift and wrap-around mask of each ray direction in utils/tables.py
+_DIRECTION_SHIFTS = [d_row * 8 + d_col for d_col, d_row in DIRECTIONS]
+_DIRECTION_WRAPS = [_NOT_A_FILE if d_col > 0 else _NOT_H_FILE if d_col < 0 else _ALL for d_col, _ in DIRECTIONS]
+
+
+def states_to_batch(states: List[Dict[str, Piece]], players_to_move: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stacks the bitboards of many board states into arrays.
+
+    Args:
+        states (List[Dict[str, Piece]]): Board states as dictionaries, where
+        the key is the location of the piece, and the value is a Piece object
+        on that location.
+
+        players_to_move (List[str]): Player ('black' or 'white') to move in
+        each board state.
+
+    Returns:
+        np.ndarray: (N, 2, 6) uint64 array of bitboards. The second axis is
+        the player to move and then the opponent, the last axis follows
+        BATCH_PIECE_NAMES.
+
+        np.ndarray: (N,) bool array, True where white is to move.
+    """
+
+    bitboards = np.zeros((len(states), 2, len(BATCH_PIECE_NAMES)), dtype=np.uint64)
+    for i, (state, player) in enumerate(zip(states, players_to_move)):
+        for j, player_bitboards in enumerate(state_to_bitboards(state, player)):
+            for k, name in enumerate(BATCH_PIECE_NAMES):
+                bitboards[i, j, k] = player_bitboards.get(name, 0)
+
+    white = np.array([player.lower() == "white" for player in players_to_move], dtype=bool)
+    return bitboards, white
+
+
+def batch_legal_move_masks(
+    bitboards: np.ndarray,
+    white: np.ndarray,
+    castle_vecs: Optional[np.ndarray] = None,
+    en_passant_sqs: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Computes the legal moves of N positions at once, as a dense from-square x
+    to-square mask, e.g. to mask the policy output of a network.
+
+    A promotion is a single from-to entry, whichever piece is promoted to.
+    Castling is the king's two-square move.
+
+    Args:
+        bitboards (np.ndarray): (N, 2, 6) uint64 array of bitboards, see
+        states_to_batch().
+
+        white (np.ndarray): (N,) bool array, True where white is to move.
+
+        castle_vecs (Optional[np.ndarray]): (N, 3) bool array of the castling
+        vector of the player to move, in the (O-O rook not moved, King not
+        moved, O-O-O rook not moved) layout of gen_moves(). No castling if
+        not given.
+
+        en_passant_sqs (Optional[np.ndarray]): (N,) int array of the square a
+        pawn can capture en-passant onto, or -1. No en-passant if not given.
+
+    Returns:
+        np.ndarray: (N, 64, 64) bool array, True where moving from the first
+        square to the second one is legal.
+    """
+
+    n = bitboards.shape[0]
+    if castle_vecs is None:
+        castle_vecs = np.zeros((n, 3), dtype=bool)
+    if en_passant_sqs is None:
+        en_passant_sqs = np.full(n, -1, dtype=np.int64)
+
+    player, opp = bitboards[:, 0, :], bitboards[:, 1, :]
+    own = np.bitwise_or.reduce(player, axis=1)
+    opp_all = np.bitwise_or.reduce(opp, axis=1)
+    occupied = own | opp_all
+    empty = ~occupied
+    king = player[:, KING]
+    opp_diagonal = opp[:, BISHOP] | opp[:, QUEEN]
+    opp_orthogonal = opp[:, ROOK] | opp[:, QUEEN]
+
+    # squares the opponent attacks, with the king taken off the board so it can't hide behind itself
+    opp_attacks = _pawn_attacks(opp[:, PAWN], ~white) | _knight_attacks(opp[:, KNIGHT]) | _king_attacks(opp[:, KING])
+    opp_attacks |= _slider_attacks(opp_diagonal, empty | king, DIAGONAL_DIRECTIONS)
+    opp_attacks |= _slider_attacks(opp_orthogonal, empty | king, ORTHOGONAL_DIRECTIONS)
+
+    check_mask, pin_masks, leaper_checkers = _check_and_pin_masks(
+        king, own, empty, opp, opp_diagonal, opp_orthogonal, white
+    )
+
+    # move targets of the player's piece on each from-square, (N, 64)
+    sq_bits = _SQUARE_BITS[None, :]
+    empty_ = empty[:, None]
+    not_own = ~own[:, None]
+
+    pawns = player[:, PAWN][:, None] & sq_bits
+    forward = np.where(white[:, None], pawns << np.uint64(8), pawns >> np.uint64(8))
+    single = forward & empty_
+    double = np.where(white[:, None], (single & _RANK_3) << np.uint64(8), (single & _RANK_6) >> np.uint64(8))
+    double &= empty_
+    targets = single | double | (_pawn_attacks(pawns, white[:, None]) & opp_all[:, None])
+
+    knights = (player[:, KNIGHT][:, None] & sq_bits) != 0
+    targets |= np.where(knights, _KNIGHT_MASKS[None, :], np.uint64(0)) & not_own
+
+    diagonal = (player[:, BISHOP] | player[:, QUEEN])[:, None] & sq_bits
+    orthogonal = (player[:, ROOK] | player[:, QUEEN])[:, None] & sq_bits
+    targets |= _slider_attacks(diagonal, empty_, DIAGONAL_DIRECTIONS) & not_own
+    targets |= _slider_attacks(orthogonal, empty_, ORTHOGONAL_DIRECTIONS) & not_own
+
+    # non-king moves must resolve any check, and pinned pieces must stay on their pin ray
+    targets &= check_mask[:, None] & pin_masks
+
+    # en-passant removes two pieces at once, so it is tested with the occupancy after the move
+    has_en_passant = en_passant_sqs >= 0
+    en_passant_bits = np.uint64(1) << np.maximum(en_passant_sqs, 0).astype(np.uint64)
+    en_passant = np.where(has_en_passant, en_passant_bits, np.uint64(0))
+    captured = np.where(white, en_passant >> np.uint64(8), en_passant << np.uint64(8))
+    from_sqs = _pawn_attacks(en_passant, ~white) & player[:, PAWN]
+    capturers = from_sqs[:, None] & sq_bits
+    empty_after = ((empty | captured)[:, None] | capturers) & ~en_passant[:, None]
+    exposed = _slider_attacks(king[:, None], empty_after, DIAGONAL_DIRECTIONS) & opp_diagonal[:, None]
+    exposed |= _slider_attacks(king[:, None], empty_after, ORTHOGONAL_DIRECTIONS) & opp_orthogonal[:, None]
+    safe = (exposed == 0) & ((leaper_checkers & ~captured) == 0)[:, None]
+    targets |= np.where((capturers != 0) & safe, en_passant[:, None], np.uint64(0))
+
+    # king steps onto squares the opponent doesn't attack, and castles through them
+    kings = (king[:, None] & sq_bits) != 0
+    king_targets = _king_attacks(king) & ~own & ~opp_attacks
+    king_targets |= _castling_targets(king, player[:, ROOK], occupied, opp_attacks, white, castle_vecs)
+    targets = np.where(kings, king_targets[:, None], targets)
+
+    # unpack the (N, 64) target bitboards into (N, 64, 64) booleans
+    bits = np.unpackbits(targets.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+    return bits.reshape(n, 64, 64).astype(bool)
+
+
+def _check_and_pin_masks(
+    king: np.ndarray,
+    own: np.ndarray,
+    empty: np.ndarray,
+    opp: np.ndarray,
+    opp_diagonal: np.ndarray,
+    opp_orthogonal: np.ndarray,
+    white: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised counterpart of _gen_check_and_pin_masks() in utils/gen_moves.py.
+
+    Returns:
+        np.ndarray: (N,) bitboards of squares a non-king piece must move to
+        in order to capture or block the checker. All squares if not under
+        check, and no squares if under double check.
+
+        np.ndarray: (N, 64) bitboards of the squares the piece on each
+        from-square may move to without exposing the king, all squares for
+        pieces that are not pinned.
+
+        np.ndarray: (N,) bitboards of the knights and pawns giving check.
+    """
+
+    leaper_checkers = (_knight_attacks(king) & opp[:, KNIGHT]) | (_pawn_attacks(king, white) & opp[:, PAWN])
+    checkers = leaper_checkers.copy()
+    check_ray = leaper_checkers.copy()
+    pin_masks = np.full((king.shape[0], 64), _ALL, dtype=np.uint64)
+
+    for d in range(8):
+        sliders = opp_diagonal if d in DIAGONAL_DIRECTIONS else opp_orthogonal
+        ray = _ray_attacks(king, empty, d)
+        checker = ray & sliders
+        checkers |= checker
+        check_ray |= np.where(checker != 0, ray, np.uint64(0))
+
+        # look through the player's own first blocker for a pinning slider behind it
+        blocker = ray & own
+        xray = _ray_attacks(king, empty | blocker, d)
+        pinned = np.where((xray & ~ray & sliders) != 0, blocker, np.uint64(0))
+        pin_masks &= np.where((pinned[:, None] & _SQUARE_BITS[None, :]) != 0, xray[:, None], _ALL)
+
+    double_check = (checkers & (checkers - np.uint64(1))) != 0
+    check_mask = np.where(checkers == 0, _ALL, np.where(double_check, np.uint64(0), check_ray))
+
+    return check_mask.astype(np.uint64), pin_masks, leaper_checkers
+
+
+def _castling_targets(
+    king: np.ndarray,
+    rooks: np.ndarray,
+    occupied: np.ndarray,
+    opp_attacks: np.ndarray,
+    white: np.ndarray,
+    castle_vecs: np.ndarray,
+) -> np.ndarray:
+    """
+    (N,) bitboards of the squares the king can castle onto, the same rules as
+    castling in utils/gen_moves.py.
+    """
+
+    home = np.where(white, 4, 60).astype(np.uint64)
+    one = np.uint64(1)
+    can_castle = castle_vecs[:, 1] & (king == one << home) & ((opp_attacks & king) == 0)
+
+    king_side = can_castle & castle_vecs[:, 0] & ((rooks >> (home + np.uint64(3))) & one != 0)
+    king_side &= ((occupied | opp_attacks) & (np.uint64(0b11) << (home + one))) == 0
+    queen_side = can_castle & castle_vecs[:, 2] & ((rooks >> (home - np.uint64(4))) & one != 0)
+    queen_side &= (occupied & (np.uint64(0b111) << (home - np.uint64(3)))) == 0
+    queen_side &= (opp_attacks & (np.uint64(0b11) << (home - np.uint64(2)))) == 0
+
+    targets = np.where(king_side, one << (home + np.uint64(2)), np.uint64(0))
+    return targets | np.where(queen_side, one << (home - np.uint64(2)), np.uint64(0))
+
+
+def _slider_attacks(sliders: np.ndarray, empty: np.ndarray, directions: List[int]) -> np.ndarray:
+    """
+    Squares attacked by the sliding pieces along the input directions,
+    blocked by (and including) the first occupied square.
+    """
+    attacks = np.zeros(np.broadcast(sliders, empty).shape, dtype=np.uint64)
+    for d in directions:
+        attacks |= _ray_attacks(sliders, empty, d)
+    return attacks
+
+
+def _ray_attacks(sliders: np.ndarray, empty: np.ndarray, d: int) -> np.ndarray:
+    """
+    Squares attacked by the sliding pieces along a single direction, using a
+    Kogge-Stone occluded fill: three doubling steps cover the 7 squares of
+    the longest ray.
+    """
+    shift, wrap = _DIRECTION_SHIFTS[d], _DIRECTION_WRAPS[d]
+    empty = empty & wrap
+    fill = sliders | (empty & _shift(sliders, shift))
+    empty = empty & _shift(empty, shift)
+    fill = fill | (empty & _shift(fill, 2 * shift))
+    empty = empty & _shift(empty, 2 * shift)
+    fill = fill | (empty & _shift(fill, 4 * shift))
+    return _shift(fill, shift) & wrap
+
+
+def _shift(bitboards: np.ndarray, shift: int) -> np.ndarray:
+    """
+    Shifts bitboards towards higher (positive shift) or lower square indices.
+    """
+    if shift > 0:
+        return bitboards << np.uint64(shift)
+    return bitboards >> np.uint64(-shift)
+
+
+def _pawn_attacks(pawns: np.ndarray, white: np.ndarray) -> np.ndarray:
+    """
+    Squares attacked by the pawns of white (True) or black (False) players.
+    """
+    white_attacks = ((pawns << np.uint64(7)) & _NOT_H_FILE) | ((pawns << np.uint64(9)) & _NOT_A_FILE)
+    black_attacks = ((pawns >> np.uint64(9)) & _NOT_H_FILE) | ((pawns >> np.uint64(7)) & _NOT_A_FILE)
+    return np.where(white, white_attacks, black_attacks).astype(np.uint64)
+
+
+def _knight_attacks(knights: np.ndarray) -> np.ndarray:
+    """
+    Squares attacked by the knights.
+    """
+    one = ((knights << np.uint64(1)) & _NOT_A_FILE) | ((knights >> np.uint64(1)) & _NOT_H_FILE)
+    two = ((knights << np.uint64(2)) & _NOT_AB_FILES) | ((knights >> np.uint64(2)) & _NOT_GH_FILES)
+    return (one << np.uint64(16)) | (one >> np.uint64(16)) | (two << np.uint64(8)) | (two >> np.uint64(8))
+
+
+def _king_attacks(kings: np.ndarray) -> np.ndarray:
+    """
+    Squares attacked by a single king per board.
+    """
+    row = kings | ((kings << np.uint64(1)) & _NOT_A_FILE) | ((kings >> np.uint64(1)) & _NOT_H_FILE)
+    return (row | (row << np.uint64(8)) | (row >> np.uint64(8))) ^ kings
@@ -0,0 +1,195 @@
+"""
+Reading positions written in Forsyth-Edwards Notation (FEN), the standard way
+of describing a chess position on a single line.
+"""
+
+from typing import Iterator, Tuple
+
+from ch_ss.game_engine.core.compact_board import (
+    BLACK_CODE_BIT,
+    CODE_PIECE_NAMES,
+    PIECES_BY_CODE,
+)
+from ch_ss.game_engine.core.game_state import GameState, pack_castling
+from ch_ss.game_engine.core.piece import PieceNames
+from ch_ss.game_engine.utils.gen_moves import iter_bits
+from ch_ss.game_engine.utils.tables import (
+    PAWN_ATTACK_MASKS,
+    SQUARE_INDICES,
+    SQUARE_NAMES,
+)
+from ch_ss.game_engine.utils.zobrist import piece_key
+
+# Piece names keyed by their (lowercase) FEN letter
+FEN_PIECE_NAMES = {
+    "p": PieceNames.PAWN,
+    "n": PieceNames.KNIGHT,
+    "b": PieceNames.BISHOP,
+    "r": PieceNames.ROOK,
+    "q": PieceNames.QUEEN,
+    "k": PieceNames.KING,
+}
+
+# Mailbox code of each FEN letter (see core/compact_board.py), and back
+FEN_CODES = {}
+for _letter, _name in FEN_PIECE_NAMES.items():
+    FEN_CODES[_letter.upper()] = CODE_PIECE_NAMES.index(_name)
+    FEN_CODES[_letter] = CODE_PIECE_NAMES.index(_name) | BLACK_CODE_BIT
+CODE_FEN_LETTERS = {code: letter for letter, code in FEN_CODES.items()}
+
+STANDARD_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def fen_to_mailbox(placement: str) -> bytes:
+    """
+    Parses the piece placement field of a FEN straight into the 64-byte
+    mailbox of a CompactBoard, without building any Piece objects.
+
+    Args:
+        placement (str): First field of a FEN (e.g. rnbqkbnr/pppppppp/...).
+
+    Returns:
+        bytes: Piece code of each square, indexed as in utils/tables.py.
+    """
+
+    rows = placement.split("/")
+    assert len(rows) == 8, "Error: FEN needs 8 rows: %s" % (placement)
+
+    mailbox = bytearray(64)
+    for i, row in enumerate(rows):
+        sq = (7 - i) * 8
+        for char in row:
+            if char.isdigit():
+                sq += int(char)
+            else:
+                mailbox[sq] = FEN_CODES[char]
+                sq += 1
+        assert sq == (8 - i) * 8, "Error: FEN row %d does not have 8 squares: %s" % (8 - i, placement)
+
+    return bytes(mailbox)
+
+
+def mailbox_to_fen(mailbox: bytes) -> str:
+    """
+    Renders a 64-byte mailbox as the piece placement field of a FEN.
+    """
+
+    rows = []
+    for row in range(7, -1, -1):
+        text, empty = "", 0
+        for code in mailbox[row * 8 : row * 8 + 8]:
+            if code:
+                text += (str(empty) if empty else "") + CODE_FEN_LETTERS[code]
+                empty = 0
+            else:
+                empty += 1
+        rows.append(text + (str(empty) if empty else ""))
+
+    return "/".join(rows)
+
+
+def mailbox_key(mailbox: bytes) -> int:
+    """
+    Zobrist key of the pieces in a mailbox, see utils/zobrist.py.
+    """
+    key = 0
+    for sq, code in enumerate(mailbox):
+        if code:
+            key ^= piece_key(PIECES_BY_CODE[code], sq)
+    return key
+
+
+def fen_to_game_state(fen: str) -> Tuple[GameState, int]:
+    """
+    Parses a FEN into a game state, including its Zobrist key. The halfmove
+    clock and move number fields are optional. As in the rest of the engine,
+    an en-passant square is only kept if a pawn can actually capture onto
+    it.
+
+    Args:
+        fen (str): Position in Forsyth-Edwards Notation.
+
+    Returns:
+        GameState: Game state of the position.
+
+        int: Fullmove number of the position (1 if not given).
+    """
+
+    fields = fen.split()
+    assert len(fields) >= 4, "Error: FEN needs at least 4 fields: %s" % (fen)
+    placement, to_move, castling, en_passant = fields[:4]
+
+    mailbox = fen_to_mailbox(placement)
+    white = to_move == "w"
+    castle_vecs = {
+        "white": ["K" in castling, "K" in castling or "Q" in castling, "Q" in castling],
+        "black": ["k" in castling, "k" in castling or "q" in castling, "q" in castling],
+    }
+
+    en_passant_sq = -1
+    if en_passant != "-":
+        sq = SQUARE_INDICES[en_passant]
+        pawn = FEN_CODES["P" if white else "p"]
+        if any(mailbox[attacker] == pawn for attacker in iter_bits(PAWN_ATTACK_MASKS[not white][sq])):
+            en_passant_sq = sq
+
+    state = GameState(
+        board=mailbox,
+        to_move="white" if white else "black",
+        castling=pack_castling(castle_vecs),
+        en_passant_sq=en_passant_sq,
+        halfmove_clock=int(fields[4]) if len(fields) > 4 else 0,
+    )
+    state = state.replace(zobrist_key=mailbox_key(mailbox) ^ state.get_state_key())
+
+    return state, int(fields[5]) if len(fields) > 5 else 1
+
+
+def game_state_to_fen(state: GameState, fullmove: int = 1) -> str:
+    """
+    Renders a game state as a FEN.
+
+    Args:
+        state (GameState): Game state of the position.
+
+        fullmove (int): Fullmove number of the position.
+
+    Returns:
+        str: Position in Forsyth-Edwards Notation.
+    """
+
+    castling = ""
+    for color, letters in [("white", "KQ"), ("black", "kq")]:
+        castle_vec = state.get_castle_vec(color)
+        if castle_vec[1] and castle_vec[0]:
+            castling += letters[0]
+        if castle_vec[1] and castle_vec[2]:
+            castling += letters[1]
+
+    en_passant = SQUARE_NAMES[state.en_passant_sq] if state.en_passant_sq >= 0 else "-"
+    fields = [mailbox_to_fen(state.board), state.to_move[0], castling or "-", en_passant]
+
+    return " ".join(fields + [str(state.halfmove_clock), str(fullmove)])
+
+
+def iter_fen_file(path: str) -> Iterator[Tuple[GameState, int]]:
+    """
+    Streams the positions of a file with one FEN per line, without reading
+    the whole file at once. Blank lines and lines starting with '#' are
+    skipped, and anything after a ';' (e.g. perft counts in EPD-style suites)
+    is ignored.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        Iterator[Tuple[GameState, int]]: Game state and fullmove number of
+        each position, see fen_to_game_state().
+    """
+
+    with open(path) as f:
+        for line in f:
+            fen = line.split(";", 1)[0].strip()
+            if fen and not fen.startswith("#"):
+                yield fen_to_game_state(fen)
+
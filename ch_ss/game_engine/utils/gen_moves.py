@@ -2,17 +2,50 @@
 """
 Defines function that takes in input board state and outputs all possible legal
 moves.
-"""
 
-from typing import Dict, List, Tuple
+Squares are indexed 0-63 in bitboards, see utils/tables.py.
+"""
 
-from ch_ss.game_engine.core.piece import Piece, PieceNames
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ch_ss.game_engine.core.piece import Piece, PieceNames, PieceValues
+from ch_ss.game_engine.utils.move import (
+    CAPTURE,
+    DOUBLE_PAWN_PUSH,
+    EN_PASSANT,
+    KING_CASTLE,
+    QUEEN_CASTLE,
+    encode_move,
+    is_double_pawn_push,
+    move_from,
+    move_to,
+    promotion_flags,
+)
+from ch_ss.game_engine.utils.tables import (
+    DIAGONAL_DIRECTIONS,
+    DIRECTION_IS_POSITIVE,
+    KING_MASKS,
+    KNIGHT_MASKS,
+    OPPOSITE_DIRECTIONS,
+    ORTHOGONAL_DIRECTIONS,
+    PAWN_ATTACK_MASKS,
+    RAY_MASKS,
+    RAYS,
+)
 from ch_ss.game_engine.utils.utils import COLUMN_ALPHABETS_IDX
 
+# Pieces a pawn can be promoted to, in the order the moves are generated
+PROMOTION_ORDER = [PieceNames.QUEEN, PieceNames.BISHOP, PieceNames.KNIGHT, PieceNames.ROOK]
+
 
 def gen_moves(
-    state: Dict[str, Piece], player_to_move: str, castle_vec: Tuple[bool, bool, bool], last_move: str
-) -> List[str]:
+    state: Dict[str, Piece],
+    player_to_move: str,
+    castle_vec: Tuple[bool, bool, bool],
+    last_move: int,
+    opp_attacks: Optional[int] = None,
+    bitboards: Optional[Tuple[Dict[PieceNames, int], Dict[PieceNames, int]]] = None,
+) -> List[int]:
     """
     Generates legal moves based on input board state and the player to move.
     The player can only be either 'white' or 'black'.
@@ -31,23 +64,569 @@ def gen_moves(
         represent the following states, from left-to-right: (O-O rook not
         moved, King not moved, O-O-O rook not moved).
 
-        last_move (str): Last move played, expressed in our custom algebraic
-        notation.
+        last_move (int): Last move played by the opponent, encoded as in
+        utils/move.py (NULL_MOVE if there is none).
+
+        opp_attacks (Optional[int]): Bitboard of all squares attacked by the
+        opponent in this position, e.g. as kept up to date by AttackMaps.
+        When given, king moves and castling are tested against it instead of
+        searching for attackers.
+
+        bitboards (Optional[Tuple[Dict[PieceNames, int], Dict[PieceNames,
+        int]]]): Bitboards of the pieces of player_to_move and of the
+        opponent, e.g. as kept up to date by Board. When given, state is not
+        read and can be left empty.
+
+    Returns:
+        List[int]: List of legal moves the player can make, encoded as in
+        utils/move.py.
+    """
+
+    bitboards_player, bitboards_opp, white, legality = _prepare(state, player_to_move, last_move, bitboards)
+    occupied = legality[1]
+    en_passant_sq = _en_passant_square(last_move)
+
+    moves = _gen_promotions(bitboards_player, bitboards_opp, white, occupied)
+    moves.extend(_gen_captures(bitboards_player, bitboards_opp, white, occupied, en_passant_sq))
+    moves.extend(_gen_quiets(bitboards_player, bitboards_opp, white, occupied, castle_vec, opp_attacks))
+
+    return [move for move in moves if _is_legal(move, white, bitboards_opp, legality, opp_attacks)]
+
+
+def iter_moves(
+    state: Dict[str, Piece],
+    player_to_move: str,
+    castle_vec: Tuple[bool, bool, bool],
+    last_move: int,
+    opp_attacks: Optional[int] = None,
+    bitboards: Optional[Tuple[Dict[PieceNames, int], Dict[PieceNames, int]]] = None,
+) -> Iterator[int]:
+    """
+    Lazily yields the same legal moves as gen_moves(), in stages: promotions
+    (queen first), then captures ordered by MVV-LVA (most valuable victim
+    first, least valuable attacker breaking ties), then quiet moves. Each
+    stage is only generated once the previous one is used up, quiet moves one
+    at a time, and each move is tested for legality as it is yielded, so
+    callers that stop early (e.g. at the first quiet move after the captures,
+    or to test whether any legal move exists) skip the rest of the work.
+
+    Args:
+        state (dict): Board state, see gen_moves().
+
+        player_to_move (str): Player ('black' or 'white') to move.
+
+        castle_vec (Tuple[bool, bool, bool]): Castling state of the player,
+        see gen_moves().
+
+        last_move (int): Last move played by the opponent, see gen_moves().
+
+        opp_attacks (Optional[int]): Bitboard of squares attacked by the
+        opponent, see gen_moves().
+
+        bitboards (Optional[Tuple[Dict[PieceNames, int], Dict[PieceNames,
+        int]]]): Bitboards of both players' pieces, see gen_moves().
+
+    Returns:
+        Iterator[int]: Legal moves, encoded as in utils/move.py.
+    """
+
+    bitboards_player, bitboards_opp, white, legality = _prepare(state, player_to_move, last_move, bitboards)
+    occupied = legality[1]
+
+    for move in _gen_promotions(bitboards_player, bitboards_opp, white, occupied):
+        if _is_legal(move, white, bitboards_opp, legality, opp_attacks):
+            yield move
+
+    captures = _gen_captures(bitboards_player, bitboards_opp, white, occupied, _en_passant_square(last_move))
+    if captures:
+        names = {sq: name for bitboards in [bitboards_player, bitboards_opp] for name, sq in _iter_pieces(bitboards)}
+        captures.sort(key=lambda move: _mvv_lva(move, names))
+        for move in captures:
+            if _is_legal(move, white, bitboards_opp, legality, opp_attacks):
+                yield move
+
+    for move in _gen_quiets(bitboards_player, bitboards_opp, white, occupied, castle_vec, opp_attacks):
+        if _is_legal(move, white, bitboards_opp, legality, opp_attacks):
+            yield move
+
+
+def _prepare(
+    state: Dict[str, Piece],
+    player_to_move: str,
+    last_move: int,
+    bitboards: Optional[Tuple[Dict[PieceNames, int], Dict[PieceNames, int]]] = None,
+) -> Tuple[Dict[PieceNames, int], Dict[PieceNames, int], bool, Tuple[int, int, int, Dict[int, int], int]]:
+    """
+    Converts the board state to bitboards (unless they are given), and finds
+    the checkers and pins of the player's king once, so most moves are legal
+    by mask membership alone.
+
+    Returns:
+        Dict[PieceNames, int]: Bitboards of the player.
+
+        Dict[PieceNames, int]: Bitboards of the opponent.
+
+        bool: True if the player is white.
+
+        Tuple[int, int, int, Dict[int, int], int]: King square, occupancy and
+        the check mask, pin masks and king x-ray squares (see
+        _gen_check_and_pin_masks()), as used by _is_legal().
+    """
+
+    if bitboards is None:
+        bitboards = state_to_bitboards(state, player_to_move)
+    bitboards_player, bitboards_opp = bitboards
+    white = player_to_move.lower() == "white"
+
+    assert PieceNames.KING in bitboards_player, "Error: gen_moves() called without a king for %s" % (player_to_move)
+    king_sq = bitboards_player[PieceNames.KING].bit_length() - 1
+    own = _union(bitboards_player)
+    occupied = own | _union(bitboards_opp)
+
+    check_mask, pin_masks, king_xray = _gen_check_and_pin_masks(king_sq, own, occupied, bitboards_opp, white)
+
+    return bitboards_player, bitboards_opp, white, (king_sq, occupied, check_mask, pin_masks, king_xray)
+
+
+def _is_legal(
+    move: int,
+    white: bool,
+    bitboards_opp: Dict[PieceNames, int],
+    legality: Tuple[int, int, int, Dict[int, int], int],
+    opp_attacks: Optional[int],
+) -> bool:
+    """
+    Tests whether a pseudo-legal move leaves the player's own king safe.
+
+    Args:
+        move (int): Pseudo-legal move, encoded as in utils/move.py.
+
+        white (bool): True if the player is white.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        legality (Tuple[int, int, int, Dict[int, int], int]): Masks of the
+        position, as returned by _prepare().
+
+        opp_attacks (Optional[int]): Bitboard of squares attacked by the
+        opponent, see gen_moves().
+
+    Returns:
+        bool: True if the move is legal.
+    """
+
+    king_sq, occupied, check_mask, pin_masks, king_xray = legality
+    sq_from, sq_to, flags = move & 63, (move >> 6) & 63, move >> 12
+    to_bit = 1 << sq_to
+    if sq_from == king_sq:
+        # castling is tested during generation, other king moves must not land on an attacked square
+        if flags in [KING_CASTLE, QUEEN_CASTLE]:
+            return True
+        if opp_attacks is not None:
+            # the attack map is blocked by the king itself, so add the square behind it to checking sliders
+            return not (opp_attacks | king_xray) & to_bit
+        captured = to_bit if flags & CAPTURE else 0
+        return not _is_attacked(sq_to, occupied & ~(1 << sq_from), bitboards_opp, white, captured)
+    if flags == EN_PASSANT:
+        # en-passant removes two pieces from the same row, which pins can't capture
+        captured = 1 << (sq_to - 8 if white else sq_to + 8)
+        occupied_after = (occupied & ~(1 << sq_from) & ~captured) | to_bit
+        return not _is_attacked(king_sq, occupied_after, bitboards_opp, white, captured)
+
+    return bool(to_bit & check_mask & pin_masks.get(sq_from, to_bit))
+
+
+def _mvv_lva(move: int, names: Dict[int, PieceNames]) -> Tuple[int, int]:
+    """
+    Sort key of a capture by MVV-LVA: the most valuable victim first, the
+    least valuable attacker breaking ties. En-passant captures land on an
+    empty square, and take a pawn.
+    """
+    victim = names.get((move >> 6) & 63, PieceNames.PAWN)
+    return -PieceValues[victim], PieceValues[names[move & 63]]
+
+
+def _en_passant_square(last_move: int) -> int:
+    """
+    Square a pawn can capture en-passant onto after the opponent's last move,
+    or -1.
+    """
+    if is_double_pawn_push(last_move):
+        return (move_from(last_move) + move_to(last_move)) >> 1
+    return -1
+
+
+def is_under_check(state: Dict[str, Piece], player: str) -> bool:
+    """
+    Tests whether the king of the input player is attacked by any opponent
+    piece.
+
+    Args:
+        state (dict): Board state as a dictionary, where the key is the
+        location of the piece, and the value is a Piece object on that
+        location.
+
+        player (str): Player ('black' or 'white') whose king is tested.
+
+    Returns:
+        bool: True if the player's king is under check, False otherwise.
+    """
+
+    bitboards_player, bitboards_opp = state_to_bitboards(state, player)
+    assert PieceNames.KING in bitboards_player, "Error: is_under_check() called without a king for %s" % (player)
+    king_sq = bitboards_player[PieceNames.KING].bit_length() - 1
+    occupied = _union(bitboards_player) | _union(bitboards_opp)
+
+    return _is_attacked(king_sq, occupied, bitboards_opp, player.lower() == "white")
+
+
+def _gen_promotions(
+    bitboards_player: Dict[PieceNames, int], bitboards_opp: Dict[PieceNames, int], white: bool, occupied: int
+) -> List[int]:
+    """
+    Generates the pseudo-legal pawn promotions of the player, with or without
+    capture. Moves are not tested for leaving the player's own king under
+    check, see _is_legal().
+
+    Args:
+        bitboards_player (Dict[PieceNames, int]): Bitboards of the player.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        white (bool): True if the player is white.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+    Returns:
+        List[int]: List of moves, encoded as in utils/move.py.
+    """
+
+    moves: List[int] = []
+    opp = _union(bitboards_opp)
+    forward = 8 if white else -8
+    last_row = 0xFF << (48 if white else 8)
+    for sq_from in iter_bits(bitboards_player.get(PieceNames.PAWN, 0) & last_row):
+        for sq_to in iter_bits(PAWN_ATTACK_MASKS[white][sq_from] & opp):
+            moves.extend(encode_move(sq_from, sq_to, promotion_flags(name, True)) for name in PROMOTION_ORDER)
+        if not (occupied >> (sq_from + forward)) & 1:
+            moves.extend(encode_move(sq_from, sq_from + forward, promotion_flags(name)) for name in PROMOTION_ORDER)
+
+    return moves
+
+
+def _gen_captures(
+    bitboards_player: Dict[PieceNames, int],
+    bitboards_opp: Dict[PieceNames, int],
+    white: bool,
+    occupied: int,
+    en_passant_sq: int,
+) -> List[int]:
+    """
+    Generates the pseudo-legal captures of the player, including en-passant
+    captures but not promotions with capture (see _gen_promotions()).
+
+    Args:
+        bitboards_player (Dict[PieceNames, int]): Bitboards of the player.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        white (bool): True if the player is white.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+        en_passant_sq (int): Square a pawn can capture en-passant onto, or -1.
 
     Returns:
-        List[str]: List of legal moves the player can make, expresed in our
-        custom algebraic notation.
+        List[int]: List of moves, encoded as in utils/move.py.
+    """
+
+    moves: List[int] = []
+    opp = _union(bitboards_opp)
+
+    last_row = 0xFF << (48 if white else 8)
+    for sq_from in iter_bits(bitboards_player.get(PieceNames.PAWN, 0) & ~last_row):
+        for sq_to in iter_bits(PAWN_ATTACK_MASKS[white][sq_from] & opp):
+            moves.append(encode_move(sq_from, sq_to, CAPTURE))
+        if en_passant_sq >= 0 and (PAWN_ATTACK_MASKS[white][sq_from] >> en_passant_sq) & 1:
+            moves.append(encode_move(sq_from, en_passant_sq, EN_PASSANT))
+
+    for piece_name in [PieceNames.KNIGHT, PieceNames.BISHOP, PieceNames.ROOK, PieceNames.QUEEN, PieceNames.KING]:
+        for sq_from in iter_bits(bitboards_player.get(piece_name, 0)):
+            for sq_to in iter_bits(piece_attacks(piece_name, sq_from, occupied) & opp):
+                moves.append(encode_move(sq_from, sq_to, CAPTURE))
+
+    return moves
+
+
+def _gen_quiets(
+    bitboards_player: Dict[PieceNames, int],
+    bitboards_opp: Dict[PieceNames, int],
+    white: bool,
+    occupied: int,
+    castle_vec: Tuple[bool, bool, bool],
+    opp_attacks: Optional[int] = None,
+) -> Iterator[int]:
     """
+    Lazily yields the pseudo-legal moves of the player that capture nothing,
+    except promotions (see _gen_promotions()), pawn pushes first. Castling
+    moves are only generated if the king does not pass through an attacked
+    square, so they are always legal.
+
+    Args:
+        bitboards_player (Dict[PieceNames, int]): Bitboards of the player.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        white (bool): True if the player is white.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+        castle_vec (Tuple[bool, bool, bool]): Castling state of the player,
+        see gen_moves().
+
+        opp_attacks (Optional[int]): Bitboard of squares attacked by the
+        opponent, see gen_moves().
+
+    Returns:
+        Iterator[int]: Moves, encoded as in utils/move.py, each generated
+        only once it is asked for.
+    """
+
+    # single and double pawn pushes
+    forward = 8 if white else -8
+    start_row = 1 if white else 6
+    last_row = 0xFF << (48 if white else 8)
+    for sq_from in iter_bits(bitboards_player.get(PieceNames.PAWN, 0) & ~last_row):
+        sq_to = sq_from + forward
+        if not (occupied >> sq_to) & 1:
+            yield encode_move(sq_from, sq_to)
+            if (sq_from >> 3) == start_row and not (occupied >> (sq_to + forward)) & 1:
+                yield encode_move(sq_from, sq_to + forward, DOUBLE_PAWN_PUSH)
+
+    # knight, bishop, rook, queen and king moves
+    for piece_name in [PieceNames.KNIGHT, PieceNames.BISHOP, PieceNames.ROOK, PieceNames.QUEEN, PieceNames.KING]:
+        for sq_from in iter_bits(bitboards_player.get(piece_name, 0)):
+            for sq_to in iter_bits(piece_attacks(piece_name, sq_from, occupied) & ~occupied):
+                yield encode_move(sq_from, sq_to)
+
+    # castling, only possible if the king and rook are on their starting squares
+    home = 4 if white else 60
+    rooks = bitboards_player.get(PieceNames.ROOK, 0)
+    if castle_vec[1] and bitboards_player[PieceNames.KING] == 1 << home:
+        if opp_attacks is None:  # only the squares the king stands on or passes through matter
+            opp_attacks = 0
+            for sq in range(home - 2, home + 3):
+                if _is_attacked(sq, occupied, bitboards_opp, white):
+                    opp_attacks |= 1 << sq
+        if not (opp_attacks >> home) & 1:
+            if castle_vec[0] and (rooks >> (home + 3)) & 1 and not (occupied | opp_attacks) & (0b11 << (home + 1)):
+                yield encode_move(home, home + 2, KING_CASTLE)
+            if castle_vec[2] and (rooks >> (home - 4)) & 1 and not occupied & (0b111 << (home - 3)):
+                if not opp_attacks & (0b11 << (home - 2)):
+                    yield encode_move(home, home - 2, QUEEN_CASTLE)
+
+
+def _gen_check_and_pin_masks(
+    king_sq: int, own: int, occupied: int, bitboards_opp: Dict[PieceNames, int], white: bool
+) -> Tuple[int, Dict[int, int], int]:
+    """
+    Finds the opponent pieces giving check and the player's pieces that are
+    pinned to their king, in one pass over the rays leaving the king.
+
+    Args:
+        king_sq (int): Square of the player's king.
+
+        own (int): Bitboard of all the player's pieces.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        white (bool): True if the player is white.
+
+    Returns:
+        int: Bitboard of squares a non-king piece must move to in order to
+        capture or block the checker. All squares if not under check, and no
+        squares if under double check.
+
+        Dict[int, int]: Bitboard of the pin ray (up to and including the
+        pinning piece) of each pinned piece, keyed by its square.
+
+        int: Bitboard of the squares right behind the king as seen from each
+        checking slider. They stay attacked once the king steps back.
+    """
+
+    checkers = KNIGHT_MASKS[king_sq] & bitboards_opp.get(PieceNames.KNIGHT, 0)
+    checkers |= PAWN_ATTACK_MASKS[white][king_sq] & bitboards_opp.get(PieceNames.PAWN, 0)
+    check_ray = checkers
+    king_xray = 0
+    pin_masks: Dict[int, int] = {}
+
+    queens = bitboards_opp.get(PieceNames.QUEEN, 0)
+    sliders = [
+        (DIAGONAL_DIRECTIONS, bitboards_opp.get(PieceNames.BISHOP, 0) | queens),
+        (ORTHOGONAL_DIRECTIONS, bitboards_opp.get(PieceNames.ROOK, 0) | queens),
+    ]
+    for directions, attackers in sliders:
+        if not attackers:
+            continue
+        for d in directions:
+            ray, blocker = 0, -1
+            for sq in RAYS[king_sq][d]:
+                ray |= 1 << sq
+                if (occupied >> sq) & 1:
+                    if (own >> sq) & 1:
+                        if blocker >= 0:  # two of the player's pieces shield the king
+                            break
+                        blocker = sq
+                    else:
+                        if (attackers >> sq) & 1:
+                            if blocker < 0:
+                                checkers |= 1 << sq
+                                check_ray |= ray
+                                behind = RAYS[king_sq][OPPOSITE_DIRECTIONS[d]]
+                                king_xray |= (1 << behind[0]) if behind else 0
+                            else:
+                                pin_masks[blocker] = ray
+                        break
+
+    if not checkers:
+        return ~0, pin_masks, king_xray
+    if checkers & (checkers - 1):  # double check, only the king can move
+        return 0, pin_masks, king_xray
+
+    return check_ray, pin_masks, king_xray
+
+
+def piece_attacks(piece_name: PieceNames, sq: int, occupied: int) -> int:
+    """
+    Bitboard of squares attacked by a non-pawn piece standing on sq, given
+    the occupancy of the board (sliding pieces are blocked by any piece).
+
+    Args:
+        piece_name (PieceNames): Enum of the piece name/type.
 
-    legal_moves: List[str] = []
+        sq (int): Square the piece stands on.
 
-    # convert board state to bitboards of each piece
-    bitboards_player, bitboards_opp = _state_to_bitboards(state, player_to_move)
+        occupied (int): Bitboard of all pieces on the board.
 
-    return legal_moves
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+
+    if piece_name == PieceNames.KNIGHT:
+        return KNIGHT_MASKS[sq]
+    if piece_name == PieceNames.KING:
+        return KING_MASKS[sq]
+    if piece_name == PieceNames.BISHOP:
+        return _slider_attacks(sq, occupied, DIAGONAL_DIRECTIONS)
+    if piece_name == PieceNames.ROOK:
+        return _slider_attacks(sq, occupied, ORTHOGONAL_DIRECTIONS)
+    return _slider_attacks(sq, occupied, DIAGONAL_DIRECTIONS) | _slider_attacks(sq, occupied, ORTHOGONAL_DIRECTIONS)
+
+
+def _slider_attacks(sq: int, occupied: int, directions: List[int]) -> int:
+    """
+    Bitboard of squares attacked by a sliding piece on sq, along each
+    direction until the edge of the board or the first occupied square
+    (which is included, as it is either captured or defended).
+
+    Args:
+        sq (int): Square the piece stands on.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+        directions (List[int]): Indices of the directions to slide in.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+
+    attacks = 0
+    for d in directions:
+        ray = RAY_MASKS[sq][d]
+        blockers = ray & occupied
+        if blockers:
+            # cut the ray beyond the nearest blocker, using the blocker's own ray
+            if DIRECTION_IS_POSITIVE[d]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAY_MASKS[blocker][d]
+        attacks |= ray
+
+    return attacks
+
+
+def _is_attacked(sq: int, occupied: int, bitboards_opp: Dict[PieceNames, int], white: bool, captured: int = 0) -> bool:
+    """
+    Tests whether sq is attacked by any opponent piece.
+
+    Args:
+        sq (int): Square to test.
+
+        occupied (int): Bitboard of all pieces on the board.
+
+        bitboards_opp (Dict[PieceNames, int]): Bitboards of the opponent.
+
+        white (bool): True if the player (not the opponent) is white.
+
+        captured (int): Bitboard of an opponent piece that should be treated
+        as captured, i.e. ignored as an attacker.
+
+    Returns:
+        bool: True if the square is attacked.
+    """
+
+    alive = ~captured
+    if KNIGHT_MASKS[sq] & bitboards_opp.get(PieceNames.KNIGHT, 0) & alive:
+        return True
+    if PAWN_ATTACK_MASKS[white][sq] & bitboards_opp.get(PieceNames.PAWN, 0) & alive:
+        return True
+    if KING_MASKS[sq] & bitboards_opp.get(PieceNames.KING, 0):
+        return True
+
+    queens = bitboards_opp.get(PieceNames.QUEEN, 0)
+    diagonal = (bitboards_opp.get(PieceNames.BISHOP, 0) | queens) & alive
+    if diagonal and _slider_attacks(sq, occupied, DIAGONAL_DIRECTIONS) & diagonal:
+        return True
+    orthogonal = (bitboards_opp.get(PieceNames.ROOK, 0) | queens) & alive
+    if orthogonal and _slider_attacks(sq, occupied, ORTHOGONAL_DIRECTIONS) & orthogonal:
+        return True
+
+    return False
+
+
+def _union(bitboards: Dict[PieceNames, int]) -> int:
+    """
+    Bitwise OR of all bitboards of a player.
+    """
+    occupied = 0
+    for bitboard in bitboards.values():
+        occupied |= bitboard
+    return occupied
+
+
+def _iter_pieces(bitboards: Dict[PieceNames, int]) -> Iterator[Tuple[PieceNames, int]]:
+    """
+    Yields the name and square of each piece of a player.
+    """
+    for name, bitboard in bitboards.items():
+        for sq in iter_bits(bitboard):
+            yield name, sq
+
+
+def iter_bits(bitboard: int) -> Iterator[int]:
+    """
+    Yields the square index of each set bit in the bitboard, lowest first.
+    """
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
 
 
-def _state_to_bitboards(
+def state_to_bitboards(
     state: Dict[str, Piece], player_to_move: str
 ) -> Tuple[Dict[PieceNames, int], Dict[PieceNames, int]]:
     """
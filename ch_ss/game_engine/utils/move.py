@@ -0,0 +1,207 @@
+"""
+Compact integer encoding of chess moves. Each move is packed into 16 bits:
+
+    bits 0-5:   square the piece moves from (0-63, see utils/tables.py)
+    bits 6-11:  square the piece moves to
+    bits 12-15: flags describing the kind of move, see below
+
+Moves are only rendered to our custom algebraic notation (e.g. Qd1xd8,
+e7e8=Q, O-O) when they are printed or logged.
+"""
+
+from typing import Dict
+
+from ch_ss.game_engine.core.piece import Piece, PieceNames
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES, SQUARE_NAMES
+
+# Move flags. The capture bit is shared by captures, en-passant captures and
+# promotions with capture, and the two lowest bits of a promotion select the
+# piece promoted to (see PROMOTION_PIECE_NAMES)
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8
+PROMOTION_CAPTURE = 12
+
+# Placeholder for "no move", e.g. the last move before the game has started
+NULL_MOVE = 0
+
+# Pieces a pawn can be promoted to, indexed by the two lowest promotion flag bits
+PROMOTION_PIECE_NAMES = [PieceNames.KNIGHT, PieceNames.BISHOP, PieceNames.ROOK, PieceNames.QUEEN]
+
+# Prefix of each non-pawn piece in our custom algebraic notation
+PIECE_LETTERS = {
+    PieceNames.KNIGHT: "N",
+    PieceNames.BISHOP: "B",
+    PieceNames.ROOK: "R",
+    PieceNames.QUEEN: "Q",
+    PieceNames.KING: "K",
+}
+LETTER_PIECE_NAMES = {letter: name for name, letter in PIECE_LETTERS.items()}
+
+
+def encode_move(sq_from: int, sq_to: int, flags: int = QUIET) -> int:
+    """
+    Packs a move into its integer encoding.
+
+    Args:
+        sq_from (int): Square the piece moves from.
+
+        sq_to (int): Square the piece moves to.
+
+        flags (int): Kind of move, one of the flags above.
+
+    Returns:
+        int: Encoded move.
+    """
+    return sq_from | (sq_to << 6) | (flags << 12)
+
+
+def promotion_flags(piece_name: PieceNames, capture: bool = False) -> int:
+    """
+    Flags of a pawn promotion to the input piece, with or without capture.
+    """
+    return (PROMOTION_CAPTURE if capture else PROMOTION) | PROMOTION_PIECE_NAMES.index(piece_name)
+
+
+def move_from(move: int) -> int:
+    """
+    Square the piece moves from.
+    """
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    """
+    Square the piece moves to.
+    """
+    return (move >> 6) & 63
+
+
+def move_flags(move: int) -> int:
+    """
+    Flags describing the kind of move.
+    """
+    return move >> 12
+
+
+def is_capture(move: int) -> bool:
+    """
+    True for captures, including en-passant captures and promotions with
+    capture.
+    """
+    return bool(move & (CAPTURE << 12))
+
+
+def is_en_passant(move: int) -> bool:
+    """
+    True for en-passant captures.
+    """
+    return move >> 12 == EN_PASSANT
+
+
+def is_castle(move: int) -> bool:
+    """
+    True for both O-O and O-O-O.
+    """
+    return move >> 12 in [KING_CASTLE, QUEEN_CASTLE]
+
+
+def is_double_pawn_push(move: int) -> bool:
+    """
+    True for pawns moving two squares forward from their starting row.
+    """
+    return move >> 12 == DOUBLE_PAWN_PUSH
+
+
+def is_promotion(move: int) -> bool:
+    """
+    True for pawn promotions, with or without capture.
+    """
+    return bool(move & (PROMOTION << 12))
+
+
+def promotion_piece_name(move: int) -> PieceNames:
+    """
+    Name of the piece a pawn is promoted to. Only meaningful if
+    is_promotion(move) is True.
+    """
+    return PROMOTION_PIECE_NAMES[(move >> 12) & 3]
+
+
+def move_to_str(move: int, piece_name: PieceNames) -> str:
+    """
+    Renders the move in our custom algebraic notation.
+
+    Args:
+        move (int): Encoded move.
+
+        piece_name (PieceNames): Enum of the piece that moves, as the encoding
+        itself does not hold it.
+
+    Returns:
+        str: Move in our custom algebraic notation (e.g. Qd1xd8, e7e8=Q, O-O).
+    """
+
+    flags = move >> 12
+    if flags == KING_CASTLE:
+        return "O-O"
+    if flags == QUEEN_CASTLE:
+        return "O-O-O"
+
+    sep = "x" if flags & CAPTURE else ""
+    notation = SQUARE_NAMES[move & 63] + sep + SQUARE_NAMES[(move >> 6) & 63]
+    if piece_name != PieceNames.PAWN:
+        return PIECE_LETTERS[piece_name] + notation
+    if flags & PROMOTION:
+        return notation + "=" + PIECE_LETTERS[PROMOTION_PIECE_NAMES[flags & 3]]
+
+    return notation
+
+
+def str_to_move(move: str, color: str, state: Dict[str, Piece]) -> int:
+    """
+    Parses a move expressed in our custom algebraic notation. The board state
+    the move is played on is needed to tell en-passant captures apart.
+
+    Args:
+        move (str): Move in our custom algebraic notation.
+
+        color (str): Player ('black' or 'white') making the move.
+
+        state (dict): Board state as a dictionary, where the key is the
+        location of the piece, and the value is a Piece object on that
+        location.
+
+    Returns:
+        int: Encoded move.
+    """
+
+    home = 4 if color.lower() == "white" else 60
+    if move == "O-O":
+        return encode_move(home, home + 2, KING_CASTLE)
+    if move == "O-O-O":
+        return encode_move(home, home - 2, QUEEN_CASTLE)
+
+    if move[0] in LETTER_PIECE_NAMES:  # non-pawn
+        sq_from, rest = move[1:3], move[3:]
+        capture = rest[0] == "x"
+        return encode_move(SQUARE_INDICES[sq_from], SQUARE_INDICES[rest[-2:]], CAPTURE if capture else QUIET)
+
+    # must be a pawn move
+    sq_from, rest = move[0:2], move[2:]
+    capture = rest[0] == "x"
+    sq_to = rest[1:3] if capture else rest[0:2]
+    if "=" in move:
+        flags = promotion_flags(LETTER_PIECE_NAMES[move.split("=")[1]], capture)
+    elif capture:
+        flags = CAPTURE if sq_to in state else EN_PASSANT
+    elif abs(int(sq_to[1]) - int(sq_from[1])) == 2:
+        flags = DOUBLE_PAWN_PUSH
+    else:
+        flags = QUIET
+
+    return encode_move(SQUARE_INDICES[sq_from], SQUARE_INDICES[sq_to], flags)
@@ -0,0 +1,103 @@
+"""
+Lookup tables of the board geometry, built once at import time so that move
+generators never have to compute squares on the fly.
+
+Squares are indexed 0-63, starting from a1 (0) and moving along each row
+first, i.e. b1 is 1, a2 is 8 and h8 is 63. This is also the bit order of our
+bitboards.
+"""
+
+from typing import Dict, List, Tuple
+
+from ch_ss.game_engine.utils.utils import COLUMN_ALPHABETS
+
+# Square index <-> algebraic notation of the square (e.g. 12 <-> e2)
+SQUARE_NAMES: List[str] = [COLUMN_ALPHABETS[sq & 7] + str((sq >> 3) + 1) for sq in range(64)]
+SQUARE_INDICES: Dict[str, int] = {name: sq for sq, name in enumerate(SQUARE_NAMES)}
+
+# (column, row) steps of the 8 ray directions, the first four are orthogonal
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+ORTHOGONAL_DIRECTIONS = [0, 1, 2, 3]
+DIAGONAL_DIRECTIONS = [4, 5, 6, 7]
+
+# Index of the direction pointing the opposite way of each direction
+OPPOSITE_DIRECTIONS = [DIRECTIONS.index((-d_col, -d_row)) for d_col, d_row in DIRECTIONS]
+
+# True for directions that walk towards higher square indices
+DIRECTION_IS_POSITIVE = [d_row > 0 or (d_row == 0 and d_col > 0) for d_col, d_row in DIRECTIONS]
+
+# (column, row) steps of the leaping pieces
+KNIGHT_STEPS = [(1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1)]
+KING_STEPS = list(DIRECTIONS)
+
+
+def _gen_targets(steps: List[Tuple[int, int]]) -> List[List[int]]:
+    """
+    Computes, for every square, the squares reachable with a single step from
+    the input list of steps (e.g. knight jumps) that stay on the board.
+
+    Args:
+        steps (List[Tuple[int, int]]): List of (column, row) steps.
+
+    Returns:
+        List[List[int]]: Reachable squares, indexed by square.
+    """
+
+    targets = []
+    for sq in range(64):
+        col, row = sq & 7, sq >> 3
+        targets.append(
+            [(row + d_row) * 8 + col + d_col for d_col, d_row in steps if -1 < col + d_col < 8 and -1 < row + d_row < 8]
+        )
+
+    return targets
+
+
+def _gen_rays() -> List[List[List[int]]]:
+    """
+    Computes, for every square and each of the 8 directions, the squares a
+    sliding piece passes over on an empty board, ordered outwards.
+
+    Returns:
+        List[List[List[int]]]: Rays indexed by square, then direction.
+    """
+
+    rays = []
+    for sq in range(64):
+        col, row = sq & 7, sq >> 3
+        sq_rays = []
+        for d_col, d_row in DIRECTIONS:
+            ray = []
+            c, r = col + d_col, row + d_row
+            while -1 < c < 8 and -1 < r < 8:
+                ray.append(r * 8 + c)
+                c, r = c + d_col, r + d_row
+            sq_rays.append(ray)
+        rays.append(sq_rays)
+
+    return rays
+
+
+def _to_mask(squares: List[int]) -> int:
+    """
+    Bitboard with the bits of the input squares set.
+    """
+    mask = 0
+    for sq in squares:
+        mask |= 1 << sq
+    return mask
+
+
+KNIGHT_TARGETS = _gen_targets(KNIGHT_STEPS)
+KING_TARGETS = _gen_targets(KING_STEPS)
+
+# Squares attacked by a pawn standing on each square, keyed by "is white pawn"
+PAWN_ATTACK_TARGETS = {True: _gen_targets([(-1, 1), (1, 1)]), False: _gen_targets([(-1, -1), (1, -1)])}
+
+RAYS = _gen_rays()
+
+# Same tables as above, as bitboards
+KNIGHT_MASKS = [_to_mask(targets) for targets in KNIGHT_TARGETS]
+KING_MASKS = [_to_mask(targets) for targets in KING_TARGETS]
+PAWN_ATTACK_MASKS = {white: [_to_mask(targets) for targets in PAWN_ATTACK_TARGETS[white]] for white in [True, False]}
+RAY_MASKS = [[_to_mask(ray) for ray in sq_rays] for sq_rays in RAYS]
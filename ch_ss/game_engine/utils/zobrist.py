@@ -0,0 +1,131 @@
+"""
+Zobrist hashing of positions into 64-bit keys. The key of a position is the
+XOR of a random number for each piece on its square, the side to move, each
+castling right held and the en-passant file, so it can be updated with a
+couple of XORs as pieces move instead of being recomputed.
+
+Squares are indexed 0-63, see utils/tables.py.
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+from ch_ss.game_engine.utils.utils import COLUMN_ALPHABETS
+
+# Fixed seed, so keys are stable across runs and processes
+_rng = random.Random(0x5EED)
+
+# Key of each piece on each square, keyed by (color, name) and indexed by square
+PIECE_KEYS: Dict[Tuple[PieceColors, PieceNames], List[int]] = {
+    (color, name): [_rng.getrandbits(64) for _ in range(64)]
+    for color in [PieceColors.WHITE, PieceColors.BLACK]
+    for name in PieceNames
+    if name != PieceNames.EMPTY
+}
+
+# Toggled when black is to move
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+
+# Key of each castling right (O-O, O-O-O) of each player
+CASTLING_KEYS: Dict[str, List[int]] = {
+    color: [_rng.getrandbits(64), _rng.getrandbits(64)] for color in ["white", "black"]
+}
+
+# Key of the file a pawn can be captured en-passant on, keyed by column
+EN_PASSANT_KEYS: Dict[str, int] = {col: _rng.getrandbits(64) for col in COLUMN_ALPHABETS}
+
+
+def piece_key(piece: Piece, sq: int) -> int:
+    """
+    Key of the piece standing on square sq, 0 for an empty piece.
+    """
+    if piece.is_empty():
+        return 0
+    return PIECE_KEYS[(piece.color, piece.name)][sq]
+
+
+def castling_key(color: str, castle_vec: List[bool]) -> int:
+    """
+    Key of the castling rights of a player, given its castling vector in the
+    (O-O rook not moved, King not moved, O-O-O rook not moved) layout of
+    gen_moves(). Vectors that allow the same castling moves hash the same.
+
+    Args:
+        color (str): Player ('black' or 'white') the vector belongs to.
+
+        castle_vec (List[bool]): Castling vector of the player.
+
+    Returns:
+        int: XOR of the keys of the castling rights held.
+    """
+
+    key = 0
+    if castle_vec[1] and castle_vec[0]:
+        key ^= CASTLING_KEYS[color][0]
+    if castle_vec[1] and castle_vec[2]:
+        key ^= CASTLING_KEYS[color][1]
+    return key
+
+
+def en_passant_key(en_passant: Tuple[str, bool]) -> int:
+    """
+    Key of the en-passant state, as (column, offered) offered to the player
+    to move, 0 if no en-passant capture is offered.
+    """
+    col, offered = en_passant
+    return EN_PASSANT_KEYS[col] if offered else 0
+
+
+def state_key(to_move: str, castle_vecs: Dict[str, List[bool]], en_passant: Tuple[str, bool]) -> int:
+    """
+    Part of the key that is not about pieces: side to move, castling rights
+    and en-passant file.
+
+    Args:
+        to_move (str): Player ('black' or 'white') to move.
+
+        castle_vecs (Dict[str, List[bool]]): Castling vector of each player,
+        keyed by 'white'/'black'.
+
+        en_passant (Tuple[str, bool]): En-passant state offered to the player
+        to move.
+
+    Returns:
+        int: Key of the game state.
+    """
+
+    key = BLACK_TO_MOVE_KEY if to_move == "black" else 0
+    key ^= castling_key("white", castle_vecs["white"]) ^ castling_key("black", castle_vecs["black"])
+    return key ^ en_passant_key(en_passant)
+
+
+def zobrist_hash(
+    state: Dict[str, Piece], to_move: str, castle_vecs: Dict[str, List[bool]], en_passant: Tuple[str, bool]
+) -> int:
+    """
+    Computes the key of a position from scratch. Used to verify the keys
+    that are updated incrementally.
+
+    Args:
+        state (dict): Board state as a dictionary, where the key is the
+        location of the piece, and the value is a Piece object on that
+        location.
+
+        to_move (str): Player ('black' or 'white') to move.
+
+        castle_vecs (Dict[str, List[bool]]): Castling vector of each player,
+        keyed by 'white'/'black'.
+
+        en_passant (Tuple[str, bool]): En-passant state offered to the player
+        to move.
+
+    Returns:
+        int: 64-bit Zobrist key.
+    """
+
+    key = state_key(to_move, castle_vecs, en_passant)
+    for sid, piece in state.items():
+        key ^= piece_key(piece, SQUARE_INDICES[sid])
+    return key
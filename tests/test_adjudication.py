@@ -0,0 +1,108 @@
+"""
+Pytest unit tests for game adjudication.
+"""
+from typing import Optional
+
+import pytest
+
+from ch_ss.game_engine.core.adjudication import (
+    Adjudication,
+    is_insufficient_material,
+    material_margin,
+)
+from ch_ss.game_engine.core.compact_board import CompactBoard
+from ch_ss.game_engine.core.game import GameOutcome, StandardGame
+from ch_ss.game_engine.utils.fen import fen_to_mailbox
+from ch_ss.game_engine.utils.move import encode_move
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def play(game: StandardGame, *moves: str) -> Optional[GameOutcome]:
+    """
+    Pushes moves given as from and to squares (e.g. 'g1f3'), and returns the
+    adjudication of the position reached.
+    """
+    for move in moves:
+        game.push(encode_move(SQUARE_INDICES[move[:2]], SQUARE_INDICES[move[2:]]))
+    return game.adjudicate()
+
+
+@pytest.mark.parametrize(
+    "placement, insufficient",
+    [
+        ("4k3/8/8/8/8/8/8/4K3", True),
+        ("4k3/8/8/8/8/8/8/4KN2", True),
+        ("4kb2/8/8/8/8/8/8/2B1K3", True),  # bishops on dark squares only
+        ("4k1b1/8/8/8/8/8/8/2B1K3", False),
+        ("4kn2/8/8/8/8/8/8/4KN2", False),
+        ("4k3/8/8/8/8/8/4P3/4K3", False),
+        ("4k3/8/8/8/8/8/8/R3K3", False),
+    ],
+)
+def test_insufficient_material(placement, insufficient):
+    assert is_insufficient_material(CompactBoard(fen_to_mailbox(placement))) == insufficient
+
+
+def test_material_margin():
+    position = CompactBoard(fen_to_mailbox("rnb1kbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"))
+    assert material_margin(position) == 9
+
+
+def test_threefold_repetition():
+    """
+    Shuffling knights back and forth repeats the start position a third time
+    after eight plies.
+    """
+    game = StandardGame()
+    shuffle = ["g1f3", "g8f6", "f3g1", "f6g8"]
+    assert play(game, *shuffle) is None
+    assert play(game, *shuffle) == GameOutcome("1/2-1/2", "threefold repetition")
+    assert play(StandardGame(Adjudication(repetitions=0)), *shuffle, *shuffle) is None
+
+
+def test_fifty_move_rule_resets_on_pawn_moves():
+    """
+    The halfmove clock counts plies without a capture or a pawn move, and
+    the game is drawn once it reaches 100.
+    """
+    game = StandardGame.from_fen("4k3/8/8/8/8/8/4P3/R3K3 w - - 98 80")
+    assert play(game, "a1a2") is None
+    assert game.state.halfmove_clock == 99
+    assert play(game, "e8d8") == GameOutcome("1/2-1/2", "50-move rule")
+
+    game = StandardGame.from_fen("4k3/8/8/8/8/8/4P3/R3K3 w - - 99 80")
+    assert play(game, "e2e3") is None
+    assert game.state.halfmove_clock == 0
+
+
+def test_mate_takes_precedence_over_draw_rules():
+    """
+    A checkmate delivered on the 100th ply without a capture or a pawn move
+    wins instead of drawing by the 50-move rule, and a position without legal
+    moves is scored as a stalemate whatever the clock.
+    """
+    game = StandardGame.from_fen("k7/8/1K6/8/8/8/8/7R w - - 99 80")
+    assert play(game, "h1h8") == GameOutcome("1-0", "checkmate")
+    assert game.state.halfmove_clock == 100
+
+    game = StandardGame.from_fen("k7/8/K7/8/8/8/8/2R5 w - - 99 80")
+    assert play(game, "c1b1") == GameOutcome("1/2-1/2", "stalemate")
+
+
+def test_material_thresholds():
+    """
+    The side a rook down resigns once the margin held for resign_plies plies,
+    and a level endgame is agreed drawn after draw_plies plies.
+    """
+    moves = ["a1a2", "e8d8", "a2a1", "d8e8"]
+    fen = "4k3/8/8/8/8/8/8/R3K3 w - - 0 60"
+    assert play(StandardGame.from_fen(fen), *moves) is None
+
+    game = StandardGame.from_fen(fen, Adjudication(resign_margin=5, resign_plies=4))
+    assert play(game, *moves[:3]) is None
+    assert play(game, moves[3]) == GameOutcome("1-0", "resignation")
+    assert GameOutcome("1-0", "resignation").winner == "white"
+
+    game = StandardGame.from_fen("r3k3/8/8/8/8/8/8/R3K3 w - - 0 60", Adjudication(draw_margin=0, draw_plies=4))
+    assert play(game, "a1a2", "a8a7", "a2a1") is None
+    assert play(game, "a7a8") == GameOutcome("1/2-1/2", "adjudicated draw")
@@ -0,0 +1,75 @@
+"""
+Pytest unit tests for the strategy arena.
+"""
+import math
+
+from ch_ss.game_engine.core.arena import (
+    MatchStats,
+    elo_to_score,
+    get_pairings,
+    run_arena,
+    score_to_elo,
+)
+
+
+def test_elo_and_score():
+    """
+    Elo differences and expected scores convert back and forth.
+    """
+    assert elo_to_score(0) == 0.5
+    assert math.isclose(score_to_elo(elo_to_score(120)), 120)
+    assert score_to_elo(1.0) == math.inf
+
+
+def test_match_stats_and_sprt():
+    """
+    A lopsided match has a positive Elo interval, and its SPRT accepts H1,
+    while an even match accepts H0.
+    """
+    match = MatchStats("a", "b")
+    for score in [1, 0.5] * 30 + [0] * 5:
+        match.add(score)
+    assert (match.wins, match.draws, match.losses) == (30, 30, 5)
+    low, high = match.elo_interval()
+    assert 0 < low < match.elo() < high
+    assert match.update_sprt(0, 50) == "H1"
+
+    even = MatchStats("a", "b")
+    for score in [1, 0.5, 0] * 200:
+        even.add(score)
+        even.update_sprt(0, 50)
+    assert even.sprt_result == "H0"
+
+
+def test_sprt_ends_without_variance():
+    """
+    A match of only wins, or only draws, has no score variance, and its SPRT
+    still accepts H1, or H0, after a few games.
+    """
+    for score, hypothesis in [(1, "H1"), (0.5, "H0")]:
+        match = MatchStats("a", "b")
+        for _ in range(50):
+            match.add(score)
+            if match.update_sprt(0, 50) is not None:
+                break
+        assert match.sprt_result == hypothesis and match.games < 50
+
+
+def test_pairings():
+    assert get_pairings(["a", "b", "c"]) == [("a", "b"), ("a", "c"), ("b", "c")]
+    assert get_pairings(["a", "b", "c"], mode="gauntlet") == [("a", "b"), ("a", "c")]
+
+
+def test_run_arena():
+    """
+    Games alternate colors, and playing over a pool of workers gives the same
+    results as playing in this process.
+    """
+    colors = []
+    report = lambda match, result: colors.append(result.white)  # noqa: E731
+    matches = run_arena(["capturebot5000", "naive"], 6, processes=1, max_plies=30, on_game=report)
+    assert colors == ["capturebot5000", "naive"] * 3
+    assert matches[0].games == 6
+
+    pooled = run_arena(["capturebot5000", "naive"], 6, processes=2, max_plies=30)
+    assert (pooled[0].wins, pooled[0].draws, pooled[0].losses) == (matches[0].wins, matches[0].draws, matches[0].losses)
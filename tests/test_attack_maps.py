@@ -0,0 +1,68 @@
+"""
+Pytest unit tests for the incrementally updated attack maps.
+"""
+import random
+
+from ch_ss.game_engine.core.attack_maps import AttackMaps
+from ch_ss.game_engine.core.perft import PERFT_SUITE, Perft
+from ch_ss.game_engine.core.piece import PieceColors
+from ch_ss.game_engine.utils.gen_moves import gen_moves
+from ch_ss.game_engine.utils.move import NULL_MOVE
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES, SQUARE_NAMES
+
+
+def _sync(maps: AttackMaps, state: dict) -> None:
+    """
+    Updates the attack maps for every square whose piece differs from state.
+    """
+    for sq, name in enumerate(SQUARE_NAMES):
+        maps.set_piece(sq, state.get(name))
+
+
+def test_incremental_updates_match_recompute():
+    """
+    After each move of a random game, the incrementally updated attack maps
+    equal attack maps built from scratch, and gen_moves() gives the same
+    moves with or without them.
+    """
+    random.seed(0)
+    position = Perft(PERFT_SUITE[1].fen)
+    maps = AttackMaps()
+    _sync(maps, {**position.pieces["white"], **position.pieces["black"]})
+
+    for _ in range(60):
+        color = position.to_move
+        opp = "black" if color == "white" else "white"
+        state = {**position.pieces["white"], **position.pieces["black"]}
+        castling = position.get_player_states(color)["castling"]
+        castle_vec = (castling[0], castling[1], castling[2])
+
+        fresh = maps.recompute()
+        assert maps.counts == fresh.counts
+        assert maps.attacked == fresh.attacked
+
+        opp_attacks = maps.attacked[PieceColors.WHITE if opp == "white" else PieceColors.BLACK]
+        moves = gen_moves(state, color, castle_vec, NULL_MOVE)
+        assert sorted(gen_moves(state, color, castle_vec, NULL_MOVE, opp_attacks)) == sorted(moves)
+        if not moves:
+            break
+
+        move = random.choice(moves)
+        position.players[color].make_move(move, position.pieces[color], position.pieces[opp])
+        position.to_move = opp
+        _sync(maps, {**position.pieces["white"], **position.pieces["black"]})
+
+
+def test_attack_counts():
+    """
+    Squares defended by several pieces are counted once per piece.
+    """
+    position = Perft()
+    maps = AttackMaps()
+    _sync(maps, {**position.pieces["white"], **position.pieces["black"]})
+
+    # f3 is covered by the e2 and g2 pawns and the g1 knight
+    assert maps.counts[PieceColors.WHITE][SQUARE_INDICES["f3"]] == 3
+    assert maps.is_attacked_by(SQUARE_INDICES["d3"], PieceColors.WHITE)
+    assert not maps.is_attacked_by(SQUARE_INDICES["d4"], PieceColors.WHITE)
+    assert not maps.is_attacked_by(SQUARE_INDICES["e1"], PieceColors.BLACK)
@@ -0,0 +1,68 @@
+"""
+Pytest unit tests for the NumPy batch move generator.
+"""
+import random
+
+import pytest
+
+from ch_ss.game_engine.core.perft import PERFT_SUITE, Perft
+from ch_ss.game_engine.utils.gen_moves import gen_moves
+from ch_ss.game_engine.utils.move import (
+    DOUBLE_PAWN_PUSH,
+    NULL_MOVE,
+    encode_move,
+    move_from,
+    move_to,
+)
+
+np = pytest.importorskip("numpy")
+batch_moves = pytest.importorskip("ch_ss.game_engine.utils.batch_moves")
+
+
+def test_batch_masks_match_gen_moves():
+    """
+    The from-to mask of every position in a batch holds exactly the from-to
+    squares of the moves gen_moves() finds, over random games from each
+    benchmark position.
+    """
+    random.seed(1)
+    states, players, castle_vecs, en_passant_sqs, expected = [], [], [], [], []
+    for position in PERFT_SUITE:
+        game = Perft(position.fen)
+        for _ in range(30):
+            color = game.to_move
+            opp = "black" if color == "white" else "white"
+            state = {**game.pieces["white"], **game.pieces["black"]}
+            castle_vec = tuple(game.get_player_states(color)["castling"])
+
+            col, offered = game.en_passant[color]
+            last_move, en_passant_sq = NULL_MOVE, -1
+            if offered:
+                row_from, row_to = (7, 5) if color == "white" else (2, 4)
+                sq = "abcdefgh".index(col) + (row_from - 1) * 8
+                last_move = encode_move(sq, "abcdefgh".index(col) + (row_to - 1) * 8, DOUBLE_PAWN_PUSH)
+                en_passant_sq = (move_from(last_move) + move_to(last_move)) >> 1
+
+            moves = gen_moves(state, color, castle_vec, last_move)
+            states.append(state)
+            players.append(color)
+            castle_vecs.append(castle_vec)
+            en_passant_sqs.append(en_passant_sq)
+            expected.append({(move_from(move), move_to(move)) for move in moves})
+            if not moves:
+                break
+
+            move = random.choice(moves)
+            game.en_passant[opp] = game.players[color].check_en_passant_offered(move, game.pieces[opp])
+            game.en_passant[color] = ("x", False)
+            game.players[color].make_move(move, game.pieces[color], game.pieces[opp])
+            game.to_move = opp
+
+    bitboards, white = batch_moves.states_to_batch(states, players)
+    masks = batch_moves.batch_legal_move_masks(
+        bitboards, white, np.array(castle_vecs, dtype=bool), np.array(en_passant_sqs, dtype=np.int64)
+    )
+
+    assert masks.shape == (len(states), 64, 64)
+    for mask, from_tos in zip(masks, expected):
+        assert {(int(sq_from), int(sq_to)) for sq_from, sq_to in zip(*np.nonzero(mask))} == from_tos
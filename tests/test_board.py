@@ -0,0 +1,91 @@
+"""
+Pytest unit tests for the Board class.
+"""
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.gen_moves import gen_moves
+from ch_ss.game_engine.utils.move import NULL_MOVE, str_to_move
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def test_standard_board():
+    """
+    The standard board holds 16 pieces per player, viewable as squares.
+    """
+    board = Board()
+    white, black = board.get_pieces_by_color("white"), board.get_pieces_by_color("black")
+    assert len(white) == 16 and len(black) == 16
+    assert white["e1"] == Piece(PieceColors.WHITE, PieceNames.KING)
+    assert board.squares["d8"].piece == Piece(PieceColors.BLACK, PieceNames.QUEEN)
+    assert board.squares["e4"].is_unoccupied()
+
+
+def test_make_move():
+    """
+    Castling moves the rook, en-passant captures the passed pawn, and the
+    copied position is unaffected by later moves.
+    """
+    board = Board(board_config="empty")
+    board.put_piece_by_sid("e1", Piece(PieceColors.WHITE, PieceNames.KING))
+    board.put_piece_by_sid("h1", Piece(PieceColors.WHITE, PieceNames.ROOK))
+    board.put_piece_by_sid("e5", Piece(PieceColors.WHITE, PieceNames.PAWN))
+    board.put_piece_by_sid("d5", Piece(PieceColors.BLACK, PieceNames.PAWN))
+    board.put_piece_by_sid("e8", Piece(PieceColors.BLACK, PieceNames.KING))
+    copied = board.copy_position()
+
+    board.make_move(str_to_move("O-O", "white", {}), "white")
+    board.make_move(str_to_move("e5xd6", "white", board.get_pieces_by_color("black")), "white")
+    assert list(board.get_pieces_by_color("white")) == ["f1", "g1", "d6"]
+    assert list(board.get_pieces_by_color("black")) == ["e8"]
+    assert board.is_square_attacked("e7", "white")
+    assert copied.get_pieces_by_color(PieceColors.WHITE).keys() == {"e1", "h1", "e5"}
+
+
+def test_push_pop():
+    """
+    pop() takes back castling, en-passant, promotions with capture, and
+    restores the key of the pieces.
+    """
+    board = Board(board_config="empty")
+    board.put_piece_by_sid("e1", Piece(PieceColors.WHITE, PieceNames.KING))
+    board.put_piece_by_sid("h1", Piece(PieceColors.WHITE, PieceNames.ROOK))
+    board.put_piece_by_sid("e5", Piece(PieceColors.WHITE, PieceNames.PAWN))
+    board.put_piece_by_sid("b7", Piece(PieceColors.WHITE, PieceNames.PAWN))
+    board.put_piece_by_sid("d5", Piece(PieceColors.BLACK, PieceNames.PAWN))
+    board.put_piece_by_sid("c8", Piece(PieceColors.BLACK, PieceNames.BISHOP))
+    board.put_piece_by_sid("e8", Piece(PieceColors.BLACK, PieceNames.KING))
+    mailbox, key = bytes(board.position.mailbox), board.zobrist_key
+
+    black = board.get_pieces_by_color("black")
+    for move in ["O-O", "e5xd6", "b7xc8=Q"]:
+        board.push(str_to_move(move, "white", black), "white")
+    assert board.get_piece_by_sid("c8") == Piece(PieceColors.WHITE, PieceNames.QUEEN)
+
+    assert board.pop() == str_to_move("b7xc8=Q", "white", black)
+    board.pop()
+    board.pop()
+    assert bytes(board.position.mailbox) == mailbox
+    assert board.zobrist_key == key
+
+
+def test_piece_bitboards():
+    """
+    The piece bitboards and king squares follow the moves made, and move
+    generation gives the same moves starting from them.
+    """
+    board = Board(board_config="standard")
+    board.make_move(str_to_move("e2e4", "white", {}), "white")
+    board.make_move(str_to_move("e7e5", "black", {}), "black")
+    board.make_move(str_to_move("Ke1e2", "white", {}), "white")
+
+    bitboards = board.get_piece_bitboards("white")
+    assert bitboards[PieceNames.KING] == 1 << SQUARE_INDICES["e2"]
+    assert bitboards[PieceNames.PAWN] & (1 << SQUARE_INDICES["e4"])
+    assert not bitboards[PieceNames.PAWN] & (1 << SQUARE_INDICES["e2"])
+    assert board.get_king_sid("white") == "e2"
+    assert board.get_king_sid("black") == "e8"
+
+    state = {**board.get_pieces_by_color("white"), **board.get_pieces_by_color("black")}
+    from_bitboards = (board.get_piece_bitboards("black"), board.get_piece_bitboards("white"))
+    expected = gen_moves(state, "black", (True, True, True), NULL_MOVE)
+    assert gen_moves({}, "black", (True, True, True), NULL_MOVE, bitboards=from_bitboards) == expected
@@ -0,0 +1,49 @@
+"""
+Pytest unit tests for the compact, array-backed board representation.
+"""
+import pickle
+
+from ch_ss.game_engine.core.compact_board import CompactBoard, piece_code
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def test_put_and_get_pieces():
+    """
+    The mailbox and bitboards stay in sync as pieces are put on and taken off
+    squares, and pieces are listed by color in square order.
+    """
+    board = CompactBoard()
+    board.put_piece(SQUARE_INDICES["e1"], Piece(PieceColors.WHITE, PieceNames.KING))
+    board.put_piece(SQUARE_INDICES["d8"], Piece(PieceColors.BLACK, PieceNames.QUEEN))
+    board.put_piece(SQUARE_INDICES["a2"], Piece(PieceColors.WHITE, PieceNames.PAWN))
+    board.put_piece(SQUARE_INDICES["a2"], Piece(PieceColors.BLACK, PieceNames.ROOK))
+    board.put_piece(SQUARE_INDICES["h7"], Piece(PieceColors.BLACK, PieceNames.PAWN))
+    board.put_piece(SQUARE_INDICES["h7"], None)
+
+    assert board.get_piece(SQUARE_INDICES["h7"]) == Piece()
+    assert board.get_square(SQUARE_INDICES["d8"]).piece == Piece(PieceColors.BLACK, PieceNames.QUEEN)
+    assert board.get_square(SQUARE_INDICES["d8"]).x_y == (0, 3)
+    assert list(board.get_pieces_by_color(PieceColors.WHITE)) == ["e1"]
+    assert list(board.get_pieces_by_color(PieceColors.BLACK)) == ["a2", "d8"]
+    assert board.occupied_by(PieceColors.BLACK) == (1 << SQUARE_INDICES["a2"]) | (1 << SQUARE_INDICES["d8"])
+    assert board.bitboards[piece_code(Piece(PieceColors.WHITE, PieceNames.PAWN))] == 0
+    assert CompactBoard(bytes(board.mailbox)).bitboards == board.bitboards
+
+
+def test_copy_and_pickle():
+    """
+    Copies are independent of the original, and pickling only carries the
+    mailbox.
+    """
+    board = CompactBoard()
+    board.put_piece(SQUARE_INDICES["e1"], Piece(PieceColors.WHITE, PieceNames.KING))
+
+    copied = board.copy()
+    copied.put_piece(SQUARE_INDICES["e2"], Piece(PieceColors.WHITE, PieceNames.PAWN))
+    assert copied != board
+    assert board.get_piece(SQUARE_INDICES["e2"]) == Piece()
+
+    restored = pickle.loads(pickle.dumps(copied))
+    assert restored == copied
+    assert restored.bitboards == copied.bitboards
@@ -0,0 +1,74 @@
+"""
+Pytest unit tests for FEN import/export.
+"""
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.game import StandardGame
+from ch_ss.game_engine.core.perft import PERFT_SUITE
+from ch_ss.game_engine.utils.fen import (
+    STANDARD_FEN,
+    fen_to_game_state,
+    game_state_to_fen,
+    iter_fen_file,
+)
+
+KIWIPETE_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def test_fen_round_trip():
+    """
+    Parsing and rendering the FEN of each benchmark position gives it back,
+    with a Zobrist key that matches the key computed from scratch.
+    """
+    for position in PERFT_SUITE:
+        state, fullmove = fen_to_game_state(position.fen)
+        assert game_state_to_fen(state, fullmove) == position.fen
+        assert state.zobrist_key == state.compute_zobrist_key()
+
+
+def test_unreachable_en_passant_is_dropped():
+    """
+    An en-passant square no pawn can capture onto is not part of the state.
+    """
+    state, _ = fen_to_game_state("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+    assert state.en_passant_sq == -1
+
+    state, _ = fen_to_game_state("8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1")
+    assert state.en_passant_sq == 19
+
+
+def test_board_from_fen():
+    """
+    A board loaded from the standard FEN matches the standard board.
+    """
+    board = Board.from_fen(STANDARD_FEN)
+    standard = Board(board_config="standard")
+    assert board.position == standard.position
+    assert board.zobrist_key == standard.zobrist_key
+    assert board.attack_maps.attacked == standard.attack_maps.attacked
+    assert board.to_fen(castling="KQkq") == STANDARD_FEN
+
+
+def test_game_from_fen():
+    """
+    A game loaded from a FEN keeps its game state, and can be played on.
+    """
+    game = StandardGame.from_fen(KIWIPETE_FEN)
+    assert game.to_fen() == KIWIPETE_FEN
+    assert game.zobrist_key == game.compute_zobrist_key()
+    assert game.board.zobrist_key ^ game.state.get_state_key() == game.zobrist_key
+
+    game.tick()
+    assert game.to_move == "black"
+    assert game.zobrist_key == game.compute_zobrist_key()
+
+
+def test_iter_fen_file(tmp_path):
+    """
+    Streaming a file of FENs skips comments and blank lines, and ignores
+    anything after a ';'.
+    """
+    path = tmp_path / "positions.epd"
+    path.write_text("# benchmark positions\n%s ;D1 20\n\n%s\n" % (STANDARD_FEN, KIWIPETE_FEN))
+
+    fens = [game_state_to_fen(state, fullmove) for state, fullmove in iter_fen_file(str(path))]
+    assert fens == [STANDARD_FEN, KIWIPETE_FEN]
@@ -0,0 +1,137 @@
+"""
+Pytest unit tests for the StandardGame class.
+"""
+import random
+import subprocess
+import sys
+from typing import Iterator
+
+from ch_ss.game_engine.core.game import MoveEvent, StandardGame
+from ch_ss.game_engine.utils.move import CAPTURE, encode_move, is_castle
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def test_zobrist_key_matches_recompute():
+    """
+    The Zobrist key kept by the game matches the key computed from scratch
+    after every move of a bot game.
+    """
+    random.seed(3)
+    game = StandardGame()
+    assert game.zobrist_key == game.compute_zobrist_key()
+
+    for _ in range(300):
+        if game.tick() is not None:  # checkmate or draw
+            break
+        assert game.zobrist_key == game.compute_zobrist_key()
+
+
+def test_push_pop_restores_states():
+    """
+    Taking back every move of a bot game with pop() walks back through the
+    exact same game states, down to the start position.
+    """
+    random.seed(5)
+    game = StandardGame()
+    states = [game.state]
+    for _ in range(120):
+        outcome = game.tick()
+        if game.move_num == len(states):  # no move is played on checkmate or stalemate
+            states.append(game.state)
+        if outcome is not None:
+            break
+
+    while len(states) > 1:
+        states.pop()
+        game.pop()
+        assert game.state == states[-1]
+        assert bytes(game.board.position.mailbox) == game.state.board
+        assert game.board.zobrist_key ^ game.state.get_state_key() == game.zobrist_key
+
+    fresh = game.board.attack_maps.recompute()
+    assert game.board.attack_maps.attacked == fresh.attacked
+    assert game.move_num == 0
+
+
+def test_headless_game_does_not_load_pil():
+    """
+    Creating boards and playing a game without rendering never imports PIL.
+    """
+    script = (
+        "import sys\n"
+        "from ch_ss.game_engine.core.board import Board\n"
+        "from ch_ss.game_engine.core.game import StandardGame\n"
+        "Board(board_config='empty')\n"
+        "StandardGame().tick()\n"
+        "assert 'PIL' not in sys.modules, 'PIL was imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_move_listener_events(capsys):
+    """
+    Move listeners get one event per move with its ply, side and check flag,
+    and a game played without logging configured prints nothing.
+    """
+    events: list[MoveEvent] = []
+    game = StandardGame.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    game.add_move_listener(events.append)
+    game.push(encode_move(SQUARE_INDICES["a1"], SQUARE_INDICES["a8"]))
+    game.push(encode_move(SQUARE_INDICES["e8"], SQUARE_INDICES["e7"]))
+
+    assert [(event.ply, event.side, event.move_str, event.check) for event in events] == [
+        (1, "white", "Ra1a8", True),
+        (2, "black", "Ke8e7", False),
+    ]
+
+    random.seed(7)
+    game = StandardGame()
+    game.add_move_listener(events.append)
+    for _ in range(20):
+        game.step()
+    assert [event.ply for event in events[2:]] == list(range(1, 21))
+    assert capsys.readouterr().out == ""
+
+
+def test_capturing_a_rook_takes_its_castling_right():
+    """
+    Capturing a rook on its starting square clears the opponent's right to
+    castle with it, even once another rook takes its place.
+    """
+    game = StandardGame.from_fen("b3k3/8/8/8/8/8/7R/4K2R b K - 0 1")
+    game.push(encode_move(SQUARE_INDICES["a8"], SQUARE_INDICES["h1"], CAPTURE))
+    assert game.to_fen() == "4k3/8/8/8/8/8/7R/4K2b w - - 0 2"
+
+    game.push(encode_move(SQUARE_INDICES["h2"], SQUARE_INDICES["h1"], CAPTURE))
+    game.push(encode_move(SQUARE_INDICES["e8"], SQUARE_INDICES["d8"]))
+    moves = game.white_player.get_all_legal_moves(
+        game.state.get_player_states("white"),
+        game.board.get_pieces_by_color("white"),
+        game.board.get_pieces_by_color("black"),
+    )
+    assert not any(is_castle(move) for move in moves)
+    assert game.zobrist_key == game.compute_zobrist_key()
+
+
+def test_step_reuses_the_moves_of_the_mate_check(monkeypatch):
+    """
+    The legal moves adjudicate() starts to look for mate are the ones the
+    next step() picks from, so each ply generates its moves once.
+    """
+    game = StandardGame()
+    calls = []
+    iter_legal_moves = game.iter_legal_moves
+
+    def counting_iter_legal_moves() -> Iterator[int]:
+        calls.append(game.zobrist_key)
+        return iter_legal_moves()
+
+    monkeypatch.setattr(game, "iter_legal_moves", counting_iter_legal_moves)
+    random.seed(3)
+    for _ in range(10):
+        assert game.step() is None
+    assert len(calls) == 11 and len(set(calls)) == 11
+
+    game.pop()
+    game.step()
+    assert len(calls) == 13
@@ -0,0 +1,42 @@
+"""
+Pytest unit tests for the immutable GameState.
+"""
+import pickle
+
+import pytest
+
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.game_state import ALL_CASTLING, GameState, pack_castling
+
+
+def test_castling_bits():
+    """
+    Castling vectors round-trip through the castling bits.
+    """
+    castle_vecs = {"white": [True, False, True], "black": [False, True, True]}
+    state = GameState(board=bytes(64), castling=pack_castling(castle_vecs))
+    assert state.get_castle_vecs() == castle_vecs
+    assert pack_castling({"white": [True] * 3, "black": [True] * 3}) == ALL_CASTLING
+
+
+def test_hash_copy_and_pickle():
+    """
+    Game states are frozen, hashed by their Zobrist key, picklable, and
+    only offer en-passant to the player to move.
+    """
+    board = Board()
+    state = GameState(board=bytes(board.position.mailbox), to_move="black", en_passant_sq=20)
+    state = state.replace(zobrist_key=board.zobrist_key ^ state.get_state_key())
+    assert state.zobrist_key == state.compute_zobrist_key()
+
+    assert state.get_en_passant("black") == ("e", True)
+    assert state.get_player_states("white") == {"en_passant": ("x", False), "castling": [True, True, True]}
+    assert len(state.get_pieces_by_color("white")) == 16
+
+    restored = pickle.loads(pickle.dumps(state))
+    assert restored == state
+    assert {state: 1}[restored] == 1
+    assert state.replace(halfmove_clock=1) != state
+
+    with pytest.raises(AttributeError):
+        state.to_move = "white"  # type: ignore
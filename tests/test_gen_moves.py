@@ -0,0 +1,201 @@
+"""
+Pytest unit tests for the bitboard legal move generator.
+"""
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.gen_moves import gen_moves, is_under_check, iter_moves
+from ch_ss.game_engine.utils.move import (
+    NULL_MOVE,
+    is_capture,
+    is_promotion,
+    move_from,
+    move_to_str,
+    str_to_move,
+)
+from ch_ss.game_engine.utils.tables import SQUARE_NAMES
+
+
+def _standard_state() -> dict:
+    """
+    Board state of the standard starting position.
+    """
+    back_row = [
+        PieceNames.ROOK,
+        PieceNames.KNIGHT,
+        PieceNames.BISHOP,
+        PieceNames.QUEEN,
+        PieceNames.KING,
+        PieceNames.BISHOP,
+        PieceNames.KNIGHT,
+        PieceNames.ROOK,
+    ]
+    state = {}
+    for col, name in zip("abcdefgh", back_row):
+        state[f"{col}1"] = Piece(PieceColors.WHITE, name)
+        state[f"{col}2"] = Piece(PieceColors.WHITE, PieceNames.PAWN)
+        state[f"{col}7"] = Piece(PieceColors.BLACK, PieceNames.PAWN)
+        state[f"{col}8"] = Piece(PieceColors.BLACK, name)
+    return state
+
+
+def _gen_moves_str(state: dict, player: str, castle_vec: tuple, last_move: str = "") -> list[str]:
+    """
+    Runs gen_moves() with the last move given, and legal moves returned, in
+    our custom algebraic notation.
+    """
+    opp = "black" if player == "white" else "white"
+    encoded_last_move = str_to_move(last_move, opp, state) if last_move else NULL_MOVE
+    moves = gen_moves(state, player, castle_vec, encoded_last_move)
+    return [move_to_str(move, state[SQUARE_NAMES[move_from(move)]].name) for move in moves]
+
+
+def test_standard_opening_moves():
+    """
+    Both players have 20 legal moves in the starting position.
+    """
+    state = _standard_state()
+    moves = _gen_moves_str(state, "white", (True, True, True))
+    assert len(moves) == 20
+    assert "e2e4" in moves and "Nb1c3" in moves
+
+    moves = _gen_moves_str(state, "black", (True, True, True), "e2e4")
+    assert len(moves) == 20
+    assert "e7e5" in moves and "Ng8f6" in moves
+
+
+def test_pinned_piece_and_check():
+    """
+    A pinned knight cannot move, and a king under check must get out of it.
+    """
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "e2": Piece(PieceColors.WHITE, PieceNames.KNIGHT),
+        "e8": Piece(PieceColors.BLACK, PieceNames.ROOK),
+        "a8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    moves = _gen_moves_str(state, "white", (False, False, False))
+    assert not is_under_check(state, "white")
+    assert all(not move.startswith("N") for move in moves)
+    assert sorted(moves) == ["Ke1d1", "Ke1d2", "Ke1f1", "Ke1f2"]
+
+    del state["e2"]
+    assert is_under_check(state, "white")
+    assert sorted(_gen_moves_str(state, "white", (False, False, False))) == ["Ke1d1", "Ke1d2", "Ke1f1", "Ke1f2"]
+
+
+def test_en_passant():
+    """
+    En-passant is only offered right after the two-step pawn move.
+    """
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "e5": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "d5": Piece(PieceColors.BLACK, PieceNames.PAWN),
+        "e8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    assert "e5xd6" in _gen_moves_str(state, "white", (False, False, False), "d7d5")
+    assert "e5xd6" not in _gen_moves_str(state, "white", (False, False, False), "d6d5")
+
+
+def test_promotion():
+    """
+    Pawns reaching the last row are promoted, including when capturing.
+    """
+    state = {
+        "a1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "b7": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "c8": Piece(PieceColors.BLACK, PieceNames.ROOK),
+        "h8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    moves = _gen_moves_str(state, "white", (False, False, False))
+    for promoted_piece in ["Q", "B", "N", "R"]:
+        assert f"b7b8={promoted_piece}" in moves
+        assert f"b7xc8={promoted_piece}" in moves
+
+
+def test_castling():
+    """
+    Castling requires rights, empty squares, and the king not passing through
+    an attacked square.
+    """
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "h1": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "a1": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "e8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    moves = _gen_moves_str(state, "white", (True, True, True))
+    assert "O-O" in moves and "O-O-O" in moves
+
+    moves = _gen_moves_str(state, "white", (False, True, True))
+    assert "O-O" not in moves and "O-O-O" in moves
+
+    # f1 is attacked by the rook, b1 may be attacked
+    state["f8"] = Piece(PieceColors.BLACK, PieceNames.ROOK)
+    state["b8"] = Piece(PieceColors.BLACK, PieceNames.ROOK)
+    moves = _gen_moves_str(state, "white", (True, True, True))
+    assert "O-O" not in moves and "O-O-O" in moves
+
+
+def test_checkmate():
+    """
+    No legal moves when checkmated.
+    """
+    state = {
+        "h1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "g2": Piece(PieceColors.BLACK, PieceNames.QUEEN),
+        "g3": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    assert is_under_check(state, "white")
+    assert _gen_moves_str(state, "white", (False, False, False)) == []
+
+
+def test_pin_ray_and_double_check():
+    """
+    A pinned piece can still move along the pin ray, and only the king can
+    move under double check.
+    """
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "e3": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "e7": Piece(PieceColors.BLACK, PieceNames.QUEEN),
+        "a8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    rook_moves = [move for move in _gen_moves_str(state, "white", (False, False, False)) if move[0] == "R"]
+    assert sorted(rook_moves) == ["Re3e2", "Re3e4", "Re3e5", "Re3e6", "Re3xe7"]
+
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "a2": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "e8": Piece(PieceColors.BLACK, PieceNames.ROOK),
+        "d3": Piece(PieceColors.BLACK, PieceNames.KNIGHT),
+        "a8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    moves = _gen_moves_str(state, "white", (False, False, False))
+    assert all(move[0] == "K" for move in moves)
+
+
+def test_iter_moves_stages():
+    """
+    iter_moves() yields the same moves as gen_moves(), promotions first, then
+    captures with the most valuable victim first, then quiet moves.
+    """
+    state = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "b7": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "d4": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "b4": Piece(PieceColors.WHITE, PieceNames.KNIGHT),
+        "f3": Piece(PieceColors.WHITE, PieceNames.KNIGHT),
+        "e4": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "d5": Piece(PieceColors.BLACK, PieceNames.QUEEN),
+        "d7": Piece(PieceColors.BLACK, PieceNames.PAWN),
+        "h4": Piece(PieceColors.BLACK, PieceNames.PAWN),
+        "h8": Piece(PieceColors.BLACK, PieceNames.KING),
+    }
+    moves = list(iter_moves(state, "white", (False, False, False), NULL_MOVE))
+    assert sorted(moves) == sorted(gen_moves(state, "white", (False, False, False), NULL_MOVE))
+
+    names = [move_to_str(move, state[SQUARE_NAMES[move_from(move)]].name) for move in moves]
+    assert names[:4] == ["b7b8=Q", "b7b8=B", "b7b8=N", "b7b8=R"]
+    captures = [name for move, name in zip(moves, names) if is_capture(move)]
+    assert captures == ["e4xd5", "Nb4xd5", "Rd4xd5", "Nf3xh4"]
+    assert not any(is_capture(move) or is_promotion(move) for move in moves[4 + len(captures) :])
@@ -0,0 +1,60 @@
+"""
+Pytest unit tests for the compact integer move encoding.
+"""
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.utils.move import (
+    is_capture,
+    is_castle,
+    is_double_pawn_push,
+    is_en_passant,
+    is_promotion,
+    move_from,
+    move_to,
+    move_to_str,
+    promotion_piece_name,
+    str_to_move,
+)
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def test_move_fits_16_bits():
+    """
+    Squares and flags are packed into 16 bits.
+    """
+    move = str_to_move("h7xg8=Q", "white", {"g8": Piece(PieceColors.BLACK, PieceNames.ROOK)})
+    assert 0 <= move < 1 << 16
+    assert move_from(move) == SQUARE_INDICES["h7"]
+    assert move_to(move) == SQUARE_INDICES["g8"]
+    assert is_capture(move) and is_promotion(move)
+    assert promotion_piece_name(move) == PieceNames.QUEEN
+
+
+def test_move_flags():
+    """
+    Each kind of move is recognised from the notation and the board state.
+    """
+    state = {"d5": Piece(PieceColors.BLACK, PieceNames.PAWN)}
+    assert is_en_passant(str_to_move("e5xd6", "white", state))
+    assert is_capture(str_to_move("e5xd6", "white", state))
+    assert is_double_pawn_push(str_to_move("e2e4", "white", state))
+    assert not is_capture(str_to_move("Nb1c3", "white", state))
+    assert is_castle(str_to_move("O-O-O", "black", state))
+    assert move_to(str_to_move("O-O-O", "black", state)) == SQUARE_INDICES["c8"]
+
+
+def test_move_round_trip():
+    """
+    Rendering a parsed move gives back the same notation.
+    """
+    state = {"d8": Piece(PieceColors.BLACK, PieceNames.QUEEN), "b1": Piece(PieceColors.BLACK, PieceNames.ROOK)}
+    moves = {
+        "Qd1xd8": PieceNames.QUEEN,
+        "Ng1f3": PieceNames.KNIGHT,
+        "e2e4": PieceNames.PAWN,
+        "e7e8=N": PieceNames.PAWN,
+        "a2xb1=R": PieceNames.PAWN,
+        "O-O": PieceNames.KING,
+        "O-O-O": PieceNames.KING,
+    }
+    for notation, piece_name in moves.items():
+        assert move_to_str(str_to_move(notation, "white", state), piece_name) == notation
@@ -0,0 +1,39 @@
+"""
+Pytest unit tests for perft, which doubles as the move generator's
+correctness test.
+"""
+from ch_ss.game_engine.core.perft import PERFT_SUITE, Perft, run_perft_suite
+
+
+def test_perft_suite():
+    """
+    Node counts of all benchmark positions match the known values at a
+    shallow depth.
+    """
+    for result in run_perft_suite(3):
+        assert result["nodes"] == result["expected"], result["name"]
+
+
+def test_divide():
+    """
+    Divide counts add up to the perft count, and the position is left as it
+    was found.
+    """
+    position = Perft(PERFT_SUITE[1].fen)
+    pieces_before = {color: dict(pieces) for color, pieces in position.pieces.items()}
+
+    counts = position.divide(2)
+    assert len(counts) == 48
+    assert sum(counts.values()) == PERFT_SUITE[1].nodes[2]
+    assert "O-O" in counts and "O-O-O" in counts
+    assert position.pieces == pieces_before
+    assert position.to_move == "white"
+
+
+def test_rook_capture_clears_castling():
+    """
+    The subtree after a rook is captured on its starting square matches the
+    same position set up without the captured side's castling right.
+    """
+    counts = Perft("b3k3/8/8/8/8/8/7R/4K2R b K - 0 1").divide(4)
+    assert counts["Ba8xh1"] == Perft("4k3/8/8/8/8/8/7R/4K2b w - - 0 2").perft(3)
@@ -79,3 +79,24 @@ def test_piece_print():
 
             piece = Piece(color, name)
             assert str(piece) == "%s %s" % (color.name, name.name)
+
+
+def test_interned_pieces():
+    """
+    Piece.of() returns the same instance for the same color/name pair, equal
+    to a freshly built piece, and rejects illegal pieces.
+    """
+    pieces = [
+        Piece.of(color, name)
+        for color in PieceColors
+        for name in PieceNames
+        if (color == PieceColors.EMPTY) == (name == PieceNames.EMPTY)
+    ]
+    assert len({id(piece) for piece in pieces}) == 13
+    assert Piece.of(PieceColors.WHITE, PieceNames.KING) is Piece.of(PieceColors.WHITE, PieceNames.KING)
+    assert Piece.of(PieceColors.BLACK, PieceNames.PAWN) == Piece(PieceColors.BLACK, PieceNames.PAWN)
+    assert Piece.of().is_empty() and Piece().is_empty()
+    assert not Piece.of(PieceColors.BLACK, PieceNames.PAWN).is_empty()
+
+    with pytest.raises(IllegalPieceException):
+        Piece.of(PieceColors.EMPTY, PieceNames.KING)
@@ -0,0 +1,129 @@
+"""
+Pytest unit tests for the Player class.
+"""
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.core.player import Player, pawn_bitboard
+from ch_ss.game_engine.utils import gen_moves
+from ch_ss.game_engine.utils.move import DOUBLE_PAWN_PUSH, encode_move, str_to_move
+
+
+def _print_board_state_func(pieces0: dict, pieces1: dict, perspective: str, out_file: str) -> None:
+    """
+    Stand-in for StandardGame.print_game_state_debug, images are not needed.
+    """
+    pass
+
+
+def test_make_unmake_move():
+    """
+    make_move() followed by unmake_move() restores both players' pieces for
+    captures, en-passant captures, promotions and castling.
+    """
+    player = Player("white", _print_board_state_func)
+    my_pieces = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "h1": Piece(PieceColors.WHITE, PieceNames.ROOK),
+        "e5": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "b7": Piece(PieceColors.WHITE, PieceNames.PAWN),
+    }
+    opp_pieces = {
+        "e8": Piece(PieceColors.BLACK, PieceNames.KING),
+        "d5": Piece(PieceColors.BLACK, PieceNames.PAWN),
+        "c8": Piece(PieceColors.BLACK, PieceNames.KNIGHT),
+        "h4": Piece(PieceColors.BLACK, PieceNames.BISHOP),
+    }
+    my_before, opp_before = dict(my_pieces), dict(opp_pieces)
+
+    expected = {
+        "e5xd6": ({"d6"}, {"d5"}),
+        "b7xc8=N": ({"c8"}, {"c8"}),
+        "O-O": ({"g1", "f1"}, set()),
+        "Rh1xh4": ({"h4"}, {"h4"}),
+    }
+    for move, (squares_added, squares_captured) in expected.items():
+        undo = player.make_move(str_to_move(move, "white", opp_pieces), my_pieces, opp_pieces)
+        assert squares_added <= set(my_pieces)
+        assert not squares_captured & set(opp_pieces)
+        player.unmake_move(undo, my_pieces, opp_pieces)
+        assert my_pieces == my_before
+        assert opp_pieces == opp_before
+
+    undo = player.make_move(str_to_move("b7xc8=N", "white", opp_pieces), my_pieces, opp_pieces)
+    assert my_pieces["c8"] == Piece(PieceColors.WHITE, PieceNames.KNIGHT)
+
+
+def test_filter_moves_matches_gen_moves():
+    """
+    Filtering the dict-based pseudo-legal moves gives the same legal moves as
+    the bitboard generator.
+    """
+    player = Player("white", _print_board_state_func)
+    my_pieces = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "e2": Piece(PieceColors.WHITE, PieceNames.KNIGHT),
+        "d2": Piece(PieceColors.WHITE, PieceNames.PAWN),
+        "h1": Piece(PieceColors.WHITE, PieceNames.ROOK),
+    }
+    opp_pieces = {
+        "e8": Piece(PieceColors.BLACK, PieceNames.ROOK),
+        "a8": Piece(PieceColors.BLACK, PieceNames.KING),
+        "b4": Piece(PieceColors.BLACK, PieceNames.BISHOP),
+    }
+    states = {"en_passant": ("x", False), "castling": [False, False, False]}
+
+    moves = player.get_all_pseudo_legal_moves(states, my_pieces, opp_pieces)
+    legal_moves = player.filter_moves(moves, my_pieces, opp_pieces)
+    assert sorted(legal_moves) == sorted(player.get_all_legal_moves(states, my_pieces, opp_pieces))
+
+
+def test_capturebot_stops_after_captures(monkeypatch):
+    """
+    capturebot5000 only draws moves from the staged generator until the
+    captures are used up, and falls back to any move without captures.
+    """
+    player = Player("white", _print_board_state_func)
+    my_pieces = {
+        "e1": Piece(PieceColors.WHITE, PieceNames.KING),
+        "d4": Piece(PieceColors.WHITE, PieceNames.ROOK),
+    }
+    opp_pieces = {
+        "e8": Piece(PieceColors.BLACK, PieceNames.KING),
+        "d7": Piece(PieceColors.BLACK, PieceNames.PAWN),
+    }
+    states = {"en_passant": ("x", False), "castling": [False, False, False]}
+
+    # count the moves encoded, the quiet ones are only generated as capturebot5000 asks for them
+    encoded = []
+
+    def counting_encode_move(*args) -> int:
+        encoded.append(args)
+        return encode_move(*args)
+
+    monkeypatch.setattr(gen_moves, "encode_move", counting_encode_move)
+    moves = player.iter_legal_moves(states, my_pieces, opp_pieces)
+    assert player.evaluate_move("capturebot5000", moves) == str_to_move("Rd4xd7", "white", opp_pieces)
+    assert len(encoded) == 2  # the capture, and the first quiet move that ended the captures
+    assert next(moves, None) is not None
+    monkeypatch.undo()
+
+    del opp_pieces["d7"]
+    legal_moves = player.get_all_legal_moves(states, my_pieces, opp_pieces)
+    assert player.evaluate_move("capturebot5000", iter(legal_moves)) in legal_moves
+
+
+def test_en_passant_offered_from_pawn_bitboard():
+    """
+    A double pawn push offers en-passant only with an opponent's pawn right
+    beside its landing square, without wrapping around the board's edges.
+    """
+    player = Player("white", _print_board_state_func)
+    black_pawn = Piece.of(PieceColors.BLACK, PieceNames.PAWN)
+
+    a2a4 = encode_move(8, 24, DOUBLE_PAWN_PUSH)
+    assert player.get_en_passant_offered(a2a4, pawn_bitboard({"b4": black_pawn})) == ("a", True)
+    assert player.get_en_passant_offered(a2a4, pawn_bitboard({"h3": black_pawn})) == ("x", False)
+    assert player.get_en_passant_offered(encode_move(8, 16), pawn_bitboard({"b3": black_pawn})) == ("x", False)
+
+    h2h4 = encode_move(15, 31, DOUBLE_PAWN_PUSH)
+    assert player.get_en_passant_offered(h2h4, pawn_bitboard({"g4": black_pawn})) == ("h", True)
+    assert player.get_en_passant_offered(h2h4, pawn_bitboard({"a5": black_pawn})) == ("x", False)
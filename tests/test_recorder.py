@@ -0,0 +1,39 @@
+"""
+Pytest unit tests for recording games into animated GIFs.
+"""
+from PIL import GifImagePlugin, Image
+
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.recorder import NO_DITHER, GameRecorder, get_gif_palette
+from ch_ss.game_engine.core.renderer import FrameRenderer
+from ch_ss.game_engine.utils.move import str_to_move
+
+
+def test_record_game(tmp_path):
+    """
+    Every position is a frame of the GIF, matching the rendered board, and
+    holding a position makes its frame last longer instead of repeating it.
+    """
+    board = Board(board_config="standard")
+    out_file = str(tmp_path / "game.gif")
+    expected = [FrameRenderer().render(board.position).copy()]
+    renderer = FrameRenderer()
+
+    with GameRecorder(out_file, frame_duration=500) as recorder:
+        recorder.add(board.position)
+        for move, color in [("e2e4", "white"), ("e7e5", "black"), ("O-O", "white")]:
+            if move == "O-O":  # clear the way for castling
+                for sid in ["f1", "g1"]:
+                    board.clear_square_by_sid(sid)
+            board.push(str_to_move(move, color, {}), color)
+            recorder.add(board.position, board.history[-1][0])
+            expected.append(renderer.render(board.position, board.history[-1][0]).copy())
+        recorder.add(board.position, board.history[-1][0], hold=3)
+
+    gif = Image.open(out_file)
+    assert isinstance(gif, GifImagePlugin.GifImageFile) and gif.n_frames == 4
+    for i, frame in enumerate(expected):
+        gif.seek(i)
+        assert gif.info["duration"] == (2000 if i == 3 else 500)
+        quantized = frame.quantize(palette=get_gif_palette(), dither=NO_DITHER)
+        assert gif.convert("RGB").tobytes() == quantized.convert("RGB").tobytes()
@@ -0,0 +1,42 @@
+"""
+Pytest unit tests for rendering frames in the background.
+"""
+import pytest
+from PIL import Image
+
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.render_queue import RenderQueue
+from ch_ss.game_engine.core.renderer import FrameRenderer
+from ch_ss.game_engine.utils.move import str_to_move
+
+
+def test_frames_written_in_order(tmp_path):
+    """
+    Every queued frame is written once the queue is closed, showing the
+    position at the time it was queued, even with a single pending slot.
+    """
+    board = Board(board_config="standard")
+    moves = [("e2e4", "white"), ("e7e5", "black"), ("Ng1f3", "white")]
+    expected = FrameRenderer()
+
+    with RenderQueue(max_pending=1) as frames:
+        for i, (move, color) in enumerate(moves):
+            board.push(str_to_move(move, color, {}), color)
+            frames.put(board.position, str(tmp_path / ("move_%d.png" % (i))), board.history[-1][0])
+
+            frame = expected.render(board.position, board.history[-1][0]).copy()
+            frame.save(tmp_path / ("expected_%d.png" % (i)))
+
+    for i in range(len(moves)):
+        written = Image.open(tmp_path / ("move_%d.png" % (i)))
+        assert written.tobytes() == Image.open(tmp_path / ("expected_%d.png" % (i))).tobytes()
+
+
+def test_worker_error_is_raised(tmp_path):
+    """
+    An error writing a frame is raised in the thread using the queue.
+    """
+    frames = RenderQueue()
+    frames.put(Board(board_config="standard").position, str(tmp_path / "missing_dir" / "move.png"))
+    with pytest.raises(FileNotFoundError):
+        frames.close()
@@ -0,0 +1,74 @@
+"""
+Pytest unit tests for rendering boards to images.
+"""
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.core.piece import Piece, PieceColors, PieceNames
+from ch_ss.game_engine.core.renderer import (
+    IMAGE_LEN,
+    FrameRenderer,
+    get_background,
+    get_sprite,
+    render_position,
+    square_origin,
+)
+from ch_ss.game_engine.utils.move import str_to_move
+from ch_ss.game_engine.utils.tables import SQUARE_INDICES
+
+
+def test_square_origin():
+    """
+    a8 is the top left square as seen by white, and h1 as seen by black.
+    """
+    assert square_origin(SQUARE_INDICES["a8"]) == (10, 10)
+    assert square_origin(SQUARE_INDICES["h1"], flipped=True) == (10, 10)
+    assert square_origin(SQUARE_INDICES["a1"]) == square_origin(SQUARE_INDICES["h8"], flipped=True)
+
+
+def test_cached_sprites_and_backgrounds():
+    """
+    Sprites and empty boards are built once, and rendering a position leaves
+    the cached empty board untouched.
+    """
+    knight = Piece.of(PieceColors.WHITE, PieceNames.KNIGHT)
+    assert get_sprite(knight) is get_sprite(Piece(PieceColors.WHITE, PieceNames.KNIGHT))
+    assert get_sprite(knight)[0].size[1] == 70
+    assert get_background(flipped=True) is get_background(flipped=True)
+
+    background = get_background().tobytes()
+    img = render_position(Board(board_config="standard").position)
+    assert img.size == (IMAGE_LEN, IMAGE_LEN)
+    assert get_background().tobytes() == background
+    assert img.tobytes() != background
+
+
+def test_to_image(tmp_path):
+    """
+    Boards are written to image files.
+    """
+    out_file = tmp_path / "board.png"
+    Board(board_config="standard").to_image(out_file=str(out_file), flipped=True)
+    assert out_file.exists()
+
+
+def test_frame_renderer():
+    """
+    Frames rendered incrementally match frames rendered from scratch, with
+    and without the last move highlighted, through castling and en-passant.
+    """
+    board = Board(board_config="empty")
+    board.put_piece_by_sid("e1", Piece.of(PieceColors.WHITE, PieceNames.KING))
+    board.put_piece_by_sid("h1", Piece.of(PieceColors.WHITE, PieceNames.ROOK))
+    board.put_piece_by_sid("e5", Piece.of(PieceColors.WHITE, PieceNames.PAWN))
+    board.put_piece_by_sid("d7", Piece.of(PieceColors.BLACK, PieceNames.PAWN))
+    board.put_piece_by_sid("e8", Piece.of(PieceColors.BLACK, PieceNames.KING))
+
+    highlighting, plain = FrameRenderer(flipped=True), FrameRenderer(flipped=True, highlight_last_move=False)
+    highlighting.render(board.position)
+    plain.render(board.position)
+    for move, color in [("O-O", "white"), ("d7d5", "black"), ("e5xd6", "white")]:
+        board.push(str_to_move(move, color, board.get_pieces_by_color("black")), color)
+        last_move = board.history[-1][0]
+
+        expected = FrameRenderer(flipped=True).render(board.position, last_move)
+        assert highlighting.render(board.position, last_move).tobytes() == expected.tobytes()
+        assert plain.render(board.position, last_move).tobytes() == render_position(board.position, True).tobytes()
@@ -0,0 +1,28 @@
+"""
+Pytest unit tests for the headless self-play runner.
+"""
+from ch_ss.game_engine.core.selfplay import game_seed, play_selfplay_game, run_selfplay
+
+
+def test_selfplay_game_is_seeded(capsys):
+    """
+    A game replays the same from its seed, without printing anything.
+    """
+    result = play_selfplay_game(7, base_seed=100, max_plies=60)
+    assert result.seed == game_seed(100, 7) != game_seed(101, 6)
+    assert result.plies == len(result.moves) <= 60
+    assert result.result in ["1-0", "0-1", "1/2-1/2", "*"]
+    assert play_selfplay_game(7, base_seed=100, max_plies=60).moves == result.moves
+    assert capsys.readouterr().out == ""
+
+
+def test_run_selfplay_across_processes():
+    """
+    Games played by a pool of workers match the same games played in this
+    process, and come back in order.
+    """
+    results = run_selfplay(4, processes=2, base_seed=3, max_plies=40)
+    assert [result.game_id for result in results] == [0, 1, 2, 3]
+    assert [result.moves for result in results] == [
+        result.moves for result in run_selfplay(4, processes=1, base_seed=3, max_plies=40)
+    ]
@@ -0,0 +1,42 @@
+"""
+Pytest unit tests for the precomputed board geometry tables.
+"""
+from ch_ss.game_engine.utils.tables import (
+    DIRECTIONS,
+    KING_TARGETS,
+    KNIGHT_TARGETS,
+    RAYS,
+    SQUARE_INDICES,
+    SQUARE_NAMES,
+)
+
+
+def test_square_names():
+    """
+    Square indices and algebraic names map onto each other.
+    """
+    assert SQUARE_NAMES[0] == "a1"
+    assert SQUARE_NAMES[12] == "e2"
+    assert SQUARE_NAMES[63] == "h8"
+    for sq, name in enumerate(SQUARE_NAMES):
+        assert SQUARE_INDICES[name] == sq
+
+
+def test_leaper_targets():
+    """
+    Knights and kings have fewer targets on the edges of the board.
+    """
+    assert sorted(SQUARE_NAMES[sq] for sq in KNIGHT_TARGETS[SQUARE_INDICES["a1"]]) == ["b3", "c2"]
+    assert len(KNIGHT_TARGETS[SQUARE_INDICES["d4"]]) == 8
+    assert len(KING_TARGETS[SQUARE_INDICES["h8"]]) == 3
+    assert len(KING_TARGETS[SQUARE_INDICES["e4"]]) == 8
+
+
+def test_rays():
+    """
+    Rays are ordered outwards and stop at the edge of the board.
+    """
+    north_east = DIRECTIONS.index((1, 1))
+    assert [SQUARE_NAMES[sq] for sq in RAYS[SQUARE_INDICES["e4"]][north_east]] == ["f5", "g6", "h7"]
+    assert all(len(RAYS[SQUARE_INDICES["a1"]][d]) == 7 for d in range(8) if DIRECTIONS[d] in [(0, 1), (1, 0), (1, 1)])
+    assert sum(len(ray) for ray in RAYS[SQUARE_INDICES["d4"]]) == 27
@@ -0,0 +1,43 @@
+"""
+Pytest unit tests for Zobrist hashing.
+"""
+from ch_ss.game_engine.core.board import Board
+from ch_ss.game_engine.utils.fen import STANDARD_FEN, fen_to_game_state
+from ch_ss.game_engine.utils.move import str_to_move
+from ch_ss.game_engine.utils.zobrist import castling_key, zobrist_hash
+
+
+def test_board_key_returns_on_transposition():
+    """
+    The incrementally updated board key equals the key computed from
+    scratch, and is the same after the knights have moved out and back.
+    """
+    board = Board()
+    start_key = board.zobrist_key
+    game_state, _ = fen_to_game_state(STANDARD_FEN)
+    state = {**game_state.get_pieces_by_color("white"), **game_state.get_pieces_by_color("black")}
+    no_castling = {"white": [False] * 3, "black": [False] * 3}
+    assert start_key == zobrist_hash(state, "white", no_castling, ("x", False))
+
+    for move, color in [("Ng1f3", "white"), ("Ng8f6", "black"), ("Nf3g1", "white"), ("Nf6g8", "black")]:
+        board.make_move(str_to_move(move, color, {}), color)
+        assert board.zobrist_key != start_key or move == "Nf6g8"
+
+    assert board.zobrist_key == start_key
+
+
+def test_state_keys():
+    """
+    Side to move, castling rights and en-passant change the key, and castling
+    vectors allowing the same castling moves hash the same.
+    """
+    game_state, _ = fen_to_game_state(STANDARD_FEN)
+    state = {**game_state.get_pieces_by_color("white"), **game_state.get_pieces_by_color("black")}
+    castle_vecs = game_state.get_castle_vecs()
+    key = zobrist_hash(state, "white", castle_vecs, ("x", False))
+    assert key != zobrist_hash(state, "black", castle_vecs, ("x", False))
+    assert key != zobrist_hash(state, "white", castle_vecs, ("e", True))
+    assert key != zobrist_hash(state, "white", {"white": [True, True, False], "black": [True] * 3}, ("x", False))
+
+    assert castling_key("white", [True, False, True]) == castling_key("white", [False, False, False])
+    assert castling_key("white", [True, True, True]) != castling_key("black", [True, True, True])